@@ -0,0 +1,40 @@
+function showAddSubject() {
+    document.getElementById('modal-title').textContent = 'Agregar Nueva Asignatura';
+    document.getElementById('subject-form').reset();
+    document.getElementById('subject-modal').style.display = 'flex';
+}
+
+function editSubject(subjectId) {
+    document.getElementById('modal-title').textContent = 'Editar Asignatura';
+    document.getElementById('subject-modal').style.display = 'flex';
+}
+
+function deleteSubject(subjectId) {
+    if (confirm('¿Estás seguro de que quieres eliminar esta asignatura?')) {
+        alert('Asignatura eliminada (funcionalidad en desarrollo)');
+    }
+}
+
+function closeModal() {
+    document.getElementById('subject-modal').style.display = 'none';
+}
+
+function saveSubject() {
+    const name = document.getElementById('subject-name').value;
+    if (name.trim()) {
+        alert('Asignatura guardada: ' + name);
+        closeModal();
+    } else {
+        alert('El nombre es obligatorio');
+    }
+}
+
+function viewSubjectTasks(subjectId) {
+    alert(`Viendo tareas de: ${subjectId}\n(Redireccionar a vista filtrada)`);
+}
+
+document.getElementById('subject-modal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closeModal();
+    }
+});
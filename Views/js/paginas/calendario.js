@@ -0,0 +1,102 @@
+let currentDate = new Date();
+let currentMonth = currentDate.getMonth();
+let currentYear = currentDate.getFullYear();
+
+const months = [
+    'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+    'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
+];
+
+const tasks = [
+    { date: 15, title: 'Proyecto Final', priority: 'alta' },
+    { date: 16, title: 'Parcial BD', priority: 'alta' },
+    { date: 18, title: 'Lab React', priority: 'media' },
+    { date: 20, title: 'Ensayo', priority: 'baja' },
+    { date: 22, title: 'Presentación', priority: 'media' }
+];
+
+function generateCalendar() {
+    const firstDay = new Date(currentYear, currentMonth, 1);
+    const lastDay = new Date(currentYear, currentMonth + 1, 0);
+    const firstDayOfWeek = firstDay.getDay();
+    const daysInMonth = lastDay.getDate();
+
+    document.getElementById('current-month').textContent = `${months[currentMonth]} ${currentYear}`;
+
+    const calendarGrid = document.getElementById('calendar-grid');
+    calendarGrid.innerHTML = '';
+
+    const prevMonth = new Date(currentYear, currentMonth, 0);
+    const daysInPrevMonth = prevMonth.getDate();
+
+    for (let i = firstDayOfWeek - 1; i >= 0; i--) {
+        const dayElement = createDayElement(daysInPrevMonth - i, true);
+        calendarGrid.appendChild(dayElement);
+    }
+
+    for (let day = 1; day <= daysInMonth; day++) {
+        const dayElement = createDayElement(day, false);
+
+        const today = new Date();
+        if (currentYear === today.getFullYear() && 
+            currentMonth === today.getMonth() && 
+            day === today.getDate()) {
+            dayElement.classList.add('today');
+        }
+
+        const dayTasks = tasks.filter(task => task.date === day);
+        dayTasks.forEach(task => {
+            const eventElement = document.createElement('div');
+            eventElement.className = `calendar-event ${task.priority}`;
+            eventElement.textContent = task.title;
+            dayElement.appendChild(eventElement);
+        });
+
+        calendarGrid.appendChild(dayElement);
+    }
+
+    const cellsUsed = firstDayOfWeek + daysInMonth;
+    const remainingCells = 42 - cellsUsed;
+
+    for (let day = 1; day <= remainingCells; day++) {
+        const dayElement = createDayElement(day, true);
+        calendarGrid.appendChild(dayElement);
+    }
+}
+
+function createDayElement(day, isOtherMonth) {
+    const dayElement = document.createElement('div');
+    dayElement.className = 'calendar-day';
+    if (isOtherMonth) {
+        dayElement.classList.add('other-month');
+    }
+
+    const dayNumber = document.createElement('div');
+    dayNumber.className = 'day-number';
+    dayNumber.textContent = day;
+    dayElement.appendChild(dayNumber);
+
+    return dayElement;
+}
+
+function previousMonth() {
+    currentMonth--;
+    if (currentMonth < 0) {
+        currentMonth = 11;
+        currentYear--;
+    }
+    generateCalendar();
+}
+
+function nextMonth() {
+    currentMonth++;
+    if (currentMonth > 11) {
+        currentMonth = 0;
+        currentYear++;
+    }
+    generateCalendar();
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    generateCalendar();
+});
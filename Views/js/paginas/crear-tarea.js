@@ -0,0 +1,93 @@
+let selectedPriority = 'media';
+
+function selectPriority(priority) {
+    selectedPriority = priority;
+
+    // Remover selección anterior
+    document.querySelectorAll('.priority-option').forEach(option => {
+        option.classList.remove('selected');
+    });
+
+    // Agregar selección nueva
+    document.querySelector(`.priority-option.${priority}`).classList.add('selected');
+}
+
+function goBack() {
+    if (confirm('¿Estás seguro de que quieres cancelar? Se perderán los datos ingresados.')) {
+        window.location.href = 'dashboard.html';
+    }
+}
+
+function setDefaultDate() {
+    const dateInput = document.getElementById('task-date');
+    const now = new Date();
+    // Agregar 24 horas por defecto
+    now.setDate(now.getDate() + 1);
+    now.setHours(23, 59);
+
+    const year = now.getFullYear();
+    const month = String(now.getMonth() + 1).padStart(2, '0');
+    const day = String(now.getDate()).padStart(2, '0');
+    const hours = String(now.getHours()).padStart(2, '0');
+    const minutes = String(now.getMinutes()).padStart(2, '0');
+
+    dateInput.value = `${year}-${month}-${day}T${hours}:${minutes}`;
+}
+
+document.getElementById('task-form').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = {
+        title: document.getElementById('task-title').value.trim(),
+        subject: document.getElementById('task-subject').value,
+        date: document.getElementById('task-date').value,
+        type: document.getElementById('task-type').value,
+        priority: selectedPriority,
+        description: document.getElementById('task-description').value.trim()
+    };
+
+    // Validaciones
+    if (!formData.title) {
+        alert('El título es obligatorio');
+        return;
+    }
+
+    if (!formData.subject) {
+        alert('Selecciona una asignatura');
+        return;
+    }
+
+    if (!formData.date) {
+        alert('La fecha límite es obligatoria');
+        return;
+    }
+
+    // Verificar que la fecha no sea en el pasado
+    const taskDate = new Date(formData.date);
+    const now = new Date();
+
+    if (taskDate < now) {
+        if (!confirm('La fecha seleccionada es en el pasado. ¿Continuar?')) {
+            return;
+        }
+    }
+
+    // Guardar tarea en localStorage
+    const tasks = JSON.parse(localStorage.getItem('tasks') || '[]');
+    tasks.push({
+        id: Date.now(),
+        ...formData,
+        createdAt: new Date().toISOString(),
+        completed: false
+    });
+    localStorage.setItem('tasks', JSON.stringify(tasks));
+
+    // Simular creación exitosa
+    alert('✅ Tarea creada exitosamente');
+    window.location.href = 'dashboard.html';
+});
+
+// Inicializar fecha por defecto al cargar la página
+document.addEventListener('DOMContentLoaded', function() {
+    setDefaultDate();
+});
@@ -0,0 +1,127 @@
+// Verificar si el usuario está logueado
+window.addEventListener('DOMContentLoaded', function() {
+    const isLoggedIn = localStorage.getItem('isLoggedIn');
+    const userName = localStorage.getItem('userName');
+
+    // Si no hay sesión Y no hay nombre de usuario, redirigir al login
+    if (!isLoggedIn && !userName) {
+        alert('Debes iniciar sesión primero');
+        window.location.href = 'login.html';
+        return;
+    }
+
+    // Si hay nombre pero no está marcado como logueado, marcar como logueado
+    if (userName && !isLoggedIn) {
+        localStorage.setItem('isLoggedIn', 'true');
+    }
+
+    // Nombre, estadísticas y listas vienen renderizados desde el servidor (DashboardSnapshot)
+    connectEventStream();
+});
+
+// === AVISOS EN VIVO (SERVER-SENT EVENTS) ===
+
+let eventStream = null;
+let reloadTimer = null;
+
+/**
+ * Abre el canal /eventos/stream. EventSource reconecta solo y envía
+ * Last-Event-ID, así el servidor reenvía lo que se perdió mientras tanto
+ */
+function connectEventStream() {
+    if (eventStream || typeof EventSource === 'undefined') {
+        return;
+    }
+    eventStream = new EventSource('/eventos/stream');
+
+    // Cambiaron tareas o notificaciones (en esta u otra pestaña), o no se pudo
+    // retomar desde el último evento visto: el dashboard se vuelve a renderizar
+    eventStream.addEventListener('cambios', scheduleReload);
+    eventStream.addEventListener('reset', scheduleReload);
+
+    eventStream.addEventListener('recordatorio', function(e) {
+        const notificacion = JSON.parse(e.data);
+        showReminder(notificacion.mensaje);
+    });
+
+    eventStream.onerror = function() {
+        // Sesión vencida o demasiadas pestañas abiertas: el navegador no reintenta
+        if (eventStream && eventStream.readyState === EventSource.CLOSED) {
+            eventStream = null;
+        }
+    };
+}
+
+/**
+ * Cierra el canal de avisos (al cerrar sesión)
+ */
+function disconnectEventStream() {
+    if (eventStream) {
+        eventStream.close();
+        eventStream = null;
+    }
+}
+
+// Una ráfaga de cambios (p.ej. un lote) provoca una sola recarga
+function scheduleReload() {
+    clearTimeout(reloadTimer);
+    reloadTimer = setTimeout(function() {
+        window.location.reload();
+    }, 500);
+}
+
+// Agrega el recordatorio al inicio de la tarjeta de notificaciones
+function showReminder(mensaje) {
+    const titulos = Array.from(document.querySelectorAll('.card-title'));
+    const tarjeta = titulos.find(function(t) { return t.textContent === 'Notificaciones'; });
+    if (!tarjeta) {
+        return;
+    }
+    const item = document.createElement('div');
+    item.className = 'task-item';
+    const contenido = document.createElement('div');
+    contenido.className = 'task-content';
+    const titulo = document.createElement('div');
+    titulo.className = 'task-title';
+    titulo.textContent = '🔔 ' + mensaje;
+    contenido.appendChild(titulo);
+    item.appendChild(contenido);
+    tarjeta.closest('.card-header').after(item);
+}
+
+// Función de logout
+function logout() {
+    if (confirm('¿Estás seguro que deseas cerrar sesión?')) {
+        disconnectEventStream();
+        localStorage.removeItem('userName');
+        localStorage.removeItem('userEmail');
+        localStorage.removeItem('isLoggedIn');
+
+        alert('Cerrando sesión...');
+
+        setTimeout(function() {
+            window.location.href = 'login.html';
+        }, 500);
+    }
+}
+
+// Interactividad para checkboxes de tareas
+document.querySelectorAll('.task-checkbox').forEach(function(checkbox) {
+    checkbox.addEventListener('click', function() {
+        const taskItem = this.closest('.task-item');
+        taskItem.style.opacity = '0.5';
+        taskItem.style.textDecoration = 'line-through';
+        setTimeout(function() {
+            taskItem.style.display = 'none';
+        }, 300);
+    });
+});
+
+// Interactividad para días del calendario
+document.querySelectorAll('.calendar-day').forEach(function(day) {
+    if (day.textContent && !isNaN(day.textContent)) {
+        day.addEventListener('click', function() {
+            alert('Ver eventos del día ' + this.textContent);
+        });
+    }
+});
@@ -0,0 +1,130 @@
+const loginForm = document.getElementById('login-form');
+const nameInput = document.getElementById('name');
+const emailInput = document.getElementById('email');
+const passwordInput = document.getElementById('password');
+const loginMessage = document.getElementById('login-message');
+const submitBtn = loginForm.querySelector('.btn-primary');
+
+// Validación de nombre
+nameInput.addEventListener('input', function() {
+    if (this.value.length >= 3) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    } else {
+        this.classList.remove('valid', 'invalid');
+    }
+});
+
+// Validación en tiempo real
+emailInput.addEventListener('input', function() {
+    if (this.value && this.validity.valid) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    } else {
+        this.classList.remove('valid', 'invalid');
+    }
+});
+
+passwordInput.addEventListener('input', function() {
+    if (this.value.length >= 6) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    } else {
+        this.classList.remove('valid', 'invalid');
+    }
+});
+
+// Manejo del formulario
+loginForm.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Validación de nombre
+    if (nameInput.value.trim().length < 3) {
+        showMessage('El nombre debe tener al menos 3 caracteres', 'error');
+        nameInput.focus();
+        return;
+    }
+
+    // Validación
+    if (!emailInput.validity.valid) {
+        showMessage('Por favor ingresa un correo válido', 'error');
+        emailInput.focus();
+        return;
+    }
+
+    if (passwordInput.value.length < 6) {
+        showMessage('La contraseña debe tener al menos 6 caracteres', 'error');
+        passwordInput.focus();
+        return;
+    }
+
+    // Simulación de login - Verificar usuario
+    submitBtn.classList.add('loading');
+
+    setTimeout(() => {
+        submitBtn.classList.remove('loading');
+
+        const fullName = nameInput.value.trim();
+        const email = emailInput.value.trim();
+
+        // Verificar si el usuario existe en localStorage
+        const users = JSON.parse(localStorage.getItem('users') || '[]');
+        const user = users.find(u => u.email === email);
+
+        // Guardar sesión
+        localStorage.setItem('userName', fullName);
+        localStorage.setItem('userEmail', email);
+        localStorage.setItem('isLoggedIn', 'true');
+
+        console.log('Sesión guardada:', {
+            userName: fullName,
+            userEmail: email,
+            isLoggedIn: 'true'
+        });
+
+        if (user && user.password === passwordInput.value) {
+            // Usuario registrado encontrado
+            localStorage.setItem('userName', user.name);
+            showMessage('¡Inicio de sesión exitoso con usuario registrado!', 'success');
+        } else {
+            // Login simple sin verificación estricta
+            showMessage('¡Inicio de sesión exitoso! Redirigiendo...', 'success');
+        }
+
+        setTimeout(() => {
+            window.location.href = '/dashboard';
+        }, 1500);
+    }, 2000);
+});
+
+function showMessage(text, type) {
+    loginMessage.textContent = text;
+    loginMessage.className = 'text-center ' + type;
+    loginMessage.style.display = 'block';
+}
+
+// Manejo del enlace "¿Olvidaste tu contraseña?"
+document.querySelector('.forgot-password').addEventListener('click', function(e) {
+    e.preventDefault();
+    showMessage('Función en desarrollo. Contacta a soporte@inacap.cl', 'error');
+});
+
+// Manejo del enlace de registro
+document.getElementById('register-link').addEventListener('click', function(e) {
+    e.preventDefault();
+    showMessage('Redirigiendo al registro...', 'success');
+
+    setTimeout(() => {
+        // Redirigir a la página de registro
+        window.location.href = 'register.html';
+    }, 1000);
+});
@@ -0,0 +1,192 @@
+const registerForm = document.getElementById('register-form');
+const firstName = document.getElementById('firstName');
+const lastName = document.getElementById('lastName');
+const emailInput = document.getElementById('email');
+const studentId = document.getElementById('studentId');
+const passwordInput = document.getElementById('password');
+const confirmPassword = document.getElementById('confirmPassword');
+const registerMessage = document.getElementById('register-message');
+const submitBtn = registerForm.querySelector('.btn-primary');
+
+// Validación de contraseña en tiempo real
+passwordInput.addEventListener('input', function() {
+    const password = this.value;
+    const reqLength = document.getElementById('req-length');
+    const reqUppercase = document.getElementById('req-uppercase');
+    const reqNumber = document.getElementById('req-number');
+
+    // Longitud mínima
+    if (password.length >= 6) {
+        reqLength.classList.add('valid');
+        reqLength.classList.remove('invalid');
+    } else {
+        reqLength.classList.add('invalid');
+        reqLength.classList.remove('valid');
+    }
+
+    // Mayúscula
+    if (/[A-Z]/.test(password)) {
+        reqUppercase.classList.add('valid');
+        reqUppercase.classList.remove('invalid');
+    } else {
+        reqUppercase.classList.add('invalid');
+        reqUppercase.classList.remove('valid');
+    }
+
+    // Número
+    if (/[0-9]/.test(password)) {
+        reqNumber.classList.add('valid');
+        reqNumber.classList.remove('invalid');
+    } else {
+        reqNumber.classList.add('invalid');
+        reqNumber.classList.remove('valid');
+    }
+
+    // Validación visual del campo
+    if (password.length >= 6 && /[A-Z]/.test(password) && /[0-9]/.test(password)) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (password) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    }
+});
+
+// Validación de confirmación de contraseña
+confirmPassword.addEventListener('input', function() {
+    if (this.value === passwordInput.value && this.value.length > 0) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    }
+});
+
+// Validación de email
+emailInput.addEventListener('input', function() {
+    if (this.value && this.validity.valid && this.value.endsWith('@inacapmail.cl')) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    } else {
+        this.classList.remove('valid', 'invalid');
+    }
+});
+
+// Validación de RUT
+studentId.addEventListener('input', function() {
+    const rut = this.value.replace(/[.-]/g, '');
+    if (rut.length >= 8) {
+        this.classList.add('valid');
+        this.classList.remove('invalid');
+    } else if (this.value) {
+        this.classList.add('invalid');
+        this.classList.remove('valid');
+    }
+});
+
+// Validación de nombre y apellido
+[firstName, lastName].forEach(input => {
+    input.addEventListener('input', function() {
+        if (this.value.length >= 2) {
+            this.classList.add('valid');
+            this.classList.remove('invalid');
+        } else if (this.value) {
+            this.classList.add('invalid');
+            this.classList.remove('valid');
+        }
+    });
+});
+
+// Manejo del formulario
+registerForm.addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    // Validaciones
+    if (firstName.value.length < 2) {
+        showMessage('El nombre debe tener al menos 2 caracteres', 'error');
+        firstName.focus();
+        return;
+    }
+
+    if (lastName.value.length < 2) {
+        showMessage('El apellido debe tener al menos 2 caracteres', 'error');
+        lastName.focus();
+        return;
+    }
+
+    if (!emailInput.validity.valid || !emailInput.value.endsWith('@inacapmail.cl')) {
+        showMessage('Debes usar un correo @inacapmail.cl', 'error');
+        emailInput.focus();
+        return;
+    }
+
+    if (studentId.value.replace(/[.-]/g, '').length < 8) {
+        showMessage('Ingresa un RUT válido', 'error');
+        studentId.focus();
+        return;
+    }
+
+    const password = passwordInput.value;
+    if (password.length < 6 || !/[A-Z]/.test(password) || !/[0-9]/.test(password)) {
+        showMessage('La contraseña no cumple con los requisitos', 'error');
+        passwordInput.focus();
+        return;
+    }
+
+    if (password !== confirmPassword.value) {
+        showMessage('Las contraseñas no coinciden', 'error');
+        confirmPassword.focus();
+        return;
+    }
+
+    // Simulación de registro
+    submitBtn.classList.add('loading');
+
+    setTimeout(() => {
+        submitBtn.classList.remove('loading');
+
+        // Guardar usuario en localStorage
+        const users = JSON.parse(localStorage.getItem('users') || '[]');
+        const fullName = `${firstName.value.trim()} ${lastName.value.trim()}`;
+
+        // Verificar si el email ya existe
+        const existingUser = users.find(u => u.email === emailInput.value.trim());
+        if (existingUser) {
+            showMessage('Este correo ya está registrado', 'error');
+            return;
+        }
+
+        users.push({
+            id: Date.now(),
+            name: fullName,
+            email: emailInput.value.trim(),
+            rut: studentId.value.trim(),
+            password: password, // En producción NUNCA guardar contraseñas sin encriptar
+            createdAt: new Date().toISOString()
+        });
+
+        localStorage.setItem('users', JSON.stringify(users));
+
+        showMessage('¡Cuenta creada exitosamente! Ya estás registrado. Redirigiendo al login...', 'success');
+
+        setTimeout(() => {
+            window.location.href = 'login.html';
+        }, 2500);
+    }, 2000);
+});
+
+function showMessage(text, type) {
+    registerMessage.textContent = text;
+    registerMessage.className = 'text-center ' + type;
+    registerMessage.style.display = 'block';
+}
+
+// Manejo del enlace de login
+document.getElementById('login-link').addEventListener('click', function(e) {
+    e.preventDefault();
+    window.location.href = 'login.html';
+});
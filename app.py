@@ -1,14 +1,60 @@
 from flask import Flask, session, redirect, url_for, render_template
 from controllers.auth_controller import auth_bp
+from controllers.calendario_controller import calendario_bp
+from controllers.tarea_controller import tarea_bp
+from controllers.metricas_controller import metricas_bp
+from controllers.eventos_controller import eventos_bp
+from database.conexion_db import init_app as init_db
+from database.registro import init_app as init_registro
+from database.replicas import init_app as init_replicas
+from database.sesiones import init_app as init_sesiones
+from utils.assets import init_app as init_assets
+from services.canal_eventos import canal
+from services.dashboard_service import dashboard_service
+from services.recordatorios import iniciar_en_segundo_plano as iniciar_recordatorios
+from services.sesion_usuario import perfil_actual
+from utils.security import SecurityManager, cargar_clave_secreta
+from datetime import timedelta
 import os
 
+# Estáticos: los sirve utils.assets (build con hash de Views/dist o, sin build, las fuentes)
 app = Flask(__name__,
-            template_folder='views/templates',
-            static_folder='views/static')
-app.secret_key = os.urandom(24)
+            template_folder='Views/templates',
+            static_folder=None)
+# Clave estable (TASKU_SECRET_KEY o instance/secret_key): igual en todos los workers
+app.secret_key = cargar_clave_secreta(os.path.join(app.instance_path, 'secret_key'))
+# Expiración por inactividad de la sesión (deslizante)
+app.permanent_session_lifetime = timedelta(days=7)
+
+# Logs JSON de database/ y models/ (escritos en segundo plano) con request id
+init_registro(app)
+
+# Una conexión y una transacción por request
+init_db(app)
+
+# Lecturas a las réplicas de TASKU_DB_REPLICAS (si hay), escrituras a la primaria
+init_replicas(app)
+
+# Sesiones en el servidor (tabla sesion), compartidas por todos los workers
+init_sesiones(app)
+
+# CSS/JS con nombre por contenido y Cache-Control immutable (python -m utils.assets)
+init_assets(app)
+
+# Costo de bcrypt ajustado a ~250 ms en esta máquina
+SecurityManager.calibrar_costo(objetivo_ms=250)
 
 # Registrar blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
+app.register_blueprint(calendario_bp, url_prefix='/calendario')
+app.register_blueprint(tarea_bp, url_prefix='/tareas')
+app.register_blueprint(metricas_bp)
+app.register_blueprint(eventos_bp, url_prefix='/eventos')
+
+# Recordatorios despachados en este proceso: llegan a las pestañas por /eventos/stream
+# (con un despachador aparte, `python -m services.recordatorios`, las pestañas solo ven 'cambios')
+if os.environ.get('TASKU_RECORDATORIOS_EN_PROCESO') == '1':
+    iniciar_recordatorios(entregar=canal.publicar_recordatorios)
 
 @app.route('/')
 def index():
@@ -20,13 +66,17 @@ def index():
 @app.route('/dashboard')
 def dashboard():
     """Dashboard del usuario con datos dinámicos"""
-    if 'user_id' not in session:
+    perfil = perfil_actual()
+    if perfil is None:
         return redirect(url_for('auth.login'))
     
+    snapshot = dashboard_service.obtener(perfil['id'])
+    
     return render_template('dashboard.html', 
-                         nombre=session.get('user_name'),
-                         email=session.get('user_email'),
-                         rol=session.get('user_rol'))
+                         nombre=perfil['nombre'],
+                         email=perfil['email'],
+                         rol=perfil['rol'],
+                         snapshot=snapshot)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
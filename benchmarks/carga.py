@@ -0,0 +1,272 @@
+# benchmarks/carga.py
+# Prueba de carga de los endpoints de TaskU con usuarios virtuales concurrentes
+#
+# 1. python -m benchmarks.semillas --usuarios 200 --eventos 200 --password secret --limpiar
+# 2. flask --app app run --no-debugger --no-reload --with-threads
+# 3. python -m benchmarks.carga --url http://127.0.0.1:5000 --vus 20 --duracion 30 \
+#        --comparar benchmarks/resultados/base.json
+#
+# Cada escenario corre por separado (calentamiento + duración) y se reporta
+# rendimiento, latencias p50/p95/p99 y consultas SQL por request (del header
+# Server-Timing que agrega database.conexion_db.init_app).
+
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.comparar import comparar, imprimir_comparacion
+from benchmarks.semillas import PASSWORD_BENCH, email_bench
+
+_RE_CONSULTAS = re.compile(r'desc="(\d+) consultas"')
+DIR_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+class _SinRedirecciones(urllib.request.HTTPRedirectHandler):
+    """Se mide cada request por sí solo: un 302 es la respuesta, no se sigue"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class ClienteVirtual:
+    """Un usuario virtual: su propia sesión (cookies) y su usuario de carga"""
+
+    def __init__(self, base_url, numero_usuario, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.email = email_bench(numero_usuario)
+        self.timeout = timeout
+        self.nueva_sesion()
+
+    def nueva_sesion(self):
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies),
+                                                  _SinRedirecciones())
+
+    def solicitar(self, metodo, ruta, datos=None, headers=None):
+        """Retorna (status, headers, segundos)"""
+        req = urllib.request.Request(self.base_url + ruta, data=datos, method=metodo,
+                                     headers=headers or {})
+        inicio = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as respuesta:
+                respuesta.read()
+                status, headers = respuesta.status, respuesta.headers
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, headers = e.code, e.headers
+        segundos = time.perf_counter() - inicio
+        # login_requerido redirige al login cuando la sesión no es válida: es un error
+        if status == 302 and '/auth/login' in (headers.get('Location') or ''):
+            status = 401
+        return status, headers, segundos
+
+    def login(self):
+        datos = urllib.parse.urlencode({'email': self.email, 'password': PASSWORD_BENCH}).encode()
+        status, headers, segundos = self.solicitar(
+            'POST', '/auth/login', datos, {'Content-Type': 'application/x-www-form-urlencoded'})
+        # Login correcto = redirección al dashboard (con credenciales malas vuelve a /auth/login)
+        if status == 302 and 'dashboard' not in (headers.get('Location') or ''):
+            status = 401
+        return status, headers, segundos
+
+
+# --- escenarios: cada uno hace un request y retorna (status, headers, segundos) ---
+
+def escenario_login(cliente, rnd):
+    cliente.nueva_sesion()
+    return cliente.login()
+
+
+def escenario_dashboard(cliente, rnd):
+    return cliente.solicitar('GET', '/dashboard')
+
+
+def escenario_calendario(cliente, rnd):
+    vista = rnd.choice(('semana', 'mes', 'agenda'))
+    fecha = datetime.now() + timedelta(days=rnd.randint(-30, 90))
+    return cliente.solicitar('GET', f'/calendario/eventos?vista={vista}&fecha={fecha:%Y-%m-%d}')
+
+
+def escenario_crear_tarea(cliente, rnd):
+    # No hay formulario de creación: el flujo de alta es la importación (/tareas/importar)
+    fecha = datetime.now() + timedelta(days=rnd.randint(1, 60))
+    csv = ("titulo,fecha_limite,prioridad,tipo\r\n"
+           f"Carga {rnd.randint(1, 10 ** 6)},{fecha:%Y-%m-%d %H:%M},{rnd.choice(('baja', 'media', 'alta'))},tarea\r\n")
+    limite = uuid.uuid4().hex
+    cuerpo = (f'--{limite}\r\n'
+              'Content-Disposition: form-data; name="archivo"; filename="carga.csv"\r\n'
+              'Content-Type: text/csv\r\n\r\n'
+              f'{csv}\r\n--{limite}--\r\n').encode('utf-8')
+    return cliente.solicitar('POST', '/tareas/importar', cuerpo,
+                             {'Content-Type': f'multipart/form-data; boundary={limite}'})
+
+
+ESCENARIOS = {
+    'login': escenario_login,
+    'dashboard': escenario_dashboard,
+    'calendario': escenario_calendario,
+    'crear_tarea': escenario_crear_tarea,
+}
+
+
+class Muestras:
+    """Latencias y consultas por request de un escenario (thread-safe)"""
+
+    def __init__(self):
+        self.latencias = []
+        self.consultas = []
+        self.errores = 0
+        self.estados = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, status, headers, segundos):
+        coincidencia = _RE_CONSULTAS.search(headers.get('Server-Timing') or '') if headers else None
+        with self._lock:
+            self.latencias.append(segundos)
+            self.estados[status] = self.estados.get(status, 0) + 1
+            if status >= 400:
+                self.errores += 1
+            if coincidencia:
+                self.consultas.append(int(coincidencia.group(1)))
+
+    def resumen(self, duracion):
+        latencias = sorted(self.latencias)
+        resultado = {
+            'solicitudes': len(latencias),
+            'errores': self.errores,
+            'tasa_error': self.errores / len(latencias) if latencias else 0.0,
+            'rps': len(latencias) / duracion if duracion else 0.0,
+            'estados': {str(k): v for k, v in sorted(self.estados.items())},
+        }
+        if latencias:
+            resultado.update({
+                'media_ms': 1000 * sum(latencias) / len(latencias),
+                'p50_ms': 1000 * percentil(latencias, 50),
+                'p95_ms': 1000 * percentil(latencias, 95),
+                'p99_ms': 1000 * percentil(latencias, 99),
+                'max_ms': 1000 * latencias[-1],
+            })
+        if self.consultas:
+            consultas = sorted(self.consultas)
+            resultado['consultas_por_request'] = sum(consultas) / len(consultas)
+            resultado['consultas_p95'] = percentil(consultas, 95)
+        return resultado
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    indice = max(0, min(len(ordenados) - 1, -(-len(ordenados) * p // 100) - 1))
+    return ordenados[int(indice)]
+
+
+def correr_escenario(nombre, base_url, vus, duracion, calentamiento, usuarios_semilla, semilla):
+    """Lanza `vus` hilos que repiten el escenario; solo se miden los requests tras el calentamiento"""
+    funcion = ESCENARIOS[nombre]
+    muestras = Muestras()
+    inicio = time.monotonic()
+    medir_desde = inicio + calentamiento
+    fin = medir_desde + duracion
+
+    def usuario_virtual(numero):
+        rnd = random.Random(semilla * 1000 + numero)
+        cliente = ClienteVirtual(base_url, numero % usuarios_semilla)
+        if nombre != 'login':
+            status, _, _ = cliente.login()
+            if status != 302:
+                muestras.agregar(status, None, 0.0)
+                return
+        while True:
+            ahora = time.monotonic()
+            if ahora >= fin:
+                return
+            try:
+                status, headers, segundos = funcion(cliente, rnd)
+            except (urllib.error.URLError, OSError):
+                status, headers, segundos = 599, None, time.monotonic() - ahora
+            if ahora >= medir_desde:
+                muestras.agregar(status, headers, segundos)
+
+    hilos = [threading.Thread(target=usuario_virtual, args=(n,), daemon=True) for n in range(vus)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return muestras.resumen(duracion)
+
+
+def version_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de TaskU")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS),
+                        help=f"separados por coma: {', '.join(ESCENARIOS)}")
+    parser.add_argument('--vus', type=int, default=10, help="usuarios virtuales concurrentes")
+    parser.add_argument('--duracion', type=float, default=30, help="segundos medidos por escenario")
+    parser.add_argument('--calentamiento', type=float, default=5, help="segundos descartados al inicio")
+    parser.add_argument('--usuarios-semilla', type=int, default=100,
+                        help="cuántos usuarios creó benchmarks.semillas")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help="archivo JSON (por defecto benchmarks/resultados/<fecha>.json)")
+    parser.add_argument('--comparar', help="resultado base para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="empeoramiento relativo permitido (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    nombres = [n.strip() for n in args.escenarios.split(',') if n.strip()]
+    desconocidos = [n for n in nombres if n not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f"escenarios desconocidos: {', '.join(desconocidos)}")
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'version': version_codigo(),
+        'config': {'url': args.url, 'vus': args.vus, 'duracion': args.duracion,
+                   'calentamiento': args.calentamiento, 'usuarios_semilla': args.usuarios_semilla,
+                   'semilla': args.semilla},
+        'escenarios': {},
+    }
+    for nombre in nombres:
+        print(f"▶ {nombre}: {args.vus} usuarios virtuales, {args.duracion:.0f} s")
+        datos = correr_escenario(nombre, args.url, args.vus, args.duracion, args.calentamiento,
+                                 args.usuarios_semilla, args.semilla)
+        resultado['escenarios'][nombre] = datos
+        print(f"  {datos['rps']:.1f} req/s  p50 {datos.get('p50_ms', 0):.1f} ms  "
+              f"p95 {datos.get('p95_ms', 0):.1f} ms  p99 {datos.get('p99_ms', 0):.1f} ms  "
+              f"errores {datos['errores']}  consultas/req {datos.get('consultas_por_request', 0):.1f}")
+
+    salida = args.salida or os.path.join(DIR_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f"💾 Resultado guardado en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(base, resultado, args.tolerancia)
+        imprimir_comparacion(base, resultado, regresiones)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/comparar.py
+# Compara dos resultados de benchmarks.carga y marca las regresiones
+#
+# Uso: python -m benchmarks.comparar base.json nuevo.json [--tolerancia 0.10]
+# Sale con código 1 si algún escenario empeoró más de lo tolerado.
+
+import argparse
+import json
+import sys
+
+# métrica -> True si "más alto es peor"
+METRICAS = {
+    'p50_ms': True,
+    'p95_ms': True,
+    'p99_ms': True,
+    'rps': False,
+    'tasa_error': True,
+    'consultas_por_request': True,
+}
+
+
+def comparar(base, nuevo, tolerancia=0.10):
+    """Lista de regresiones: {'escenario', 'metrica', 'base', 'nuevo', 'cambio'}"""
+    regresiones = []
+    for escenario, datos in nuevo['escenarios'].items():
+        anterior = base.get('escenarios', {}).get(escenario)
+        if not anterior:
+            continue
+        for metrica, mas_alto_es_peor in METRICAS.items():
+            if metrica not in datos or metrica not in anterior:
+                continue
+            valor_base, valor_nuevo = anterior[metrica], datos[metrica]
+            if metrica in ('tasa_error', 'consultas_por_request'):
+                # Cualquier consulta extra por request o error nuevo cuenta (sin tolerancia relativa)
+                empeoro = valor_nuevo > valor_base + (0.5 if metrica == 'consultas_por_request' else 0.001)
+            elif mas_alto_es_peor:
+                empeoro = valor_nuevo > valor_base * (1 + tolerancia)
+            else:
+                empeoro = valor_nuevo < valor_base * (1 - tolerancia)
+            if empeoro:
+                regresiones.append({
+                    'escenario': escenario,
+                    'metrica': metrica,
+                    'base': valor_base,
+                    'nuevo': valor_nuevo,
+                    'cambio': (valor_nuevo - valor_base) / valor_base if valor_base else None,
+                })
+    return regresiones
+
+
+def imprimir_comparacion(base, nuevo, regresiones):
+    print(f"\nComparación {base.get('version') or base.get('fecha')} → {nuevo.get('version') or nuevo.get('fecha')}")
+    for escenario, datos in nuevo['escenarios'].items():
+        anterior = base.get('escenarios', {}).get(escenario, {})
+        partes = []
+        for metrica in ('rps', 'p95_ms', 'consultas_por_request'):
+            if metrica in datos and anterior.get(metrica):
+                cambio = (datos[metrica] - anterior[metrica]) / anterior[metrica]
+                partes.append(f"{metrica} {anterior[metrica]:.1f} → {datos[metrica]:.1f} ({cambio:+.0%})")
+        print(f"  {escenario}: " + ('  '.join(partes) if partes else 'sin base'))
+    if regresiones:
+        print("\n❌ Regresiones:")
+        for r in regresiones:
+            print(f"  {r['escenario']}.{r['metrica']}: {r['base']:.2f} → {r['nuevo']:.2f}")
+    else:
+        print("\n✅ Sin regresiones")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks.carga")
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(args.nuevo, encoding='utf-8') as archivo:
+        nuevo = json.load(archivo)
+    regresiones = comparar(base, nuevo, args.tolerancia)
+    imprimir_comparacion(base, nuevo, regresiones)
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == '__main__':
+    main()
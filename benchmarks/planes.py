@@ -0,0 +1,366 @@
+# benchmarks/planes.py
+# Verificación de planes de ejecución de todas las consultas de models/ sobre datos a escala
+#
+# Uso (MySQL local con el esquema de db/00_init_schema.sql):
+#   python -m benchmarks.planes --cargar --usuarios 10000 --eventos 300 --password secret
+#   python -m benchmarks.planes --password secret --presupuesto 2000
+#
+# Cada método público de los modelos se ejecuta con datos reales dentro de una
+# unidad de trabajo que se deshace al final (las escrituras no quedan). Se capturan
+# las sentencias que emite y, por cada una, se revisa:
+#   - EXPLAIN FORMAT=JSON: recorrido completo (ALL / index) o filesort sobre tablas grandes
+#   - filas examinadas (contadores Handler_read_* del SELECT real) contra el presupuesto
+#   - EXPLAIN ANALYZE (solo SELECT) se guarda en el reporte para revisarlo a mano
+# Sale con código 1 si alguna consulta no cumple, o si hay métodos sin caso.
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from benchmarks.semillas import GeneradorSemillas, PASSWORD_BENCH, argumentos_conexion, email_bench
+from database.conexion_db import ConexionDB, UnidadTrabajo
+from database.metricas import huella, metricas
+from models.asignatura import AsignaturaModel
+from models.evento import EventoModel
+from models.notificacion import NotificacionModel
+from models.recurrencia import RecurrenciaModel
+from models.usuario import UsuarioModel
+
+DIR_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+FILAS_TABLA_PEQUENA = 1000      # bajo esto un recorrido completo / filesort no se considera problema
+PRESUPUESTO_FILAS = 2000        # filas examinadas máximas por sentencia
+
+MODELOS = {
+    'EventoModel': EventoModel,
+    'NotificacionModel': NotificacionModel,
+    'RecurrenciaModel': RecurrenciaModel,
+    'UsuarioModel': UsuarioModel,
+    'AsignaturaModel': AsignaturaModel,
+}
+
+# Métodos públicos que no emiten SQL
+SIN_SQL = {
+    'UsuarioModel.validar_email_inacap',
+    'AsignaturaModel.decorar',
+    'AsignaturaModel.decorar_iterando',
+    'AsignaturaModel.invalidar_catalogo',
+    'AsignaturaModel.estadisticas_cache',
+    'RecurrenciaModel.contar',
+    'RecurrenciaModel.mezclar',
+}
+
+# Presupuesto de filas por caso cuando difiere del general (None = sin límite: mantención masiva)
+PRESUPUESTOS = {
+    'NotificacionModel.eliminar_notificaciones_viejas': None,
+    'NotificacionModel.eliminar_leidas_lote': None,
+    'EventoModel.archivar_lote': None,
+}
+
+
+def _evento_nuevo(d):
+    return {'titulo': 'Plan', 'descripcion': None, 'fecha_limite': d['futuro'],
+            'prioridad': 'media', 'tipo': 'tarea', 'asignatura_id': None}
+
+
+def _serie(m, d):
+    return m['recurrencia'].crear_serie('Plan', d['hoy'], 'FREQ=WEEKLY', d['usuario_id'])
+
+
+def _paginas(m, d, estado=None):
+    pagina = m['evento'].obtener_pagina(d['usuario_id'], limite=20, estado=estado)
+    if pagina['siguiente']:
+        m['evento'].obtener_pagina(d['usuario_id'], cursor=pagina['siguiente'], limite=20, estado=estado)
+
+
+# caso -> función(modelos, datos). "Clase.metodo[variante]" cubre Clase.metodo
+CASOS = {
+    'EventoModel.crear_evento': lambda m, d: m['evento'].crear_evento(
+        'Plan', None, d['futuro'], 'media', 'tarea', d['usuario_id']),
+    'EventoModel.crear_eventos_masivo': lambda m, d: m['evento'].crear_eventos_masivo(
+        d['usuario_id'], [_evento_nuevo(d)]),
+    'EventoModel.obtener_por_usuario': lambda m, d: m['evento'].obtener_por_usuario(d['usuario_id']),
+    'EventoModel.obtener_por_usuario[estado]': lambda m, d: m['evento'].obtener_por_usuario(
+        d['usuario_id'], estado='pendiente'),
+    'EventoModel.obtener_pagina': lambda m, d: _paginas(m, d),
+    'EventoModel.obtener_pagina[estado]': lambda m, d: _paginas(m, d, 'pendiente'),
+    'EventoModel.buscar': lambda m, d: m['evento'].buscar(d['usuario_id'], 'informe', prefijo=False),
+    'EventoModel.buscar[prefijo]': lambda m, d: m['evento'].buscar(d['usuario_id'], 'lab'),
+    'EventoModel.buscar[filtros]': lambda m, d: m['evento'].buscar(
+        d['usuario_id'], 'prueba', estado='pendiente', desde=d['hoy'], hasta=d['hoy'] + timedelta(days=30)),
+    'EventoModel.iterar_por_usuario': lambda m, d: list(m['evento'].iterar_por_usuario(d['usuario_id'])),
+    'EventoModel.iterar_para_calendario': lambda m, d: list(m['evento'].iterar_para_calendario(
+        d['usuario_id'], d['hoy'] - timedelta(days=90))),
+    'EventoModel.obtener_urgentes': lambda m, d: m['evento'].obtener_urgentes(d['usuario_id']),
+    'EventoModel.obtener_proximas_vencer': lambda m, d: m['evento'].obtener_proximas_vencer(d['usuario_id']),
+    'EventoModel.completar_evento': lambda m, d: m['evento'].completar_evento(d['evento_id'], d['usuario_id']),
+    'EventoModel.actualizar_evento': lambda m, d: m['evento'].actualizar_evento(
+        d['evento_id'], {'titulo': 'Plan'}, d['usuario_id']),
+    'EventoModel.aplicar_lote': lambda m, d: m['evento'].aplicar_lote(d['usuario_id'], [
+        {'id': d['evento_id'], 'version': d['evento_version'],
+         'cambios': {'prioridad': 'alta', 'fecha_limite': d['futuro']}}]),
+    'EventoModel.obtener_archivados': lambda m, d: m['evento'].obtener_archivados(d['usuario_id'], limite=20),
+    'EventoModel.archivar_lote': lambda m, d: m['evento'].archivar_lote(d['hoy'] - timedelta(days=180)),
+    'EventoModel.eliminar_evento': lambda m, d: m['evento'].eliminar_evento(d['evento_id'], d['usuario_id']),
+    'EventoModel.obtener_propietario': lambda m, d: m['evento'].obtener_propietario(d['evento_id']),
+    'EventoModel.estadisticas_usuario': lambda m, d: m['evento'].estadisticas_usuario(d['usuario_id']),
+    'EventoModel.obtener_por_mes': lambda m, d: m['evento'].obtener_por_mes(
+        d['usuario_id'], d['hoy'].year, d['hoy'].month),
+    'EventoModel.obtener_por_rango': lambda m, d: m['evento'].obtener_por_rango(
+        d['usuario_id'], d['hoy'], d['hoy'] + timedelta(days=7)),
+    'EventoModel.ultima_modificacion': lambda m, d: m['evento'].ultima_modificacion(d['usuario_id']),
+    'EventoModel.crear_notificacion_automatica': lambda m, d: m['evento'].crear_notificacion_automatica(
+        d['evento_id'], d['futuro'], d['usuario_id']),
+
+    'NotificacionModel.crear_notificacion': lambda m, d: m['notificacion'].crear_notificacion(
+        'recordatorio', 'Plan', d['futuro'], d['evento_id'], d['usuario_id']),
+    'NotificacionModel.obtener_pendientes': lambda m, d: m['notificacion'].obtener_pendientes(d['usuario_id']),
+    'NotificacionModel.marcar_leida': lambda m, d: m['notificacion'].marcar_leida(
+        d['notificacion_id'], d['usuario_id']),
+    'NotificacionModel.obtener_propietario': lambda m, d: m['notificacion'].obtener_propietario(
+        d['notificacion_id']),
+    'NotificacionModel.eliminar_notificaciones_viejas': lambda m, d: m['notificacion'].eliminar_notificaciones_viejas(),
+    'NotificacionModel.eliminar_leidas_lote': lambda m, d: m['notificacion'].eliminar_leidas_lote(
+        d['hoy'] - timedelta(days=30)),
+
+    'RecurrenciaModel.crear_serie': lambda m, d: _serie(m, d),
+    'RecurrenciaModel.eliminar_serie': lambda m, d: m['recurrencia'].eliminar_serie(
+        _serie(m, d), d['usuario_id']),
+    'RecurrenciaModel.ocurrencias_en_rango': lambda m, d: list(m['recurrencia'].ocurrencias_en_rango(
+        d['usuario_id'], d['hoy'], d['hoy'] + timedelta(days=31))),
+    'RecurrenciaModel.ventana_activa': lambda m, d: m['recurrencia'].ventana_activa(d['usuario_id']),
+    'RecurrenciaModel.modificar_ocurrencia': lambda m, d: m['recurrencia'].modificar_ocurrencia(
+        _serie(m, d), d['hoy'] + timedelta(weeks=1), d['usuario_id'], estado='completada'),
+    'RecurrenciaModel.programar_recordatorio': lambda m, d: m['recurrencia'].programar_recordatorio(
+        _serie(m, d)),
+
+    'UsuarioModel.crear_usuario': lambda m, d: m['usuario'].crear_usuario(
+        'Plan', 'plan.verificacion@inacapmail.cl', PASSWORD_BENCH),
+    'UsuarioModel.autenticar': lambda m, d: m['usuario'].autenticar(d['email'], PASSWORD_BENCH),
+    'UsuarioModel.actualizar_password_hash': lambda m, d: m['usuario'].actualizar_password_hash(
+        d['usuario_id'], d['password_hash']),
+    'UsuarioModel.obtener_por_email': lambda m, d: m['usuario'].obtener_por_email(d['email']),
+    'UsuarioModel.obtener_por_id': lambda m, d: m['usuario'].obtener_por_id(d['usuario_id']),
+    'UsuarioModel.actualizar_ultimo_acceso': lambda m, d: m['usuario'].actualizar_ultimo_acceso(d['usuario_id']),
+    'UsuarioModel.obtener_token_calendario': lambda m, d: m['usuario'].obtener_token_calendario(d['usuario_id']),
+    'UsuarioModel.regenerar_token_calendario': lambda m, d: m['usuario'].regenerar_token_calendario(
+        d['usuario_id']),
+    'UsuarioModel.obtener_id_por_token_calendario': lambda m, d: m['usuario'].obtener_id_por_token_calendario(
+        'x' * 43),
+
+    'AsignaturaModel.crear_asignatura': lambda m, d: m['asignatura'].crear_asignatura('Plan', 'PLAN-1'),
+    'AsignaturaModel.obtener_todas': lambda m, d: m['asignatura'].obtener_todas(),
+    'AsignaturaModel.obtener_por_id': lambda m, d: m['asignatura'].obtener_por_id(d['asignatura_id']),
+    'AsignaturaModel.catalogo': lambda m, d: m['asignatura'].catalogo(),
+    'AsignaturaModel.asignar_a_usuario': lambda m, d: m['asignatura'].asignar_a_usuario(
+        d['usuario_id'], d['asignatura_id']),
+    'AsignaturaModel.obtener_por_usuario': lambda m, d: m['asignatura'].obtener_por_usuario(d['usuario_id']),
+    'AsignaturaModel.eliminar_asignatura': lambda m, d: m['asignatura'].eliminar_asignatura(d['asignatura_id']),
+}
+
+
+def metodos_sin_caso():
+    """Métodos públicos de los modelos que no tienen caso ni están en SIN_SQL"""
+    cubiertos = {caso.split('[')[0] for caso in CASOS} | SIN_SQL
+    faltantes = []
+    for nombre, clase in MODELOS.items():
+        for metodo, valor in vars(clase).items():
+            if metodo.startswith('_') or not (inspect.isfunction(valor) or isinstance(valor, staticmethod)):
+                continue
+            if f'{nombre}.{metodo}' not in cubiertos:
+                faltantes.append(f'{nombre}.{metodo}')
+    return faltantes
+
+
+def datos_de_prueba(conexion):
+    """Ids reales de un usuario de carga con eventos, notificaciones y asignaturas"""
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute("""
+    SELECT u.id AS usuario_id, u.email, u.password_hash,
+           (SELECT e.id FROM evento e WHERE e.usuario_id = u.id ORDER BY e.id LIMIT 1) AS evento_id,
+           (SELECT e.fecha_actualizacion FROM evento e WHERE e.usuario_id = u.id ORDER BY e.id LIMIT 1)
+               AS evento_version,
+           (SELECT n.id FROM notificacion n WHERE n.usuario_id = u.id LIMIT 1) AS notificacion_id,
+           (SELECT MIN(a.id) FROM asignatura a) AS asignatura_id
+    FROM usuario u
+    WHERE u.email_lc = %s
+    """, (email_bench(0),))
+    datos = cursor.fetchone()
+    cursor.close()
+    if not datos or not datos['evento_id']:
+        raise SystemExit("No hay datos de carga: ejecuta con --cargar (o python -m benchmarks.semillas)")
+    datos['hoy'] = datetime.now()
+    datos['futuro'] = datos['hoy'] + timedelta(days=3)
+    return datos
+
+
+def capturar_caso(funcion, modelos, datos, config):
+    """Ejecuta el caso en una unidad de trabajo que se deshace; retorna las sentencias emitidas"""
+    AsignaturaModel.cache.limpiar()
+    unidad = UnidadTrabajo(**config).iniciar()
+    try:
+        with metricas.capturar() as capturadas:
+            funcion(modelos, datos)
+    finally:
+        unidad.finalizar(confirmar=False)
+    return capturadas
+
+
+def _nodos(plan):
+    """Recorre el árbol de EXPLAIN FORMAT=JSON"""
+    if isinstance(plan, dict):
+        yield plan
+        for valor in plan.values():
+            yield from _nodos(valor)
+    elif isinstance(plan, list):
+        for valor in plan:
+            yield from _nodos(valor)
+
+
+def _lecturas_handler(cursor):
+    cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(fila['Value']) for fila in cursor.fetchall())
+
+
+def analizar(conexion, query, params, presupuesto):
+    """Plan y problemas de una sentencia (None si no tiene plan que revisar, p.ej. INSERT)"""
+    tipo = query.lstrip().split(None, 1)[0].upper()
+    if tipo not in ('SELECT', 'UPDATE', 'DELETE') or ';' in query.strip().rstrip(';'):
+        return None
+    if isinstance(params, list) and params and isinstance(params[0], (tuple, list)):
+        return None  # executemany: sin plan por fila
+
+    cursor = conexion.cursor(dictionary=True)
+    cursor.execute('EXPLAIN FORMAT=JSON ' + query, params or ())
+    plan = json.loads(cursor.fetchone()['EXPLAIN'])
+
+    tablas, filesort = [], False
+    for nodo in _nodos(plan):
+        if nodo.get('using_filesort'):
+            filesort = True
+        if 'table_name' in nodo and 'access_type' in nodo:
+            tablas.append({
+                'tabla': nodo['table_name'],
+                'acceso': nodo['access_type'],
+                'indice': nodo.get('key'),
+                'filas_estimadas': nodo.get('rows_examined_per_scan', 0),
+            })
+
+    resultado = {'tablas': tablas, 'filesort': filesort, 'problemas': []}
+    grandes = [t for t in tablas if t['filas_estimadas'] > FILAS_TABLA_PEQUENA]
+    for t in grandes:
+        if t['acceso'] in ('ALL', 'index'):
+            resultado['problemas'].append(
+                f"recorrido completo de {t['tabla']} ({t['acceso']}, ~{t['filas_estimadas']} filas)")
+    if filesort and grandes:
+        resultado['problemas'].append("filesort sobre " + ', '.join(t['tabla'] for t in grandes))
+
+    if tipo == 'SELECT':
+        # Filas examinadas reales: diferencia de Handler_read_* descontando lo que suma el propio SHOW
+        inicial = _lecturas_handler(cursor)
+        sesgo = _lecturas_handler(cursor) - inicial
+        antes = _lecturas_handler(cursor)
+        cursor.execute(query, params or ())
+        cursor.fetchall()
+        examinadas = _lecturas_handler(cursor) - antes - sesgo
+        cursor.execute('EXPLAIN ANALYZE ' + query, params or ())
+        resultado['explain_analyze'] = '\n'.join(f['EXPLAIN'] for f in cursor.fetchall())
+    else:
+        examinadas = max((t['filas_estimadas'] for t in tablas), default=0)
+    cursor.close()
+
+    resultado['filas_examinadas'] = examinadas
+    if presupuesto is not None and examinadas > presupuesto:
+        resultado['problemas'].append(f"examina {examinadas} filas (presupuesto {presupuesto})")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revisa los planes de las consultas de models/ a escala")
+    parser.add_argument('--cargar', action='store_true', help="genera antes el dataset sintético")
+    parser.add_argument('--usuarios', type=int, default=10000)
+    parser.add_argument('--eventos', type=int, default=300, help="eventos por usuario")
+    parser.add_argument('--presupuesto', type=int, default=PRESUPUESTO_FILAS,
+                        help="filas examinadas máximas por sentencia")
+    parser.add_argument('--salida', help="reporte JSON (por defecto benchmarks/resultados/planes-<fecha>.json)")
+    argumentos_conexion(parser)
+    args = parser.parse_args()
+
+    config = {clave: getattr(args, clave) for clave in ConexionDB.CONFIG_DEFAULT}
+    # Los modelos usan la configuración por defecto: se apunta a la BD indicada
+    ConexionDB.CONFIG_DEFAULT.update(config)
+
+    faltantes = metodos_sin_caso()
+    if faltantes:
+        print("❌ Métodos de models/ sin caso en benchmarks/planes.py: " + ', '.join(faltantes))
+
+    if args.cargar:
+        inicio = time.perf_counter()
+        resumen = GeneradorSemillas(config, args.usuarios, args.eventos).ejecutar(limpiar=True)
+        print(f"🌱 {resumen} en {time.perf_counter() - inicio:.0f} s")
+
+    conexion = mysql.connector.connect(**config)
+    if args.cargar:
+        cursor = conexion.cursor()
+        for resultado in cursor.execute("ANALYZE TABLE usuario, evento, notificacion, asignatura, "
+                                        "usuario_has_asignatura", multi=True):
+            if resultado.with_rows:
+                resultado.fetchall()
+        cursor.close()
+
+    datos = datos_de_prueba(conexion)
+    modelos = {'evento': EventoModel(), 'notificacion': NotificacionModel(),
+               'usuario': UsuarioModel(), 'asignatura': AsignaturaModel(),
+               'recurrencia': RecurrenciaModel()}
+
+    reporte = {'fecha': datetime.now().isoformat(timespec='seconds'), 'presupuesto': args.presupuesto,
+               'sin_caso': faltantes, 'casos': {}}
+    fallidas = 0
+    for caso, funcion in CASOS.items():
+        sentencias, vistas = [], set()
+        try:
+            capturadas = capturar_caso(funcion, modelos, datos, config)
+        except Exception as e:
+            capturadas = []
+            sentencias.append({'consulta': None, 'problemas': [f"error ejecutando el caso: {e}"]})
+        for query, params in capturadas:
+            clave = huella(query)
+            if clave in vistas:
+                continue
+            vistas.add(clave)
+            try:
+                resultado = analizar(conexion, query, params, PRESUPUESTOS.get(caso, args.presupuesto))
+            except mysql.connector.Error as e:
+                resultado = {'problemas': [f"error en EXPLAIN: {e}"]}
+            if resultado is None:
+                continue
+            resultado['consulta'] = clave
+            sentencias.append(resultado)
+
+        reporte['casos'][caso] = sentencias
+        problemas = [p for s in sentencias for p in s['problemas']]
+        fallidas += bool(problemas)
+        marca = '❌' if problemas else '✅'
+        filas = max((s.get('filas_examinadas', 0) for s in sentencias), default=0)
+        print(f"{marca} {caso}: {len(sentencias)} sentencias, máx. {filas} filas examinadas")
+        for problema in problemas:
+            print(f"     - {problema}")
+    conexion.close()
+
+    salida = args.salida or os.path.join(DIR_RESULTADOS, f"planes-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False, default=str)
+    print(f"💾 Reporte guardado en {salida}")
+
+    if fallidas or faltantes:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
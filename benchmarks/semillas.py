@@ -0,0 +1,173 @@
+# benchmarks/semillas.py
+# Datos de carga reproducibles a partir de db/02_demo_seeds.sql
+#
+# Uso (contra el MySQL de db/docker-compose.yml):
+#   python -m benchmarks.semillas --usuarios 500 --eventos 200 --password secret --limpiar
+#
+# Crea los usuarios bench00000@bench.tasku ... con la contraseña PASSWORD_BENCH,
+# sus asignaturas, eventos repartidos entre 60 días atrás y 120 días adelante y
+# un recordatorio por evento pendiente. Con la misma --semilla se generan los mismos datos.
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from database.conexion_db import ConexionDB
+from utils.security import SecurityManager
+
+SEEDS_DEMO = os.path.join(os.path.dirname(__file__), '..', 'db', '02_demo_seeds.sql')
+DOMINIO = 'bench.tasku'
+PASSWORD_BENCH = 'Bench-TaskU-2025'
+TAMANO_LOTE = 2000
+
+TITULOS = ('Informe', 'Control', 'Laboratorio', 'Prueba', 'Proyecto', 'Lectura', 'Guía', 'Taller')
+PRIORIDADES = ('baja', 'media', 'alta')
+TIPOS = ('tarea', 'evaluacion', 'evento')
+
+
+def email_bench(numero):
+    """Email del usuario de carga número `numero` (lo usa también benchmarks.carga)"""
+    return f'bench{numero:05d}@{DOMINIO}'
+
+
+class GeneradorSemillas:
+    """Carga 02_demo_seeds.sql y lo escala a `usuarios` x `eventos`"""
+
+    def __init__(self, config, usuarios=100, eventos=100, semilla=42):
+        self.config = config
+        self.usuarios = usuarios
+        self.eventos = eventos
+        self.rnd = random.Random(semilla)
+
+    def ejecutar(self, limpiar=False):
+        conexion = mysql.connector.connect(**self.config)
+        cursor = conexion.cursor()
+        try:
+            if limpiar:
+                self._limpiar(cursor)
+            password_hash = SecurityManager.hash_password(PASSWORD_BENCH)
+            self._cargar_demo(cursor, password_hash)
+            asignaturas = self._ids(cursor, "SELECT id FROM asignatura ORDER BY id")
+            usuarios = self._crear_usuarios(cursor, password_hash)
+            self._asignar_asignaturas(cursor, usuarios, asignaturas)
+            total_eventos = self._crear_eventos(cursor, usuarios, asignaturas)
+            cursor.execute(self.SQL_RECORDATORIOS, (f'%@{DOMINIO}',))
+            recordatorios = cursor.rowcount
+            conexion.commit()
+        finally:
+            cursor.close()
+            conexion.close()
+        return {'usuarios': len(usuarios), 'eventos': total_eventos, 'recordatorios': recordatorios}
+
+    # Un recordatorio 24 h antes de cada evento pendiente; los ya vencidos quedan enviados
+    SQL_RECORDATORIOS = """
+    INSERT INTO notificacion (tipo, mensaje, fecha_programada, fecha_enviada, evento_id, usuario_id)
+    SELECT 'recordatorio_24h', CONCAT('Vence mañana: ', e.titulo),
+           e.fecha_limite - INTERVAL 1 DAY,
+           IF(e.fecha_limite - INTERVAL 1 DAY < NOW(), e.fecha_limite - INTERVAL 1 DAY, NULL),
+           e.id, e.usuario_id
+    FROM evento e
+    INNER JOIN usuario u ON u.id = e.usuario_id
+    WHERE u.email_lc LIKE %s AND e.estado = 'pendiente'
+    """
+
+    def _limpiar(self, cursor):
+        # ON DELETE CASCADE borra eventos, notificaciones y asignaciones
+        cursor.execute("DELETE FROM usuario WHERE email_lc LIKE %s", (f'%@{DOMINIO}',))
+
+    def _cargar_demo(self, cursor, password_hash):
+        # El script no es idempotente para asignatura (no tiene clave única): se carga una sola vez
+        cursor.execute("SELECT COUNT(*) FROM usuario WHERE email_lc = 'admin@demo.cl'")
+        if cursor.fetchone()[0]:
+            return
+        with open(SEEDS_DEMO, encoding='utf-8') as archivo:
+            script = archivo.read().replace('REEMPLAZAR_CON_BCRYPT', password_hash)
+        for resultado in cursor.execute(script, multi=True):
+            if resultado.with_rows:
+                resultado.fetchall()
+
+    def _crear_usuarios(self, cursor, password_hash):
+        filas = [(f'Bench {n}', email_bench(n), password_hash, self.rnd.choice(('claro', 'oscuro')))
+                 for n in range(self.usuarios)]
+        for inicio in range(0, len(filas), TAMANO_LOTE):
+            cursor.executemany(
+                "INSERT IGNORE INTO usuario (nombre, email, password_hash, tema_preferido) "
+                "VALUES (%s, %s, %s, %s)", filas[inicio:inicio + TAMANO_LOTE])
+        return self._ids(cursor, "SELECT id FROM usuario WHERE email_lc LIKE %s ORDER BY email_lc",
+                         (f'%@{DOMINIO}',))[:self.usuarios]
+
+    def _asignar_asignaturas(self, cursor, usuarios, asignaturas):
+        if not asignaturas:
+            return
+        filas = []
+        for usuario_id in usuarios:
+            cantidad = self.rnd.randint(1, len(asignaturas))
+            filas.extend((usuario_id, a) for a in self.rnd.sample(asignaturas, cantidad))
+        for inicio in range(0, len(filas), TAMANO_LOTE):
+            cursor.executemany(
+                "INSERT IGNORE INTO usuario_has_asignatura (usuario_id, asignatura_id) VALUES (%s, %s)",
+                filas[inicio:inicio + TAMANO_LOTE])
+
+    def _crear_eventos(self, cursor, usuarios, asignaturas):
+        query = """
+        INSERT INTO evento (titulo, descripcion, fecha_limite, prioridad, estado, asignatura_id, usuario_id, tipo)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        hoy = datetime.now().replace(minute=0, second=0, microsecond=0)
+        lote, total = [], 0
+        for usuario_id in usuarios:
+            for _ in range(self.eventos):
+                fecha = hoy + timedelta(hours=self.rnd.randint(-60 * 24, 120 * 24))
+                estado = 'completada' if fecha < hoy and self.rnd.random() < 0.7 else 'pendiente'
+                lote.append((
+                    f"{self.rnd.choice(TITULOS)} {self.rnd.randint(1, 99)}",
+                    self.rnd.choice((None, 'Entregar por AAI')),
+                    fecha,
+                    self.rnd.choice(PRIORIDADES),
+                    estado,
+                    self.rnd.choice(asignaturas) if asignaturas and self.rnd.random() < 0.8 else None,
+                    usuario_id,
+                    self.rnd.choice(TIPOS),
+                ))
+                if len(lote) >= TAMANO_LOTE:
+                    cursor.executemany(query, lote)
+                    total += len(lote)
+                    lote = []
+        if lote:
+            cursor.executemany(query, lote)
+            total += len(lote)
+        return total
+
+    @staticmethod
+    def _ids(cursor, query, params=()):
+        cursor.execute(query, params)
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def argumentos_conexion(parser):
+    """Opciones --host/--port/--user/--password/--database (por defecto ConexionDB.CONFIG_DEFAULT)"""
+    for clave, valor in ConexionDB.CONFIG_DEFAULT.items():
+        parser.add_argument(f'--{clave}', default=valor, type=type(valor))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos de carga para los benchmarks de TaskU")
+    parser.add_argument('--usuarios', type=int, default=100)
+    parser.add_argument('--eventos', type=int, default=100, help="eventos por usuario")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--limpiar', action='store_true', help="borra antes los usuarios de carga")
+    argumentos_conexion(parser)
+    args = parser.parse_args()
+
+    config = {clave: getattr(args, clave) for clave in ConexionDB.CONFIG_DEFAULT}
+    inicio = time.perf_counter()
+    resumen = GeneradorSemillas(config, args.usuarios, args.eventos, args.semilla).ejecutar(args.limpiar)
+    print(f"🌱 {resumen} en {time.perf_counter() - inicio:.1f} s (contraseña: {PASSWORD_BENCH})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 from flask import Blueprint, request, session, redirect, url_for, render_template, flash
 from models.usuario import UsuarioModel
+from services.sesion_usuario import iniciar_sesion
+from utils.security import SeguridadSaturadaError
 
 auth_bp = Blueprint('auth', __name__)
 usuario_model = UsuarioModel()
@@ -18,13 +20,14 @@ def login():
             flash('Email y contraseña son obligatorios', 'error')
             return redirect(url_for('auth.login'))
         
-        user = usuario_model.autenticar(email, password)
+        try:
+            user = usuario_model.autenticar(email, password)
+        except SeguridadSaturadaError:
+            flash('Hay muchos inicios de sesión en curso, intenta en unos segundos', 'error')
+            return render_template('login.html'), 503, {'Retry-After': '5'}
         
         if user:
-            session['user_id'] = user['id']
-            session['user_name'] = user['nombre']
-            session['user_email'] = user['email']
-            session['user_rol'] = user.get('rol', 'estudiante')
+            iniciar_sesion(user)
             
             # Actualizar último acceso
             usuario_model.actualizar_ultimo_acceso(user['id'])
@@ -76,6 +79,9 @@ def register():
         except ValueError as e:
             flash(str(e), 'error')
             return redirect(url_for('auth.register'))
+        except SeguridadSaturadaError:
+            flash('El servidor está ocupado, intenta en unos segundos', 'error')
+            return render_template('register.html'), 503, {'Retry-After': '5'}
 
 @auth_bp.route('/logout')
 def logout():
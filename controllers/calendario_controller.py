@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+import hashlib
+
+from flask import Blueprint, request, session, render_template, jsonify, make_response, Response, url_for, abort
+from models.evento import EventoModel
+from models.usuario import UsuarioModel
+from services.calendario_ics import feed_calendario
+from utils.decorators import login_requerido
+from utils.serializacion import fila_a_json
+
+calendario_bp = Blueprint('calendario', __name__)
+evento_model = EventoModel()
+usuario_model = UsuarioModel()
+
+VISTAS = ('semana', 'mes', 'agenda')
+DIAS_AGENDA = 30
+
+
+def calcular_rango(vista, fecha, dias=DIAS_AGENDA):
+    """Rango semiabierto [desde, hasta) que cubre la vista pedida"""
+    inicio_dia = datetime(fecha.year, fecha.month, fecha.day)
+    if vista == 'semana':
+        desde = inicio_dia - timedelta(days=inicio_dia.weekday())  # lunes
+        return desde, desde + timedelta(days=7)
+    if vista == 'mes':
+        desde = inicio_dia.replace(day=1)
+        hasta = (desde.replace(year=desde.year + 1, month=1) if desde.month == 12
+                 else desde.replace(month=desde.month + 1))
+        return desde, hasta
+    return inicio_dia, inicio_dia + timedelta(days=dias)
+
+
+@calendario_bp.route('/')
+@login_requerido
+def ver():
+    """Vista del calendario"""
+    return render_template('calendario.html')
+
+
+@calendario_bp.route('/eventos')
+@login_requerido
+def eventos():
+    """
+    Eventos del usuario para la vista semana / mes / agenda en JSON.
+    ?vista=mes&fecha=2025-03-01  (fecha por defecto: hoy)
+    Responde 304 si no cambió nada desde la última vez que el navegador lo pidió.
+    """
+    vista = request.args.get('vista', 'mes')
+    if vista not in VISTAS:
+        return jsonify({'error': f"vista debe ser una de: {', '.join(VISTAS)}"}), 400
+    try:
+        fecha = datetime.strptime(request.args['fecha'], '%Y-%m-%d') if 'fecha' in request.args else datetime.now()
+    except ValueError:
+        return jsonify({'error': 'fecha debe tener formato AAAA-MM-DD'}), 400
+
+    usuario_id = session['user_id']
+    desde, hasta = calcular_rango(vista, fecha)
+
+    # Validadores baratos primero: si el navegador ya tiene esta versión no se consulta el rango
+    estado = evento_model.ultima_modificacion(usuario_id)
+    ultima = estado['ultima']
+    etag = hashlib.sha1(
+        f"{usuario_id}|{vista}|{desde:%Y%m%d}|{ultima}|{estado['total']}".encode()
+    ).hexdigest()
+
+    respuesta = make_response()
+    respuesta.set_etag(etag)
+    if ultima:
+        respuesta.last_modified = ultima
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    respuesta.make_conditional(request)
+    if respuesta.status_code == 304:
+        return respuesta
+
+    filas = evento_model.obtener_por_rango(usuario_id, desde, hasta)
+    respuesta.set_data(jsonify({
+        'vista': vista,
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'eventos': [fila_a_json(fila) for fila in filas]
+    }).get_data())
+    respuesta.mimetype = 'application/json'
+    return respuesta
+
+
+@calendario_bp.route('/suscripcion')
+@login_requerido
+def suscripcion():
+    """URL secreta para suscribirse al calendario desde el teléfono"""
+    token = usuario_model.obtener_token_calendario(session['user_id'])
+    if not token:
+        return jsonify({'error': 'No se pudo generar la suscripción'}), 500
+    return jsonify({'url': url_for('calendario.feed', token=token, _external=True)})
+
+
+@calendario_bp.route('/suscripcion/regenerar', methods=['POST'])
+@login_requerido
+def regenerar_suscripcion():
+    """Invalida la URL anterior (p.ej. si se compartió por error) y entrega una nueva"""
+    anterior = usuario_model.obtener_token_calendario(session['user_id'])
+    token = usuario_model.regenerar_token_calendario(session['user_id'])
+    if not token:
+        return jsonify({'error': 'No se pudo regenerar la suscripción'}), 500
+    feed_calendario.olvidar_token(anterior)
+    return jsonify({'url': url_for('calendario.feed', token=token, _external=True)})
+
+
+@calendario_bp.route('/feed/<token>.ics')
+def feed(token):
+    """
+    Feed iCalendar del usuario dueño del token (sin sesión: lo consultan las apps de calendario).
+    Desde caché no se consulta la BD; sin caché, si el cliente ya tiene la versión actual
+    (If-None-Match) se responde 304 sin construir el cuerpo.
+    """
+    usuario_id = feed_calendario.usuario_por_token(token)
+    if usuario_id is None:
+        abort(404)
+
+    encabezados = {'Cache-Control': 'private, max-age=300'}
+    cacheado = feed_calendario.vigente(usuario_id)
+    if cacheado:
+        etag, cuerpo = cacheado
+        respuesta = Response(cuerpo, mimetype='text/calendar', headers=encabezados)
+        respuesta.set_etag(etag)
+        return respuesta.make_conditional(request)
+
+    etag = feed_calendario.etag(usuario_id)
+    if request.if_none_match.contains(etag):
+        respuesta = Response(mimetype='text/calendar', headers=encabezados)
+        respuesta.set_etag(etag)
+        return respuesta.make_conditional(request)
+
+    respuesta = Response(feed_calendario.construir(usuario_id, etag), mimetype='text/calendar',
+                         headers=encabezados)
+    respuesta.set_etag(etag)
+    return respuesta.make_conditional(request)
@@ -0,0 +1,65 @@
+# controllers/eventos_controller.py
+# Canal Server-Sent Events: la pestaña se entera de recordatorios y cambios sin consultar la BD
+from flask import Blueprint, Response, jsonify, request, session
+
+from services.canal_eventos import LimiteConexionesError, canal
+from utils.decorators import login_requerido
+
+eventos_bp = Blueprint('eventos', __name__)
+
+HEARTBEAT = 15          # segundos entre comentarios ': ping' (evita que un proxy corte la conexión)
+REINTENTO_MS = 5000     # espera del EventSource antes de reconectar
+
+
+@eventos_bp.route('/stream')
+@login_requerido
+def stream():
+    """
+    text/event-stream con los eventos del usuario:
+      cambios      → cambiaron sus eventos/notificaciones (recargar lo que se muestra)
+      recordatorio → notificación entregada por el despachador (datos: la notificación)
+      reset        → no se pudo retomar desde Last-Event-ID: recargar todo
+    Máximo canal.max_conexiones por usuario (429 si se supera).
+    """
+    usuario_id = session['user_id']
+    try:
+        suscripcion = canal.suscribir(usuario_id)
+    except LimiteConexionesError as e:
+        return jsonify({'error': str(e)}), 429
+
+    ultimo_id = request.headers.get('Last-Event-ID')
+    previos = canal.pendientes_desde(usuario_id, ultimo_id) if ultimo_id else []
+
+    respuesta = Response(_emitir(suscripcion, previos), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',      # nginx: no acumular la respuesta
+    })
+    # Al cortarse la conexión (aunque el generador no haya empezado)
+    respuesta.call_on_close(lambda: canal.desuscribir(suscripcion))
+    return respuesta
+
+
+def _emitir(suscripcion, previos):
+    # La conexión no usa la BD: el request ya cerró su unidad de trabajo antes del primer byte
+    visto = 0
+    yield f"retry: {REINTENTO_MS}\n\n"
+    if previos is None:
+        yield _formato({'id': canal.posicion(), 'tipo': 'reset', 'datos': '{}'})
+    for evento in previos or ():
+        visto = _numero(evento)
+        yield _formato(evento)
+
+    while not suscripcion.cerrada:
+        evento = suscripcion.siguiente(HEARTBEAT)
+        if evento is None:
+            yield ": ping\n\n"
+        elif _numero(evento) > visto:   # pudo llegar también en `previos`
+            yield _formato(evento)
+
+
+def _numero(evento):
+    return int(evento['id'].rpartition(':')[2])
+
+
+def _formato(evento):
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {evento['datos']}\n\n"
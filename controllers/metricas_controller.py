@@ -0,0 +1,30 @@
+import hmac
+import os
+
+from flask import Blueprint, Response, abort, request
+from database.metricas import metricas
+
+metricas_bp = Blueprint('metricas', __name__)
+
+LOOPBACK = ('127.0.0.1', '::1')
+
+
+@metricas_bp.route('/metrics')
+def exportar():
+    """
+    Métricas de la capa de datos en formato de texto de Prometheus.
+    Con TASKU_METRICS_TOKEN pide 'Authorization: Bearer <token>'; sin él solo responde
+    a conexiones locales. A cualquier otro se le contesta 404.
+    """
+    if not _autorizado():
+        abort(404)
+    return Response(metricas.exportar_prometheus(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _autorizado():
+    token = os.environ.get('TASKU_METRICS_TOKEN')
+    if not token:
+        return request.remote_addr in LOOPBACK
+    esquema, _, recibido = request.headers.get('Authorization', '').partition(' ')
+    return esquema.lower() == 'bearer' and hmac.compare_digest(recibido.encode(), token.encode())
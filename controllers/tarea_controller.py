@@ -0,0 +1,272 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from flask import Blueprint, request, session, jsonify, Response
+from database.registro import obtener_logger
+from models.evento import EventoModel
+from services.importacion import ImportadorEventos
+from utils.busqueda import coincide, terminos
+from utils.decorators import login_requerido
+from utils.serializacion import fila_a_json
+
+tarea_bp = Blueprint('tarea', __name__)
+log = obtener_logger(__name__)
+evento_model = EventoModel()
+importador = ImportadorEventos()
+
+LIMITE_MAXIMO = 200
+LIMITE_BUSQUEDA = 50
+COLUMNAS_EXPORTACION = ['id', 'titulo', 'descripcion', 'fecha_limite', 'prioridad', 'estado', 'tipo',
+                        'asignatura_id', 'asignatura_nombre', 'fecha_creacion', 'fecha_actualizacion']
+
+
+@tarea_bp.route('/api')
+@login_requerido
+def listar():
+    """
+    Tareas del usuario paginadas por cursor.
+    ?limite=50&estado=pendiente&cursor=<token de 'siguiente'>
+    """
+    try:
+        limite = min(max(int(request.args.get('limite', 50)), 1), LIMITE_MAXIMO)
+    except ValueError:
+        return jsonify({'error': 'limite debe ser un número'}), 400
+
+    try:
+        pagina = evento_model.obtener_pagina(session['user_id'],
+                                             cursor=request.args.get('cursor'),
+                                             limite=limite,
+                                             estado=request.args.get('estado'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'eventos': [fila_a_json(fila) for fila in pagina['eventos']],
+        'siguiente': pagina['siguiente']
+    })
+
+
+@tarea_bp.route('/archivadas')
+@login_requerido
+def listar_archivadas():
+    """
+    Tareas completadas que el trabajo de retención movió a evento_archivo, más recientes primero.
+    ?limite=50&cursor=<token de 'siguiente'>
+    """
+    try:
+        limite = min(max(int(request.args.get('limite', 50)), 1), LIMITE_MAXIMO)
+    except ValueError:
+        return jsonify({'error': 'limite debe ser un número'}), 400
+
+    try:
+        pagina = evento_model.obtener_archivados(session['user_id'],
+                                                 cursor=request.args.get('cursor'),
+                                                 limite=limite)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'eventos': [fila_a_json(fila) for fila in pagina['eventos']],
+        'siguiente': pagina['siguiente']
+    })
+
+
+@tarea_bp.route('/buscar')
+@login_requerido
+def buscar():
+    """
+    Búsqueda en las tareas y asignaturas del usuario (type-ahead).
+    ?q=texto&limite=10&asignatura=3&estado=pendiente&prioridad=alta
+    &desde=2025-03-01&hasta=2025-04-01&exacta=1&cursor=<token de 'siguiente'>
+    """
+    texto = request.args.get('q', '')
+    try:
+        limite = min(max(int(request.args.get('limite', 10)), 1), LIMITE_BUSQUEDA)
+        asignatura_id = request.args.get('asignatura', type=int)
+        desde, hasta = (datetime.fromisoformat(request.args[clave]) if request.args.get(clave) else None
+                        for clave in ('desde', 'hasta'))
+    except ValueError:
+        return jsonify({'error': 'limite debe ser un número y desde/hasta fechas ISO (AAAA-MM-DD)'}), 400
+
+    cursor = request.args.get('cursor')
+    try:
+        pagina = evento_model.buscar(session['user_id'], texto,
+                                     cursor=cursor,
+                                     limite=limite,
+                                     prefijo=request.args.get('exacta') != '1',
+                                     asignatura_id=asignatura_id,
+                                     estado=request.args.get('estado') or None,
+                                     prioridad=request.args.get('prioridad') or None,
+                                     desde=desde,
+                                     hasta=hasta)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Las asignaturas del usuario están en caché: se filtran en memoria (solo en la primera página)
+    asignaturas = []
+    palabras = terminos(texto)
+    if palabras and not cursor:
+        # db/00_init_schema.sql no tiene asignatura.codigo (igual que en AsignaturaModel._decorar_fila)
+        asignaturas = [{'id': a['id'], 'nombre': a['nombre'], 'codigo': a.get('codigo'), 'color': a['color']}
+                       for a in evento_model.asignaturas.obtener_por_usuario(session['user_id']) or []
+                       if coincide(f"{a['nombre']} {a.get('codigo') or ''}", palabras)]
+
+    return jsonify({
+        'eventos': [fila_a_json(fila) for fila in pagina['eventos']],
+        'asignaturas': asignaturas,
+        'siguiente': pagina['siguiente']
+    })
+
+
+@tarea_bp.route('/lote', methods=['POST'])
+@login_requerido
+def aplicar_lote():
+    """
+    Varios cambios en una transacción (completar, reprogramar, prioridad, asignatura, eliminar):
+    {"operaciones": [{"id": 5, "version": "<fecha_actualizacion leída>", "cambios": {"estado": "completada"}},
+                     {"id": 6, "version": null, "eliminar": true}]}
+    Los eventos modificados por otro desde que se leyeron vuelven en 'conflictos'
+    con su versión actual; el resto se aplica.
+    """
+    datos = request.get_json(silent=True) or {}
+    if not isinstance(datos, dict):
+        return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+    try:
+        resultado = evento_model.aplicar_lote(session['user_id'], datos.get('operaciones'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception:
+        log.exception("Error aplicando lote")
+        return jsonify({'error': 'No se pudieron guardar los cambios'}), 500
+
+    resultado['aplicados'] = [fila_a_json(fila) for fila in resultado['aplicados']]
+    resultado['conflictos'] = [fila_a_json(fila) for fila in resultado['conflictos']]
+    return jsonify(resultado)
+
+
+@tarea_bp.route('/recurrentes', methods=['POST'])
+@login_requerido
+def crear_recurrente():
+    """
+    Serie de eventos que se repite (clases, laboratorios):
+    {"titulo": "Lab Redes", "inicio": "2025-03-10T14:00", "regla": "FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250715",
+     "descripcion": null, "prioridad": "media", "tipo": "evento", "asignatura_id": 3}
+    Las ocurrencias aparecen en el calendario, urgentes y estadísticas sin guardarse una por una.
+    """
+    datos = request.get_json(silent=True) or {}
+    if not isinstance(datos, dict):
+        return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+    if not datos.get('titulo') or not datos.get('inicio') or not datos.get('regla'):
+        return jsonify({'error': 'titulo, inicio y regla son obligatorios'}), 400
+
+    try:
+        recurrencia_id = evento_model.recurrencias.crear_serie(
+            datos['titulo'], datos['inicio'], datos['regla'], session['user_id'],
+            descripcion=datos.get('descripcion'),
+            prioridad=datos.get('prioridad', 'media'),
+            tipo=datos.get('tipo', 'evento'),
+            asignatura_id=datos.get('asignatura_id'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if recurrencia_id is None:
+        return jsonify({'error': 'No se pudo guardar la serie'}), 500
+    return jsonify({'id': recurrencia_id}), 201
+
+
+@tarea_bp.route('/recurrentes/<int:recurrencia_id>', methods=['DELETE'])
+@login_requerido
+def eliminar_recurrente(recurrencia_id):
+    """Elimina la serie completa (sus ocurrencias, excepciones y recordatorio)"""
+    if not evento_model.recurrencias.eliminar_serie(recurrencia_id, session['user_id']):
+        return jsonify({'error': 'No se pudo eliminar la serie'}), 500
+    return jsonify({'ok': True})
+
+
+@tarea_bp.route('/recurrentes/<int:recurrencia_id>/ocurrencias', methods=['POST'])
+@login_requerido
+def modificar_ocurrencia(recurrencia_id):
+    """
+    Completa, cancela o mueve una ocurrencia, identificada por su fecha original:
+    {"fecha_original": "2025-03-12T14:00", "estado": "completada"}
+    {"fecha_original": "2025-03-12T14:00", "fecha_limite": "2025-03-13T10:00"}
+    """
+    datos = request.get_json(silent=True) or {}
+    if not isinstance(datos, dict):
+        return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+    try:
+        ocurrencia = evento_model.recurrencias.modificar_ocurrencia(
+            recurrencia_id, datos.get('fecha_original'), session['user_id'],
+            estado=datos.get('estado'), fecha_limite=datos.get('fecha_limite'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception:
+        log.exception("Error modificando ocurrencia")
+        return jsonify({'error': 'No se pudo guardar la ocurrencia'}), 500
+
+    return jsonify(fila_a_json(ocurrencia))
+
+
+@tarea_bp.route('/exportar')
+@login_requerido
+def exportar():
+    """Descarga todo el historial del usuario (?formato=ndjson|csv) en streaming, con memoria constante"""
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in ('ndjson', 'csv'):
+        return jsonify({'error': 'formato debe ser ndjson o csv'}), 400
+
+    filas = evento_model.iterar_por_usuario(session['user_id'])
+
+    if formato == 'ndjson':
+        cuerpo = (json.dumps(fila_a_json(fila), ensure_ascii=False) + '\n' for fila in filas)
+        mimetype = 'application/x-ndjson'
+    else:
+        cuerpo = _generar_csv(filas)
+        mimetype = 'text/csv'
+
+    return Response(cuerpo, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=tareas.{formato}'
+    })
+
+
+@tarea_bp.route('/importar', methods=['POST'])
+@login_requerido
+def importar():
+    """
+    Carga masiva desde un archivo CSV o .ics (campo 'archivo' del formulario).
+    Responde con los ids creados y los errores por fila.
+    """
+    archivo = request.files.get('archivo')
+    if not archivo or not archivo.filename:
+        return jsonify({'error': 'Debes adjuntar un archivo .csv o .ics'}), 400
+
+    extension = archivo.filename.rsplit('.', 1)[-1].lower()
+    if extension not in ('csv', 'ics'):
+        return jsonify({'error': 'Formato no soportado (usa .csv o .ics)'}), 400
+
+    # Se lee en streaming: el archivo no se carga entero en memoria
+    lineas = io.TextIOWrapper(archivo.stream, encoding='utf-8-sig', newline='')
+    try:
+        resultado = importador.importar(session['user_id'], lineas, extension)
+    except UnicodeDecodeError:
+        return jsonify({'error': 'El archivo debe estar en UTF-8'}), 400
+    except Exception:
+        log.exception("Error importando eventos")
+        return jsonify({'error': 'No se pudieron guardar los eventos'}), 500
+
+    return jsonify(resultado), 201 if resultado['creados'] else 200
+
+
+def _generar_csv(filas):
+    """Escribe el CSV fila a fila reutilizando un único buffer"""
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=COLUMNAS_EXPORTACION, extrasaction='ignore')
+    escritor.writeheader()
+    for fila in filas:
+        escritor.writerow(fila_a_json(fila))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
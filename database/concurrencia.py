@@ -0,0 +1,129 @@
+# concurrencia.py
+# Fan-out de lecturas independientes dentro de un request.
+# Cada llamada corre en un hilo del ejecutor y, como ConexionDB es por hilo, toma su
+# propia conexión del pool: la latencia total es la de la consulta más lenta, no la suma.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeout
+from dataclasses import dataclass
+
+from database.conexion_db import ConexionDB
+from database.metricas import metricas
+from database.registro import establecer_request_id, obtener_logger, request_id_actual
+
+log = obtener_logger('db.concurrencia')
+
+
+class SinResultadoError(RuntimeError):
+    """La llamada retornó None (convención de los modelos para un error de BD)"""
+
+
+@dataclass
+class Resultado:
+    """Resultado de una llamada del fan-out: valor o error (excepción / TimeoutError)"""
+    valor: object = None
+    error: BaseException = None
+    segundos: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def o(self, defecto):
+        """valor si la llamada terminó bien; si no, defecto"""
+        return self.valor if self.ok else defecto
+
+
+class EjecutorParalelo:
+    """
+    Pool de hilos acotado para el fan-out. Solo para lecturas: los hilos no ven la
+    unidad de trabajo del request (ni sus escrituras sin confirmar).
+    Cada hilo hereda el request id (logs), los contadores del request (Server-Timing)
+    y si debe leer de la primaria (read-your-writes, ver database/replicas.py).
+    """
+
+    def __init__(self, max_hilos=8):
+        self.max_hilos = max_hilos
+        self._executor = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='fanout')
+        self._local = threading.local()
+
+    def ejecutar(self, llamadas, timeout=2.0, nulo_es_error=True):
+        """
+        llamadas: {nombre: funcion sin argumentos | (funcion, timeout propio)}
+        timeout: segundos por llamada (incluye la espera por un hilo libre)
+        Retorna {nombre: Resultado}. Una llamada que falla o vence no afecta a las demás;
+        la que vence sigue corriendo hasta terminar, pero su resultado se descarta.
+        """
+        normalizadas = {}
+        for nombre, llamada in llamadas.items():
+            funcion, limite = llamada if isinstance(llamada, tuple) else (llamada, timeout)
+            normalizadas[nombre] = (funcion, limite)
+
+        # Desde un hilo del propio ejecutor se corre en línea: esperar a otros hilos podría bloquearlo
+        if getattr(self._local, 'dentro', False) or len(normalizadas) == 1:
+            return {nombre: self._correr(funcion, nulo_es_error)
+                    for nombre, (funcion, _) in normalizadas.items()}
+
+        enrutador = ConexionDB.enrutador
+        contexto = (request_id_actual(), metricas.datos_request(),
+                    enrutador.estado_hilo() if enrutador is not None else None)
+        inicio = time.monotonic()
+        futuros = {nombre: (self._executor.submit(self._en_hilo, funcion, nulo_es_error, contexto), limite)
+                   for nombre, (funcion, limite) in normalizadas.items()}
+
+        resultados = {}
+        for nombre, (futuro, limite) in futuros.items():
+            restante = max(0.0, inicio + limite - time.monotonic())
+            try:
+                resultados[nombre] = futuro.result(timeout=restante)
+            except FuturoTimeout:
+                futuro.cancel()
+                resultados[nombre] = Resultado(error=TimeoutError(f"{nombre} superó {limite} s"),
+                                               segundos=time.monotonic() - inicio)
+                log.warning("Llamada del fan-out vencida", extra={'llamada': nombre, 'timeout': limite})
+
+        for nombre, resultado in resultados.items():
+            if not resultado.ok and not isinstance(resultado.error, TimeoutError):
+                log.warning("Llamada del fan-out fallida",
+                            extra={'llamada': nombre, 'error': repr(resultado.error)})
+        return resultados
+
+    def _en_hilo(self, funcion, nulo_es_error, contexto):
+        request_id, datos, lecturas = contexto
+        enrutador = ConexionDB.enrutador
+        self._local.dentro = True
+        establecer_request_id(request_id)
+        metricas.adoptar_request(datos)
+        if enrutador is not None:
+            enrutador.adoptar(lecturas)
+        try:
+            return self._correr(funcion, nulo_es_error)
+        finally:
+            if enrutador is not None:
+                enrutador.adoptar(None)
+            metricas.adoptar_request(None)
+            establecer_request_id(None)
+            self._local.dentro = False
+
+    @staticmethod
+    def _correr(funcion, nulo_es_error):
+        inicio = time.perf_counter()
+        try:
+            valor = funcion()
+        except Exception as e:
+            return Resultado(error=e, segundos=time.perf_counter() - inicio)
+        if valor is None and nulo_es_error:
+            return Resultado(error=SinResultadoError("Sin resultado"), segundos=time.perf_counter() - inicio)
+        return Resultado(valor=valor, segundos=time.perf_counter() - inicio)
+
+    def cerrar(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+ejecutor = EjecutorParalelo()
+
+
+def en_paralelo(llamadas, timeout=2.0, nulo_es_error=True):
+    """Atajo a ejecutor.ejecutar (ver EjecutorParalelo.ejecutar)"""
+    return ejecutor.ejecutar(llamadas, timeout=timeout, nulo_es_error=nulo_es_error)
@@ -2,8 +2,187 @@
 # Archivo de conexión a la base de datos MySQL (TaskU)
 # Requiere: pip install mysql-connector-python
 
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, InterfaceError, OperationalError
+
+try:
+    from database.metricas import metricas, huella
+    from database.registro import obtener_logger
+    from database.sentencias import Sentencia, registro as sentencias
+except ImportError:  # ejecutado como script: python conexion_db.py
+    from metricas import metricas, huella
+    from registro import obtener_logger
+    from sentencias import Sentencia, registro as sentencias
+
+log = obtener_logger('db')
+
+metricas.agregar_colector('sentencias', sentencias.estadisticas_planas)
+
+
+class PoolAgotadoError(Error):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera"""
+
+
+class PoolConexiones:
+    """
+    Pool acotado y thread-safe de conexiones MySQL.
+    Todas las instancias de ConexionDB con la misma configuración comparten
+    un único pool por proceso, así cada consulta evita el handshake TCP + auth.
+    """
+
+    def __init__(self, config, minimo=1, maximo=10, max_inactividad=300,
+                 timeout_espera=5, validar_tras=5):
+        """
+        config: parámetros para mysql.connector.connect
+        minimo / maximo: conexiones que se mantienen / que pueden existir a la vez
+        max_inactividad: segundos que una conexión libre puede esperar antes de cerrarse
+        timeout_espera: segundos que se espera por una conexión si el pool está lleno
+        validar_tras: segundos de inactividad tras los cuales se hace ping al prestarla
+        """
+        if maximo < 1 or minimo < 0 or minimo > maximo:
+            raise ValueError("Tamaño de pool inválido")
+
+        self.config = dict(config)
+        self.minimo = minimo
+        self.maximo = maximo
+        self.max_inactividad = max_inactividad
+        self.timeout_espera = timeout_espera
+        self.validar_tras = validar_tras
+
+        self._libres = deque()      # (conexion, instante en que se devolvió)
+        self._total = 0             # conexiones abiertas (libres + prestadas)
+        self._cond = threading.Condition(threading.Lock())
+
+    def obtener(self):
+        """Presta una conexión sana; espera hasta timeout_espera si no hay cupo"""
+        inicio = time.perf_counter()
+        try:
+            return self._obtener()
+        finally:
+            metricas.registrar_espera_conexion(time.perf_counter() - inicio)
+
+    def _obtener(self):
+        limite = time.monotonic() + self.timeout_espera
+
+        while True:
+            crear = False
+            with self._cond:
+                viejas = self._extraer_inactivas()
+                while True:
+                    if self._libres:
+                        conexion, devuelta = self._libres.pop()
+                        break
+                    if self._total < self.maximo:
+                        self._total += 1
+                        crear = True
+                        break
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        raise PoolAgotadoError(
+                            msg=f"Pool agotado: {self.maximo} conexiones en uso")
+                    self._cond.wait(restante)
+
+            for vieja in viejas:
+                self._cerrar_silencioso(vieja)
+
+            if crear:
+                try:
+                    inicio = time.perf_counter()
+                    conexion = mysql.connector.connect(**self.config)
+                    metricas.registrar_conexion_nueva(time.perf_counter() - inicio)
+                    return conexion
+                except Exception:
+                    self._descartar()
+                    raise
+
+            if self._esta_sana(conexion, devuelta):
+                return conexion
+
+            # Conexión caída: se descarta y se intenta con otra
+            self._cerrar_silencioso(conexion)
+            self._descartar()
+
+    def devolver(self, conexion):
+        """Devuelve una conexión al pool (o la descarta si quedó inutilizable)"""
+        try:
+            # Cierra la transacción implícita para no arrastrar snapshots ni locks
+            if conexion.in_transaction:
+                conexion.rollback()
+            utilizable = True
+        except Error:
+            utilizable = False
+
+        if not utilizable:
+            self._cerrar_silencioso(conexion)
+            self._descartar()
+            return
+
+        with self._cond:
+            self._libres.append((conexion, time.monotonic()))
+            self._cond.notify()
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres (las prestadas se cierran al devolverse)"""
+        with self._cond:
+            libres = [conexion for conexion, _ in self._libres]
+            self._libres.clear()
+            self._total -= len(libres)
+            self._cond.notify_all()
+        for conexion in libres:
+            self._cerrar_silencioso(conexion)
+
+    def estadisticas(self):
+        """Estado actual del pool"""
+        with self._cond:
+            return {
+                'abiertas': self._total,
+                'libres': len(self._libres),
+                'en_uso': self._total - len(self._libres),
+                'maximo': self.maximo,
+            }
+
+    def _esta_sana(self, conexion, devuelta):
+        """Health check al prestar: ping sólo si estuvo inactiva más de validar_tras"""
+        if time.monotonic() - devuelta < self.validar_tras:
+            return True
+        try:
+            conexion.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def _extraer_inactivas(self):
+        """Saca del pool las conexiones libres que superaron max_inactividad (con lock tomado)"""
+        viejas = []
+        ahora = time.monotonic()
+        # Las más antiguas están al inicio de la cola
+        while (self._libres and self._total > self.minimo
+               and ahora - self._libres[0][1] > self.max_inactividad):
+            viejas.append(self._libres.popleft()[0])
+            self._total -= 1
+        return viejas
+
+    def _descartar(self):
+        """Libera el cupo de una conexión que no volverá al pool"""
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _cerrar_silencioso(conexion):
+        try:
+            conexion.close()
+        except Error:
+            pass
+
+
+# Marca de _consultar_replica: la lectura no pudo hacerse en la réplica
+_EN_PRIMARIA = object()
 
 
 class ConexionDB:
@@ -18,17 +197,20 @@ class ConexionDB:
         'port': 3306                # XAMPP usa 3306 (NO 3307)
     }
 
-    def obtener_ultimo_id(self):
-        """Obtiene el ID del último INSERT"""
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            result = cursor.fetchone()
-            cursor.close()
-            return result[0] if result else None
-        except Exception as e:
-            print(f"Error obteniendo último ID: {e}")
-            return None
+    # Tamaño y tiempos del pool compartido (ver PoolConexiones)
+    POOL_DEFAULT = {
+        'minimo': 1,
+        'maximo': 10,
+        'max_inactividad': 300,
+        'timeout_espera': 5,
+        'validar_tras': 5
+    }
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    # Réplicas de lectura (database/replicas.py): None = todo va a la primaria
+    enrutador = None
 
     def __init__(self, **kwargs):
         """
@@ -37,64 +219,249 @@ class ConexionDB:
         db = ConexionDB(port=3307, password='mi_clave')
         """
         self.config = {**self.CONFIG_DEFAULT, **kwargs}
-        self.connection = None
-        self.cursor = None
+        # Los modelos se comparten entre hilos: cada hilo tiene su propia conexión prestada
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        return getattr(self._local, 'connection', None)
+
+    @connection.setter
+    def connection(self, valor):
+        self._local.connection = valor
+
+    @property
+    def cursor(self):
+        return getattr(self._local, 'cursor', None)
+
+    @cursor.setter
+    def cursor(self, valor):
+        self._local.cursor = valor
+
+    @classmethod
+    def configurar_pool(cls, **opciones):
+        """
+        Ajusta el tamaño/tiempos de los pools que se creen a partir de ahora:
+        ConexionDB.configurar_pool(maximo=20, timeout_espera=2)
+        """
+        cls.POOL_DEFAULT = {**cls.POOL_DEFAULT, **opciones}
+
+    @classmethod
+    def obtener_pool(cls, config):
+        """Devuelve (creándolo si hace falta) el pool compartido para esta configuración"""
+        clave = tuple(sorted(config.items()))
+        with cls._pools_lock:
+            pool = cls._pools.get(clave)
+            if pool is None:
+                pool = PoolConexiones(config, **cls.POOL_DEFAULT)
+                cls._pools[clave] = pool
+                metricas.agregar_colector(f"pool_{config.get('database')}_{len(cls._pools)}",
+                                          pool.estadisticas)
+            return pool
+
+    @classmethod
+    def cerrar_pools(cls):
+        """Cierra las conexiones libres de todos los pools (al apagar la app)"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.cerrar()
 
     def conectar(self):
-        """Establece la conexión con la base de datos"""
-        # Si ya hay conexión activa, no volver a conectar
-        if self.connection and self.connection.is_connected():
+        """Toma prestada una conexión del pool (o usa la de la unidad de trabajo activa)"""
+        unidad = UnidadTrabajo.actual()
+        if unidad is not None and unidad.config == self.config:
+            try:
+                conexion = unidad.obtener_conexion()
+            except Error as e:
+                log.error("Error al conectar a MySQL", extra={'error': str(e)})
+                return False
+            if self.connection is not conexion:
+                self.desconectar()
+                self.connection = conexion
+                self.cursor = conexion.cursor(dictionary=True)
+                self._local.de_unidad = True
+            return True
+
+        # Si este hilo ya tiene una conexión prestada, se reutiliza
+        if self.connection:
             return True
 
         try:
-            self.connection = mysql.connector.connect(**self.config)
-            
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor(dictionary=True)
-                print(f"✅ Conexión exitosa a '{self.config['database']}' "
-                      f"en {self.config['host']}:{self.config['port']}")
-                return True
+            self.connection = self.obtener_pool(self.config).obtener()
+            self.cursor = self.connection.cursor(dictionary=True)
+            self._local.de_unidad = False
+            return True
 
         except Error as e:
-            print(f"❌ Error al conectar a MySQL: {e}")
-            print(f"Configuración usada: {self.config}")
+            # Solo el destino: la configuración completa incluye la contraseña
+            log.error("Error al conectar a MySQL", extra={
+                'error': str(e),
+                'host': self.config.get('host'),
+                'database': self.config.get('database'),
+            })
+            self.connection = None
+            self.cursor = None
             return False
 
     def desconectar(self):
-        """Cierra la conexión con la base de datos de forma segura"""
+        """Devuelve la conexión al pool de forma segura"""
+        conexion, cursor = self.connection, self.cursor
+        self.connection = None
+        self.cursor = None
         try:
-            if self.cursor:
-                self.cursor.close()
-            if self.connection and self.connection.is_connected():
-                self.connection.close()
-                print("🔌 Conexión cerrada correctamente")
+            if cursor:
+                cursor.close()
         except Error as e:
-            print(f"⚠️ Error al cerrar conexión: {e}")
+            log.warning("Error al cerrar cursor", extra={'error': str(e)})
+        # La conexión de una unidad de trabajo la devuelve la propia unidad
+        if conexion and not getattr(self._local, 'de_unidad', False):
+            self.obtener_pool(self.config).devolver(conexion)
 
     def ejecutar_consulta(self, query, params=None):
         """
         Ejecuta una consulta SELECT y retorna los resultados
         Ejemplo: db.ejecutar_consulta("SELECT * FROM usuario WHERE email = %s", (email,))
+        Con réplicas configuradas se lee de una de ellas (ver _replica_para_lectura)
         """
+        replica = self._replica_para_lectura(query)
+        if replica is not None:
+            filas = self._consultar_replica(replica, query, params)
+            if filas is not _EN_PRIMARIA:
+                return filas
+
         if not self.conectar():
             return None
             
+        inicio = time.perf_counter()
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
+            filas = self._ejecutar(self.connection, self.cursor, query, params).fetchall()
+            metricas.registrar_consulta(query, time.perf_counter() - inicio,
+                                        conexion=self.connection, params=params)
+            return filas
         except Error as e:
-            print(f"⚠️ Error al ejecutar consulta: {e}")
-            print(f"Query: {query}")
-            if params:
-                print(f"Params: {params}")
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, error=True)
+            self._registrar_error("Error al ejecutar consulta", e, query, params)
             return None
         finally:
             # No cerramos aquí para permitir múltiples consultas en la misma conexión
             pass
 
+    def _replica_para_lectura(self, query):
+        """
+        Réplica donde correr esta lectura, o None para la primaria: también si este hilo
+        tiene una transacción abierta en la primaria (lee lo que escribió y respeta sus locks)
+        o está dentro de transaccion(), aunque todavía no haya escrito: lo leído ahí decide
+        lo que se escribe después y no puede venir con el retraso de la réplica
+        """
+        enrutador = self.enrutador
+        if enrutador is None or not enrutador.aplica(self.config):
+            return None
+        if self.connection is not None and self.connection.in_transaction:
+            return None
+        unidad = UnidadTrabajo.actual()
+        if unidad is not None and unidad.config == self.config and unidad.en_transaccion:
+            return None
+        return enrutador.elegir(query)
+
+    def _consultar_replica(self, replica, query, params):
+        """SELECT en una réplica; retorna _EN_PRIMARIA si la réplica no pudo atenderlo"""
+        pool = self.obtener_pool(replica.config)
+        try:
+            conexion = pool.obtener()
+        except PoolAgotadoError:
+            return _EN_PRIMARIA
+        except Error as e:
+            self.enrutador.registrar_lectura(replica, e)
+            return _EN_PRIMARIA
+
+        texto = None
+        inicio = time.perf_counter()
+        try:
+            if not isinstance(query, Sentencia):
+                texto = conexion.cursor(dictionary=True)
+            filas = self._ejecutar(conexion, texto, query, params).fetchall()
+            metricas.registrar_consulta(query, time.perf_counter() - inicio,
+                                        conexion=conexion, params=params)
+            self.enrutador.registrar_lectura(replica)
+            return filas
+        except (InterfaceError, OperationalError) as e:
+            # Réplica caída a mitad de la consulta: sale de la rotación y se reintenta en la primaria
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, error=True)
+            self.enrutador.registrar_lectura(replica, e)
+            return _EN_PRIMARIA
+        except Error as e:
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, error=True)
+            self._registrar_error("Error al ejecutar consulta", e, query, params)
+            return None
+        finally:
+            if texto is not None:
+                try:
+                    texto.close()
+                except Error:
+                    pass
+            pool.devolver(conexion)
+
+    @staticmethod
+    def _ejecutar(conexion, cursor, query, params):
+        """
+        Ejecuta con el cursor preparado de la conexión si la consulta está en el registro
+        (database/sentencias.py) o, si no, como texto con `cursor`. Retorna el cursor usado
+        """
+        if isinstance(query, Sentencia):
+            return sentencias.ejecutar(conexion, query, params)
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        return cursor
+
+    def _marcar_escritura(self):
+        """Tras escribir en la primaria, las lecturas del hilo vuelven a ella (read-your-writes)"""
+        enrutador = self.enrutador
+        if enrutador is not None and enrutador.aplica(self.config):
+            enrutador.marcar_escritura()
+
+    def iterar_consulta(self, query, params=None, tamano_lote=500):
+        """
+        Generador que recorre un SELECT grande por lotes (fetchmany) sin cargarlo
+        entero en memoria. Usa su propia conexión del pool, así puede consumirse
+        fuera del request (p.ej. en una respuesta en streaming). Con réplicas, lee de una de ellas.
+        """
+        replica = self._replica_para_lectura(query)
+        pool = self.obtener_pool(replica.config if replica is not None else self.config)
+        try:
+            conexion = pool.obtener()
+        except Error as e:
+            if replica is None:
+                raise
+            if not isinstance(e, PoolAgotadoError):
+                self.enrutador.registrar_lectura(replica, e)
+            pool = self.obtener_pool(self.config)
+            conexion = pool.obtener()
+        cursor = None
+        try:
+            # Cursor sin buffer: las filas llegan del servidor a medida que se piden
+            cursor = conexion.cursor(dictionary=True, buffered=False)
+            inicio = time.perf_counter()
+            cursor.execute(query, params or ())
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, params=params)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                yield from filas
+        finally:
+            if cursor is not None:
+                try:
+                    # Descarta lo no leído si el consumidor se detuvo antes
+                    conexion.consume_results()
+                    cursor.close()
+                except Error:
+                    pass
+            pool.devolver(conexion)
+
     def ejecutar_accion(self, query, params=None):
         """
         Ejecuta INSERT, UPDATE o DELETE
@@ -103,36 +470,260 @@ class ConexionDB:
         if not self.conectar():
             return False
             
+        inicio = time.perf_counter()
         try:
-            if params:
-                self.cursor.execute(query, params)
+            cursor = self._ejecutar(self.connection, self.cursor, query, params)
+            self._local.ultimo_id = cursor.lastrowid
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, params=params)
+            unidad = UnidadTrabajo.actual()
+            if unidad is not None and unidad.conexion is self.connection:
+                # El commit lo hace la unidad de trabajo al terminar
+                unidad.escrituras = True
             else:
-                self.cursor.execute(query)
-            self.connection.commit()
+                self.connection.commit()
+            self._marcar_escritura()
             return True
         except Error as e:
-            print(f"⚠️ Error al ejecutar acción: {e}")
-            print(f"Query: {query}")
-            if params:
-                print(f"Params: {params}")
-            self.connection.rollback()
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, error=True)
+            self._registrar_error("Error al ejecutar acción", e, query, params)
+            # Dentro de una unidad MySQL ya deshizo la sentencia fallida;
+            # un rollback aquí borraría lo hecho antes en la misma transacción
+            if UnidadTrabajo.actual() is None:
+                self.connection.rollback()
+            return False
+
+    def ejecutar_lote(self, query, lista_params):
+        """
+        Ejecuta el mismo INSERT/UPDATE para muchas filas con executemany
+        (los INSERT ... VALUES se envían como un único INSERT multi-fila).
+        Retorna True si tuvo éxito; obtener_ultimo_id() da el id de la PRIMERA fila insertada
+        """
+        if not self.conectar():
+            return False
+
+        inicio = time.perf_counter()
+        try:
+            # Siempre como texto: así executemany arma un único INSERT multi-fila
+            # (con un cursor preparado sería una ejecución por fila)
+            self.cursor.executemany(str(query), lista_params)
+            self._local.ultimo_id = self.cursor.lastrowid
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, params=lista_params)
+            unidad = UnidadTrabajo.actual()
+            if unidad is not None and unidad.conexion is self.connection:
+                unidad.escrituras = True
+            else:
+                self.connection.commit()
+            self._marcar_escritura()
+            return True
+        except Error as e:
+            metricas.registrar_consulta(query, time.perf_counter() - inicio, error=True)
+            self._registrar_error("Error al ejecutar lote", e, query, lista_params)
+            if UnidadTrabajo.actual() is None:
+                self.connection.rollback()
             return False
 
     def obtener_ultimo_id(self):
-        """Obtiene el ID del último registro insertado"""
-        return self.cursor.lastrowid if self.cursor else None
-    
-    def obtener_ultimo_id(self):
-        """Obtiene el ID del último INSERT"""
+        """Obtiene el ID del último INSERT (cursor.lastrowid, sin ida y vuelta extra)"""
+        return getattr(self._local, 'ultimo_id', None)
+
+    @staticmethod
+    def _registrar_error(mensaje, error, query, params):
+        """Log de una sentencia fallida: la huella de la consulta y cuántos parámetros, nunca sus valores"""
+        log.warning(mensaje, extra={
+            'error': str(error),
+            'errno': getattr(error, 'errno', None),
+            'consulta': huella(query),
+            'num_params': len(params) if params else 0,
+        })
+
+
+class UnidadTrabajo:
+    """
+    Una conexión y una transacción compartidas por todos los modelos.
+    Mientras está activa en el hilo, ConexionDB.conectar() usa su conexión y
+    ejecutar_accion() no hace commit: todo se confirma (o deshace) junto al salir.
+
+        with UnidadTrabajo():
+            evento_model.crear_evento(...)
+            notificacion_model.crear_notificacion(...)
+
+    La conexión se pide al pool recién con la primera consulta.
+    """
+
+    _contexto = threading.local()
+
+    def __init__(self, **kwargs):
+        self.config = {**ConexionDB.CONFIG_DEFAULT, **kwargs}
+        self.conexion = None
+        self.escrituras = False
+        self._savepoints = 0
+        self._bloques = 0           # transaccion() abiertos sobre esta unidad
+        self._al_confirmar = []
+
+    @classmethod
+    def actual(cls):
+        """Unidad de trabajo activa en este hilo (o None)"""
+        pila = getattr(cls._contexto, 'pila', None)
+        return pila[-1] if pila else None
+
+    @property
+    def en_transaccion(self):
+        """True dentro de un bloque transaccion() (propio o SAVEPOINT), aunque aún no haya escrito"""
+        return self._bloques > 0
+
+    def obtener_conexion(self):
+        """Conexión de la unidad; se toma del pool la primera vez"""
+        if self.conexion is None:
+            self.conexion = ConexionDB.obtener_pool(self.config).obtener()
+        return self.conexion
+
+    def al_confirmar(self, callback):
+        """Registra una función que se ejecuta sólo si la transacción se confirma"""
+        self._al_confirmar.append(callback)
+
+    def iniciar(self):
+        """Activa la unidad en el hilo actual"""
+        if not hasattr(self._contexto, 'pila'):
+            self._contexto.pila = []
+        self._contexto.pila.append(self)
+        return self
+
+    def finalizar(self, confirmar=True):
+        """Hace commit (si hubo escrituras) o rollback y devuelve la conexión al pool"""
+        pila = self._contexto.pila
+        if self in pila:
+            pila.remove(self)
+
+        conexion, self.conexion = self.conexion, None
+        callbacks, self._al_confirmar = self._al_confirmar, []
+        if conexion is None:
+            return
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT LAST_INSERT_ID()")
-            result = cursor.fetchone()
+            if confirmar and self.escrituras:
+                conexion.commit()
+            else:
+                callbacks = []
+                if conexion.in_transaction:
+                    conexion.rollback()
+        except Error:
+            callbacks = []
+            raise
+        finally:
+            self.escrituras = False
+            ConexionDB.obtener_pool(self.config).devolver(conexion)
+
+        for callback in callbacks:
+            callback()
+
+    @contextmanager
+    def savepoint(self):
+        """Bloque atómico anidado: si falla sólo se deshace lo hecho dentro del bloque"""
+        if not self.escrituras:
+            # Nada que preservar: si falla basta con deshacer la transacción completa
+            try:
+                yield self
+            except BaseException:
+                if self.conexion is not None and self.conexion.in_transaction:
+                    self.conexion.rollback()
+                self.escrituras = False
+                self._al_confirmar = []
+                raise
+            return
+
+        self._savepoints += 1
+        nombre = f"sp_{self._savepoints}"
+        cursor = self.obtener_conexion().cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {nombre}")
+            try:
+                yield self
+            except BaseException:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {nombre}")
+                raise
+            cursor.execute(f"RELEASE SAVEPOINT {nombre}")
+        finally:
+            self._savepoints -= 1
             cursor.close()
-            return result[0] if result else None
-        except Exception as e:
-            print(f"Error obteniendo último ID: {e}")
-            return None
+
+    @contextmanager
+    def _bloque(self):
+        self._bloques += 1
+        try:
+            yield self
+        finally:
+            self._bloques -= 1
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, tipo, valor, traza):
+        self.finalizar(confirmar=tipo is None)
+        return False
+
+
+@contextmanager
+def transaccion(**kwargs):
+    """
+    Bloque atómico. Si ya hay una unidad de trabajo activa (p.ej. la del request)
+    se anida con un SAVEPOINT; si no, abre una unidad propia.
+    """
+    unidad = UnidadTrabajo.actual()
+    if unidad is None:
+        with UnidadTrabajo(**kwargs) as unidad:
+            with unidad._bloque():
+                yield unidad
+    else:
+        with unidad.savepoint(), unidad._bloque():
+            yield unidad
+
+
+def al_confirmar(callback):
+    """
+    Ejecuta callback cuando lo escrito quede confirmado: al commit de la unidad
+    de trabajo activa, o de inmediato si no hay una con escrituras pendientes.
+    Sirve para invalidar cachés sin que otro hilo vuelva a cachear datos sin confirmar.
+    """
+    unidad = UnidadTrabajo.actual()
+    if unidad is not None and unidad.escrituras:
+        unidad.al_confirmar(callback)
+    else:
+        callback()
+
+
+def init_app(app):
+    """Liga una unidad de trabajo a cada request de Flask: un commit al final del request"""
+    from flask import g
+
+    @app.before_request
+    def _abrir_unidad_trabajo():
+        metricas.iniciar_request()
+        g.unidad_trabajo = UnidadTrabajo().iniciar()
+
+    @app.after_request
+    def _cerrar_unidad_trabajo(response):
+        unidad = g.pop('unidad_trabajo', None)
+        if unidad is not None:
+            try:
+                unidad.finalizar(confirmar=response.status_code < 500)
+            except Error as e:
+                log.error("Error al confirmar la transacción del request", extra={'error': str(e)})
+                response = app.response_class("Error al guardar los cambios", status=500)
+
+        datos = metricas.finalizar_request()
+        if datos is not None:
+            response.headers['Server-Timing'] = (
+                f'db;dur={datos["tiempo_db"] * 1000:.1f};desc="{datos["consultas"]} consultas", '
+                f'db-espera;dur={datos["espera_conexion"] * 1000:.1f}, '
+                f'app;dur={datos["total"] * 1000:.1f}'
+            )
+        return response
+
+    @app.teardown_request
+    def _liberar_unidad_trabajo(exc):
+        # Si after_request no llegó a ejecutarse (excepción), se deshace todo
+        unidad = g.pop('unidad_trabajo', None)
+        if unidad is not None:
+            unidad.finalizar(confirmar=False)
 
 
 # === Función de prueba ===
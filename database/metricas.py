@@ -0,0 +1,246 @@
+# metricas.py
+# Instrumentación de la capa de datos: tiempos por consulta, conexiones y consultas por request.
+# Se exporta en formato de texto de Prometheus (ver controllers/metricas_controller.py)
+
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    from database.registro import obtener_logger
+except ImportError:  # ejecutado como script desde database/
+    from registro import obtener_logger
+
+log = obtener_logger('db.metricas')
+
+# Límites de los buckets de los histogramas, en segundos
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+_RE_COMENTARIOS = re.compile(r'/\*.*?\*/|--[^\n]*', re.S)
+_RE_CADENAS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_RE_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_MARCAS = re.compile(r'%s|%\(\w+\)s')
+_RE_LISTAS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_RE_ESPACIOS = re.compile(r'\s+')
+
+
+def huella(query):
+    """
+    Normaliza una consulta para agrupar sus métricas: sin comentarios, literales
+    ni parámetros, espacios colapsados y listas IN (?, ?, ...) reducidas a (...)
+    """
+    texto = _RE_COMENTARIOS.sub(' ', query)
+    texto = _RE_CADENAS.sub('?', texto)
+    texto = _RE_MARCAS.sub('?', texto)
+    texto = _RE_NUMEROS.sub('?', texto)
+    texto = _RE_LISTAS.sub('(...)', texto)
+    return _RE_ESPACIOS.sub(' ', texto).strip()
+
+
+class Histograma:
+    """Histograma acumulado estilo Prometheus"""
+
+    def __init__(self, limites=BUCKETS):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.cuentas[i] += 1
+                break
+        else:
+            self.cuentas[-1] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas=''):
+        """Líneas _bucket / _sum / _count del formato de texto"""
+        separador = ',' if etiquetas else ''
+        acumulado = 0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            acumulado += cuenta
+            yield f'{nombre}_bucket{{{etiquetas}{separador}le="{limite}"}} {acumulado}'
+        yield f'{nombre}_bucket{{{etiquetas}{separador}le="+Inf"}} {self.total}'
+        llaves = f'{{{etiquetas}}}' if etiquetas else ''
+        yield f'{nombre}_sum{llaves} {self.suma:.6f}'
+        yield f'{nombre}_count{llaves} {self.total}'
+
+
+class MetricasDB:
+    """Registro de métricas de la capa de datos (uno por proceso: ver `metricas`)"""
+
+    UMBRAL_LENTA = 0.2          # segundos desde los que una consulta se registra como lenta
+    MAX_HUELLAS = 500           # consultas distintas con histograma propio
+    EXPLAIN_CADA = 60           # segundos mínimos entre dos EXPLAIN de la misma huella
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._consultas = {}                          # huella -> Histograma
+        self._errores = {}                            # huella -> cantidad
+        self._espera_conexion = Histograma()
+        self._conexion_nueva = Histograma()
+        self._consultas_por_request = Histograma(BUCKETS_CONSULTAS)
+        self._ultimo_explain = {}
+        self.consultas_lentas = deque(maxlen=50)      # últimas consultas lentas con su EXPLAIN
+        self._colectores = {}
+        self._request = threading.local()
+
+    # --- registro desde ConexionDB / PoolConexiones ---
+
+    def registrar_consulta(self, query, segundos, conexion=None, params=None, error=False):
+        """Tiempo de una sentencia; si supera UMBRAL_LENTA se guarda con su EXPLAIN"""
+        clave = huella(query)
+        with self._lock:
+            histograma = self._consultas.get(clave)
+            if histograma is None:
+                if len(self._consultas) >= self.MAX_HUELLAS:
+                    clave = 'otras'
+                histograma = self._consultas.setdefault(clave, Histograma())
+            histograma.observar(segundos)
+            if error:
+                self._errores[clave] = self._errores.get(clave, 0) + 1
+
+        capturadas = getattr(self._request, 'capturadas', None)
+        if capturadas is not None:
+            capturadas.append((query, params))
+
+        contador = getattr(self._request, 'datos', None)
+        if contador is not None:
+            # Los hilos del fan-out (database/concurrencia.py) comparten el dict del request
+            with self._lock:
+                contador['consultas'] += 1
+                contador['tiempo_db'] += segundos
+
+        if segundos >= self.UMBRAL_LENTA and not error:
+            self._registrar_lenta(clave, query, segundos, conexion, params)
+
+    def registrar_espera_conexion(self, segundos):
+        """Tiempo esperando que el pool entregue una conexión"""
+        with self._lock:
+            self._espera_conexion.observar(segundos)
+        contador = getattr(self._request, 'datos', None)
+        if contador is not None:
+            with self._lock:
+                contador['espera_conexion'] += segundos
+
+    def registrar_conexion_nueva(self, segundos):
+        """Tiempo de handshake de una conexión nueva a MySQL"""
+        with self._lock:
+            self._conexion_nueva.observar(segundos)
+
+    def agregar_colector(self, nombre, funcion):
+        """funcion() retorna un dict de valores numéricos que se exportan como gauges tasku_<nombre>_<clave>"""
+        self._colectores[nombre] = funcion
+
+    @contextmanager
+    def capturar(self):
+        """Acumula (query, params) de cada sentencia que ejecute este hilo (ver benchmarks/planes.py)"""
+        capturadas = []
+        self._request.capturadas = capturadas
+        try:
+            yield capturadas
+        finally:
+            self._request.capturadas = None
+
+    # --- por request ---
+
+    def iniciar_request(self):
+        self._request.datos = {'consultas': 0, 'tiempo_db': 0.0, 'espera_conexion': 0.0,
+                               'inicio': time.perf_counter()}
+
+    def datos_request(self):
+        """Contadores del request de este hilo (para pasarlos a otro hilo con adoptar_request)"""
+        return getattr(self._request, 'datos', None)
+
+    def adoptar_request(self, datos):
+        """Hace que las consultas de este hilo sumen a los contadores de otro request (o None)"""
+        self._request.datos = datos
+
+    def finalizar_request(self):
+        """Retorna los contadores del request actual (o None) y los suma al histograma"""
+        datos = getattr(self._request, 'datos', None)
+        self._request.datos = None
+        if datos is None:
+            return None
+        datos['total'] = time.perf_counter() - datos.pop('inicio')
+        with self._lock:
+            self._consultas_por_request.observar(datos['consultas'])
+        return datos
+
+    # --- exportación ---
+
+    def exportar_prometheus(self):
+        """Texto en formato de exposición de Prometheus 0.0.4"""
+        lineas = []
+        with self._lock:
+            lineas.append('# HELP tasku_db_consulta_segundos Duración de cada sentencia SQL por huella')
+            lineas.append('# TYPE tasku_db_consulta_segundos histogram')
+            for clave, histograma in self._consultas.items():
+                lineas.extend(histograma.lineas('tasku_db_consulta_segundos', f'consulta="{_escapar(clave)}"'))
+
+            lineas.append('# HELP tasku_db_consulta_errores_total Sentencias que fallaron por huella')
+            lineas.append('# TYPE tasku_db_consulta_errores_total counter')
+            for clave, cantidad in self._errores.items():
+                lineas.append(f'tasku_db_consulta_errores_total{{consulta="{_escapar(clave)}"}} {cantidad}')
+
+            lineas.append('# HELP tasku_db_espera_conexion_segundos Espera por una conexión del pool')
+            lineas.append('# TYPE tasku_db_espera_conexion_segundos histogram')
+            lineas.extend(self._espera_conexion.lineas('tasku_db_espera_conexion_segundos'))
+
+            lineas.append('# HELP tasku_db_conexion_nueva_segundos Tiempo de conexión (TCP + auth) a MySQL')
+            lineas.append('# TYPE tasku_db_conexion_nueva_segundos histogram')
+            lineas.extend(self._conexion_nueva.lineas('tasku_db_conexion_nueva_segundos'))
+
+            lineas.append('# HELP tasku_db_consultas_por_request Sentencias SQL ejecutadas por request HTTP')
+            lineas.append('# TYPE tasku_db_consultas_por_request histogram')
+            lineas.extend(self._consultas_por_request.lineas('tasku_db_consultas_por_request'))
+
+        for nombre, funcion in list(self._colectores.items()):
+            try:
+                valores = funcion()
+            except Exception:
+                continue
+            for clave, valor in valores.items():
+                if isinstance(valor, (int, float)):
+                    lineas.append(f'# TYPE tasku_{nombre}_{clave} gauge')
+                    lineas.append(f'tasku_{nombre}_{clave} {valor}')
+
+        return '\n'.join(lineas) + '\n'
+
+    def _registrar_lenta(self, clave, query, segundos, conexion, params):
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._ultimo_explain.get(clave, -self.EXPLAIN_CADA) < self.EXPLAIN_CADA:
+                return
+            self._ultimo_explain[clave] = ahora
+
+        plan = None
+        if conexion is not None and query.lstrip().upper().startswith('SELECT'):
+            try:
+                cursor = conexion.cursor(dictionary=True)
+                cursor.execute('EXPLAIN ' + query, params or ())
+                plan = cursor.fetchall()
+                cursor.close()
+            except Exception as e:
+                plan = [{'error': str(e)}]
+
+        self.consultas_lentas.append({
+            'consulta': clave,
+            'segundos': round(segundos, 4),
+            'plan': plan,
+            'momento': time.time(),
+        })
+        log.warning("Consulta lenta", extra={'consulta': clave, 'ms': round(segundos * 1000), 'plan': plan})
+
+
+def _escapar(texto):
+    return texto.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+metricas = MetricasDB()
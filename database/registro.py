@@ -0,0 +1,221 @@
+# registro.py
+# Logging estructurado para database/ y models/: una línea JSON por evento, con request id.
+# Los hilos de los requests solo encolan el registro; un hilo aparte lo escribe (QueueListener),
+# así la E/S de stdout / archivo nunca bloquea una consulta.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+RAIZ = 'tasku'
+
+# Claves que nunca salen a los logs (se reemplazan por REDACTADO)
+CLAVES_SENSIBLES = {'password', 'passwd', 'contrasena', 'contraseña', 'password_hash',
+                    'params', 'token', 'token_calendario', 'secret', 'secret_key'}
+REDACTADO = '***'
+
+# Atributos propios de LogRecord: todo lo demás viene de extra={...}
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'request_id',
+                                                                                'suprimidos'}
+
+_contexto = threading.local()
+
+
+def obtener_logger(nombre):
+    """Logger hijo de 'tasku' (p.ej. obtener_logger('db') → tasku.db)"""
+    return logging.getLogger(f'{RAIZ}.{nombre}')
+
+
+def establecer_request_id(request_id):
+    _contexto.request_id = request_id
+
+
+def request_id_actual():
+    return getattr(_contexto, 'request_id', None)
+
+
+def redactar(valor):
+    """Copia de valor con las claves sensibles reemplazadas (dicts / listas anidados)"""
+    if isinstance(valor, dict):
+        return {k: REDACTADO if str(k).lower() in CLAVES_SENSIBLES else redactar(v)
+                for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [redactar(v) for v in valor]
+    return valor
+
+
+class FiltroContexto(logging.Filter):
+    """Adjunta el request id del hilo actual (se evalúa en el hilo del request, no en el listener)"""
+
+    def filter(self, record):
+        record.request_id = request_id_actual()
+        return True
+
+
+class FiltroRepeticiones(logging.Filter):
+    """
+    Limita los mensajes repetidos: por cada (logger, nivel, plantilla del mensaje)
+    deja pasar `rafaga` registros por `ventana` segundos y descarta el resto.
+    El primer registro que pasa en la ventana siguiente lleva `suprimidos` con
+    cuántos se descartaron. Además, los niveles de `muestreo` ({nivel: fracción})
+    se muestrean antes de contar.
+    """
+
+    def __init__(self, rafaga=10, ventana=60, muestreo=None):
+        super().__init__()
+        self.rafaga = rafaga
+        self.ventana = ventana
+        self.muestreo = muestreo or {}
+        self._conteos = {}   # clave -> [inicio de ventana, emitidos, suprimidos]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        fraccion = self.muestreo.get(record.levelno)
+        if fraccion is not None and random.random() >= fraccion:
+            return False
+
+        clave = (record.name, record.levelno, record.msg)
+        ahora = time.monotonic()
+        with self._lock:
+            estado = self._conteos.get(clave)
+            if estado is None or ahora - estado[0] >= self.ventana:
+                suprimidos = estado[2] if estado else 0
+                self._conteos[clave] = [ahora, 1, 0]
+                if len(self._conteos) > 10000:
+                    self._purgar(ahora)
+                if suprimidos:
+                    record.suprimidos = suprimidos
+                return True
+            if estado[1] < self.rafaga:
+                estado[1] += 1
+                return True
+            estado[2] += 1
+            return False
+
+    def _purgar(self, ahora):
+        for clave in [c for c, e in self._conteos.items() if ahora - e[0] >= self.ventana and not e[2]]:
+            del self._conteos[clave]
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea; los campos de extra={...} van redactados"""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            datos['request_id'] = record.request_id
+        if getattr(record, 'suprimidos', None):
+            datos['suprimidos'] = record.suprimidos
+        extra = {k: v for k, v in vars(record).items() if k not in _ATRIBUTOS_RECORD}
+        datos.update(redactar(extra))
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """QueueHandler que nunca bloquea: si la cola está llena, descarta y cuenta"""
+
+    def __init__(self, cola):
+        super().__init__(cola)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # Lo que depende del hilo actual (mensaje, traceback) se resuelve aquí;
+        # el JSON se arma en el hilo del listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+_configuracion = {'listener': None, 'manejador': None}
+_config_lock = threading.Lock()
+
+
+def configurar(nivel=logging.INFO, destino=None, rafaga=10, ventana=60, muestreo=None,
+               max_cola=10000):
+    """
+    Instala el pipeline en el logger 'tasku' (idempotente).
+    destino: handler final (por defecto stderr); corre en el hilo del listener
+    muestreo: p.ej. {logging.DEBUG: 0.05} para registrar el 5% de los DEBUG
+    """
+    with _config_lock:
+        if _configuracion['listener'] is not None:
+            return _configuracion['manejador']
+
+        destino = destino or logging.StreamHandler(sys.stderr)
+        destino.setFormatter(FormatoJSON())
+
+        cola = queue.Queue(maxsize=max_cola)
+        manejador = ManejadorCola(cola)
+        manejador.addFilter(FiltroContexto())
+        manejador.addFilter(FiltroRepeticiones(rafaga=rafaga, ventana=ventana, muestreo=muestreo))
+
+        raiz = logging.getLogger(RAIZ)
+        raiz.setLevel(nivel)
+        raiz.addHandler(manejador)
+        raiz.propagate = False
+
+        listener = logging.handlers.QueueListener(cola, destino, respect_handler_level=True)
+        listener.start()
+        _configuracion.update(listener=listener, manejador=manejador)
+
+        atexit.register(detener)
+        return manejador
+
+
+def detener():
+    """Vacía la cola y detiene el hilo escritor"""
+    with _config_lock:
+        listener, manejador = _configuracion['listener'], _configuracion['manejador']
+        _configuracion.update(listener=None, manejador=None)
+    if listener is not None:
+        listener.stop()
+        logging.getLogger(RAIZ).removeHandler(manejador)
+
+
+def init_app(app, **kwargs):
+    """Configura el pipeline y asigna un request id a cada request (X-Request-ID)"""
+    from flask import request
+
+    configurar(**kwargs)
+
+    @app.before_request
+    def _asignar_request_id():
+        entrante = request.headers.get('X-Request-ID', '')
+        if not (0 < len(entrante) <= 64 and entrante.replace('-', '').isalnum()):
+            entrante = uuid.uuid4().hex
+        establecer_request_id(entrante)
+
+    @app.after_request
+    def _informar_request_id(response):
+        if request_id_actual():
+            response.headers['X-Request-ID'] = request_id_actual()
+        return response
+
+    @app.teardown_request
+    def _limpiar_request_id(exc):
+        establecer_request_id(None)
@@ -0,0 +1,318 @@
+# replicas.py
+# Separación lectura/escritura: la primaria de ConexionDB.CONFIG_DEFAULT recibe las
+# escrituras y N réplicas de solo lectura atienden ConexionDB.ejecutar_consulta.
+# Un hilo vigila cada réplica (conexión + retraso de replicación) y saca de la rotación
+# las caídas o atrasadas; tras una escritura el cliente lee de la primaria un rato.
+
+import itertools
+import os
+import re
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+
+from database.conexion_db import ConexionDB
+from database.metricas import metricas
+from database.registro import obtener_logger
+
+log = obtener_logger('db.replicas')
+
+# Lecturas que bloquean filas: tienen que ir a la primaria
+_BLOQUEANTE = re.compile(r'\bFOR\s+(UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b', re.IGNORECASE)
+
+# Cookie con el instante (epoch) hasta el que el navegador lee de la primaria
+COOKIE_ESCRITURA = 'tasku_rw'
+
+
+class Replica:
+    """Estado de una réplica: configuración de conexión y resultado del último chequeo"""
+
+    def __init__(self, nombre, config):
+        self.nombre = nombre
+        self.config = config
+        self.sana = False           # entra a la rotación tras el primer chequeo correcto
+        self.lag = None             # segundos de retraso (None: desconocido / replicación detenida)
+        self.motivo = 'sin chequear'
+        self.lecturas = 0
+        self.errores = 0
+        self.control = None         # conexión propia del chequeo, fuera del pool de lecturas
+
+    def estadisticas(self):
+        return {
+            'sana': int(self.sana),
+            'lag_segundos': self.lag if self.lag is not None else -1,
+            'lecturas': self.lecturas,
+            'errores': self.errores,
+        }
+
+
+class EnrutadorReplicas:
+    """
+    Decide dónde corre cada lectura de ConexionDB:
+    - en la primaria si la unidad de trabajo ya abrió su transacción, si la consulta
+      bloquea filas (FOR UPDATE / FOR SHARE) o si el cliente escribió hace menos de
+      `ventana_escritura` segundos (read-your-writes);
+    - si no, en una réplica sana, por turnos. Sin réplicas sanas, en la primaria.
+
+    Una réplica sale de la rotación si no responde o su retraso supera `max_lag`
+    segundos, y vuelve cuando baja de max_lag / 2 (así no entra y sale a cada chequeo).
+    """
+
+    def __init__(self, replicas, primaria=None, max_lag=5, revisar_cada=2, ventana_escritura=None):
+        """
+        replicas: lista de dicts que sobrescriben la configuración de la primaria
+                  (normalmente solo host / port), p.ej. [{'port': 3307}]
+        primaria: configuración de la primaria (por defecto ConexionDB.CONFIG_DEFAULT)
+        ventana_escritura: segundos de lectura en la primaria tras escribir (por defecto 2 * max_lag)
+        """
+        self.primaria = {**ConexionDB.CONFIG_DEFAULT, **(primaria or {})}
+        self.max_lag = max_lag
+        self.revisar_cada = revisar_cada
+        self.ventana_escritura = ventana_escritura if ventana_escritura is not None else 2 * max_lag
+
+        self.replicas = []
+        for i, extra in enumerate(replicas, 1):
+            # autocommit: cada SELECT es su propia transacción, sin ROLLBACK al devolver la conexión
+            config = {**self.primaria, 'autocommit': True, 'connection_timeout': 2, **extra}
+            self.replicas.append(Replica(f"replica_{i}", config))
+        self._turno = itertools.count()
+        self._local = threading.local()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    # --- enrutamiento ---
+
+    def aplica(self, config):
+        """True si las lecturas hechas con esta configuración pueden ir a una réplica"""
+        return config == self.primaria
+
+    def elegir(self, query):
+        """Réplica para esta lectura o None (leer de la primaria)"""
+        if getattr(self._local, 'forzar_primaria', 0) or self.pegado() or _BLOQUEANTE.search(query):
+            return None
+        sanas = [replica for replica in self.replicas if replica.sana]
+        if not sanas:
+            return None
+        return sanas[next(self._turno) % len(sanas)]
+
+    def registrar_lectura(self, replica, error=None):
+        """Cuenta la lectura; un error de conexión saca la réplica hasta el próximo chequeo"""
+        replica.lecturas += 1
+        if error is None:
+            return
+        replica.errores += 1
+        if replica.sana:
+            replica.sana = False
+            replica.motivo = 'error en lectura'
+            log.warning("Réplica fuera de rotación", extra={'replica': replica.nombre, 'error': str(error)})
+
+    # --- read-your-writes ---
+
+    def marcar_escritura(self):
+        """Este hilo escribió en la primaria: sus lecturas van a la primaria por ventana_escritura s"""
+        self._local.escribio = True
+        self._local.pegado_hasta = time.time() + self.ventana_escritura
+
+    def pegado(self):
+        return time.time() < getattr(self._local, 'pegado_hasta', 0)
+
+    def hubo_escritura(self):
+        return getattr(self._local, 'escribio', False)
+
+    def iniciar_hilo(self, pegado_hasta=0):
+        """Estado de un hilo que empieza un request (pegado_hasta viene de la cookie)"""
+        # Un valor manipulado no puede pegar al cliente más allá de la ventana
+        self._local.pegado_hasta = min(pegado_hasta, time.time() + self.ventana_escritura)
+        self._local.escribio = False
+
+    def estado_hilo(self):
+        """Estado de este hilo, para pasarlo a otro con adoptar (ver database/concurrencia.py)"""
+        return getattr(self._local, 'pegado_hasta', 0), getattr(self._local, 'forzar_primaria', 0)
+
+    def adoptar(self, estado):
+        self._local.pegado_hasta, self._local.forzar_primaria = estado or (0, 0)
+
+    def en_primaria(self):
+        """Contexto en el que todas las lecturas de este hilo van a la primaria"""
+        return _EnPrimaria(self)
+
+    # --- chequeos ---
+
+    def iniciar(self):
+        """Arranca el hilo que vigila las réplicas"""
+        if self._hilo is None:
+            for replica in self.replicas:
+                metricas.agregar_colector(replica.nombre, replica.estadisticas)
+            self._hilo = threading.Thread(target=self._vigilar, name='chequeo-replicas', daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.revisar_cada + 5)
+            self._hilo = None
+        for replica in self.replicas:
+            self._cerrar_control(replica)
+
+    def _vigilar(self):
+        while not self._detener.is_set():
+            for replica in self.replicas:
+                self.revisar(replica)
+            self._detener.wait(self.revisar_cada)
+
+    def revisar(self, replica):
+        """Chequea una réplica y la saca o devuelve a la rotación"""
+        try:
+            lag = self._medir_lag(replica)
+        except Error as e:
+            self._cerrar_control(replica)
+            self._actualizar(replica, False, None, f"sin conexión: {e}")
+            return
+
+        if lag is None:
+            self._actualizar(replica, False, None, 'replicación detenida')
+        elif lag > self.max_lag:
+            self._actualizar(replica, False, lag, 'atrasada')
+        elif replica.sana or lag <= self.max_lag / 2:
+            self._actualizar(replica, True, lag, 'ok')
+        else:
+            replica.lag = lag   # recuperándose: sigue fuera hasta bajar de max_lag / 2
+
+    def _medir_lag(self, replica):
+        if replica.control is None or not replica.control.is_connected():
+            replica.control = mysql.connector.connect(**replica.config)
+        cursor = replica.control.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error as e:
+                if e.errno != 1064:
+                    raise
+                # MySQL < 8.0.22 / MariaDB
+                cursor.execute("SHOW SLAVE STATUS")
+            estado = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not estado:
+            return None   # no está configurada como réplica
+        fila = estado[0]
+        return fila.get('Seconds_Behind_Source', fila.get('Seconds_Behind_Master'))
+
+    def _actualizar(self, replica, sana, lag, motivo):
+        if sana != replica.sana:
+            if sana:
+                log.info("Réplica en rotación", extra={'replica': replica.nombre, 'lag': lag})
+            else:
+                log.warning("Réplica fuera de rotación",
+                            extra={'replica': replica.nombre, 'lag': lag, 'motivo': motivo})
+        replica.sana, replica.lag, replica.motivo = sana, lag, motivo
+
+    @staticmethod
+    def _cerrar_control(replica):
+        conexion, replica.control = replica.control, None
+        if conexion is not None:
+            try:
+                conexion.close()
+            except Error:
+                pass
+
+    def estadisticas(self):
+        """Estado de cada réplica (para diagnóstico)"""
+        return {replica.nombre: {'host': replica.config.get('host'), 'port': replica.config.get('port'),
+                                 'motivo': replica.motivo, **replica.estadisticas()}
+                for replica in self.replicas}
+
+
+class _EnPrimaria:
+    def __init__(self, enrutador):
+        self.enrutador = enrutador
+
+    def __enter__(self):
+        local = self.enrutador._local
+        local.forzar_primaria = getattr(local, 'forzar_primaria', 0) + 1
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.enrutador._local.forzar_primaria -= 1
+        return False
+
+
+def en_primaria():
+    """
+    Contexto para leer de la primaria aunque haya réplicas (datos recién escritos por
+    otro proceso, p.ej. la sesión). Sin réplicas configuradas no hace nada.
+    """
+    enrutador = ConexionDB.enrutador
+    return enrutador.en_primaria() if enrutador is not None else _SinEfecto()
+
+
+class _SinEfecto:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        return False
+
+
+def configurar(replicas, **opciones):
+    """
+    Activa las réplicas para ConexionDB y arranca sus chequeos:
+    configurar([{'port': 3307}], max_lag=5)
+    Con una lista vacía se desactivan.
+    """
+    anterior = ConexionDB.enrutador
+    ConexionDB.enrutador = EnrutadorReplicas(replicas, **opciones).iniciar() if replicas else None
+    if anterior is not None:
+        anterior.detener()
+    return ConexionDB.enrutador
+
+
+def desde_entorno(valor=None):
+    """
+    Lista de réplicas desde TASKU_DB_REPLICAS ("host:puerto,host:puerto");
+    el puerto es opcional (3306).
+    """
+    valor = os.environ.get('TASKU_DB_REPLICAS', '') if valor is None else valor
+    replicas = []
+    for parte in valor.split(','):
+        parte = parte.strip()
+        if not parte:
+            continue
+        host, _, puerto = parte.partition(':')
+        replicas.append({'host': host, 'port': int(puerto or 3306)})
+    return replicas
+
+
+def init_app(app, replicas=None, **opciones):
+    """
+    Enrutamiento a réplicas para la app (replicas=None: TASKU_DB_REPLICAS).
+    La cookie tasku_rw lleva hasta cuándo el navegador lee de la primaria tras escribir,
+    así el redirect posterior a crear un evento lo ve aunque lo atienda otro worker.
+    """
+    enrutador = configurar(desde_entorno() if replicas is None else replicas, **opciones)
+    if enrutador is None:
+        return None
+
+    from flask import request
+
+    @app.before_request
+    def _iniciar_lecturas():
+        try:
+            pegado_hasta = float(request.cookies.get(COOKIE_ESCRITURA, 0))
+        except ValueError:
+            pegado_hasta = 0
+        enrutador.iniciar_hilo(pegado_hasta)
+
+    @app.after_request
+    def _marcar_escritura(response):
+        # Corre antes del commit de la unidad de trabajo (los after_request van en orden inverso)
+        if enrutador.hubo_escritura() and response.status_code < 500:
+            hasta = time.time() + enrutador.ventana_escritura
+            response.set_cookie(COOKIE_ESCRITURA, f"{hasta:.0f}", max_age=int(enrutador.ventana_escritura) + 1,
+                                httponly=True, samesite='Lax')
+        return response
+
+    return enrutador
@@ -0,0 +1,106 @@
+# sentencias.py
+# Registro de sentencias preparadas. Los modelos declaran sus consultas fijas una vez:
+#
+#     SQL_POR_ID = sentencia('usuario.por_id', "SELECT ... WHERE id = %s")
+#
+# y ConexionDB las ejecuta con cursores preparados (protocolo binario): MySQL las
+# analiza una sola vez por conexión del pool y cada llamada solo envía el id y los parámetros.
+
+import threading
+
+from mysql.connector import Error
+
+# Sentencia desconocida para el servidor (la conexión se reconectó y perdió las preparadas)
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+class Sentencia(str):
+    """SQL con nombre; al ser un str sirve igual en cualquier lugar que espere la consulta"""
+
+    def __new__(cls, nombre, sql):
+        sentencia = super().__new__(cls, sql)
+        sentencia.nombre = nombre
+        return sentencia
+
+
+class RegistroSentencias:
+    """
+    Sentencias declaradas y sus cursores preparados por conexión.
+    Los cursores viven en la propia conexión (se liberan con ella) junto a su
+    connection_id: si la conexión se reconectó, se preparan de nuevo.
+    """
+
+    def __init__(self):
+        self._sentencias = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def declarar(self, nombre, sql):
+        """Registra (o retorna, si ya existe con el mismo SQL) la sentencia `nombre`"""
+        with self._lock:
+            existente = self._sentencias.get(nombre)
+            if existente is not None:
+                if existente != sql:
+                    raise ValueError(f"Sentencia '{nombre}' ya declarada con otro SQL")
+                return existente
+            sentencia = Sentencia(nombre, sql)
+            self._sentencias[nombre] = sentencia
+            self._contadores[nombre] = {'ejecuciones': 0, 'preparaciones': 0, 'errores': 0}
+            return sentencia
+
+    def ejecutar(self, conexion, sentencia, params=None):
+        """Ejecuta la sentencia con su cursor preparado en esta conexión y retorna el cursor"""
+        try:
+            cursor = self._cursor(conexion, sentencia)
+            try:
+                cursor.execute(sentencia, tuple(params or ()))
+            except Error as e:
+                if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                    raise
+                # El servidor ya no la conoce: se descartan las de esta conexión y se prepara otra vez
+                conexion._tasku_sentencias = None
+                cursor = self._cursor(conexion, sentencia)
+                cursor.execute(sentencia, tuple(params or ()))
+        except Error:
+            self._contar(sentencia.nombre, 'errores')
+            raise
+        self._contar(sentencia.nombre, 'ejecuciones')
+        return cursor
+
+    def _cursor(self, conexion, sentencia):
+        cache = getattr(conexion, '_tasku_sentencias', None)
+        if cache is None or cache[0] != conexion.connection_id:
+            # Conexión nueva o reconectada: los ids de la sesión anterior no valen aquí
+            # (no se cierran: en la sesión nueva podrían ser de otra sentencia)
+            cache = (conexion.connection_id, {})
+            conexion._tasku_sentencias = cache
+        cursor = cache[1].get(sentencia.nombre)
+        if cursor is None:
+            cursor = conexion.cursor(prepared=True, dictionary=True)
+            cache[1][sentencia.nombre] = cursor
+            # Se prepara en el primer execute (la sentencia es el mismo objeto en cada llamada)
+            self._contar(sentencia.nombre, 'preparaciones')
+        return cursor
+
+    def _contar(self, nombre, clave):
+        with self._lock:
+            self._contadores[nombre][clave] += 1
+
+    def estadisticas(self):
+        """{nombre: {ejecuciones, preparaciones, errores}}"""
+        with self._lock:
+            return {nombre: dict(contadores) for nombre, contadores in self._contadores.items()}
+
+    def estadisticas_planas(self):
+        """Contadores como {'evento_urgentes_ejecuciones': n, ...} (colector de /metrics)"""
+        return {f"{nombre.replace('.', '_')}_{clave}": valor
+                for nombre, contadores in self.estadisticas().items()
+                for clave, valor in contadores.items()}
+
+
+registro = RegistroSentencias()
+
+
+def sentencia(nombre, sql):
+    """Declara una consulta fija en el registro (ver RegistroSentencias.declarar)"""
+    return registro.declarar(nombre, sql)
@@ -0,0 +1,287 @@
+# sesiones.py
+# Sesiones del lado del servidor: la cookie solo lleva un id firmado y los datos viven
+# en un almacén compartido por todos los workers (tabla `sesion` de MySQL o SQLite local).
+
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from database.conexion_db import ConexionDB
+from database.registro import obtener_logger
+from database.replicas import en_primaria
+from database.sentencias import sentencia
+
+log = obtener_logger('db.sesiones')
+
+
+def _clave(sid):
+    """En el almacén se guarda el hash del id: una copia de la tabla no sirve para suplantar sesiones"""
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+
+class AlmacenMySQL:
+    """Sesiones en la tabla `sesion` (ver db/00_init_schema.sql); sirve para varios servidores"""
+
+    # Se ejecutan en casi todos los requests: sentencias preparadas (database/sentencias.py)
+    SQL_CARGAR = sentencia('sesion.cargar', "SELECT datos, expira FROM sesion WHERE id = %s AND expira > %s")
+    SQL_GUARDAR = sentencia('sesion.guardar', """
+    INSERT INTO sesion (id, usuario_id, datos, expira) VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE usuario_id = VALUES(usuario_id), datos = VALUES(datos), expira = VALUES(expira)
+    """)
+    SQL_TOCAR = sentencia('sesion.tocar', "UPDATE sesion SET expira = %s WHERE id = %s")
+
+    def __init__(self, **config):
+        self.db = ConexionDB(**config)
+
+    def cargar(self, clave, ahora):
+        """(datos, expira) de la sesión vigente o None"""
+        self.db.conectar()
+        # De la primaria: una réplica atrasada no ve la sesión recién creada en el login
+        with en_primaria():
+            result = self.db.ejecutar_consulta(self.SQL_CARGAR, (clave, ahora))
+        self.db.desconectar()
+        return (result[0]['datos'], result[0]['expira']) if result else None
+
+    def guardar(self, clave, datos, usuario_id, expira):
+        self.db.conectar()
+        self.db.ejecutar_accion(self.SQL_GUARDAR, (clave, usuario_id, datos, expira))
+        self.db.desconectar()
+
+    def tocar(self, clave, expira):
+        self.db.conectar()
+        self.db.ejecutar_accion(self.SQL_TOCAR, (expira, clave))
+        self.db.desconectar()
+
+    def eliminar(self, clave):
+        self.db.conectar()
+        self.db.ejecutar_accion("DELETE FROM sesion WHERE id = %s", (clave,))
+        self.db.desconectar()
+
+    def eliminar_de_usuario(self, usuario_id):
+        """Cierra todas las sesiones de un usuario (p.ej. al cambiar la contraseña)"""
+        self.db.conectar()
+        self.db.ejecutar_accion("DELETE FROM sesion WHERE usuario_id = %s", (usuario_id,))
+        self.db.desconectar()
+
+    def limpiar_vencidas(self, ahora, lote):
+        """Borra hasta `lote` sesiones vencidas; retorna cuántas borró"""
+        self.db.conectar()
+        borradas = 0
+        if self.db.ejecutar_accion("DELETE FROM sesion WHERE expira <= %s LIMIT %s", (ahora, lote)):
+            borradas = self.db.cursor.rowcount
+        self.db.desconectar()
+        return borradas
+
+
+class AlmacenSQLite:
+    """
+    Sesiones en un archivo SQLite local, compartido por los workers de una misma
+    máquina (en /dev/shm queda en memoria compartida). Una conexión por hilo.
+    """
+
+    ESQUEMA = """
+    CREATE TABLE IF NOT EXISTS sesion (
+        id TEXT PRIMARY KEY,
+        usuario_id INTEGER,
+        datos TEXT NOT NULL,
+        expira INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sesion_expira ON sesion (expira);
+    CREATE INDEX IF NOT EXISTS idx_sesion_usuario ON sesion (usuario_id);
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexion().executescript(self.ESQUEMA)
+
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            # autocommit: cada sentencia es su propia transacción corta
+            conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def cargar(self, clave, ahora):
+        fila = self._conexion().execute(
+            "SELECT datos, expira FROM sesion WHERE id = ? AND expira > ?", (clave, ahora)).fetchone()
+        return (fila[0], fila[1]) if fila else None
+
+    def guardar(self, clave, datos, usuario_id, expira):
+        self._conexion().execute(
+            "INSERT INTO sesion (id, usuario_id, datos, expira) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET usuario_id = excluded.usuario_id, datos = excluded.datos, "
+            "expira = excluded.expira", (clave, usuario_id, datos, expira))
+
+    def tocar(self, clave, expira):
+        self._conexion().execute("UPDATE sesion SET expira = ? WHERE id = ?", (expira, clave))
+
+    def eliminar(self, clave):
+        self._conexion().execute("DELETE FROM sesion WHERE id = ?", (clave,))
+
+    def eliminar_de_usuario(self, usuario_id):
+        self._conexion().execute("DELETE FROM sesion WHERE usuario_id = ?", (usuario_id,))
+
+    def limpiar_vencidas(self, ahora, lote):
+        cursor = self._conexion().execute(
+            "DELETE FROM sesion WHERE id IN (SELECT id FROM sesion WHERE expira <= ? LIMIT ?)", (ahora, lote))
+        return cursor.rowcount
+
+
+class SesionServidor(CallbackDict, SessionMixin):
+    """Datos de la sesión; `modified` se activa con cualquier escritura"""
+
+    def __init__(self, datos=None, sid=None, expira=None):
+        def al_modificar(sesion):
+            sesion.modified = True
+
+        super().__init__(datos, al_modificar)
+        self.sid = sid
+        self.expira = expira
+        self.sid_anterior = None
+        self.modified = False
+
+    @property
+    def new(self):
+        return self.sid is None
+
+    def regenerar(self):
+        """Cambia el id conservando los datos (al iniciar sesión, contra fijación de sesión)"""
+        if self.sid is not None:
+            self.sid_anterior = self.sid
+        self.sid = None
+        self.modified = True
+
+
+class InterfazSesiones(SessionInterface):
+    """
+    SessionInterface de Flask sobre un almacén (AlmacenMySQL / AlmacenSQLite).
+    - Expiración deslizante: cada request la extiende a permanent_session_lifetime,
+      pero el almacén solo se actualiza si pasaron más de `renovar_cada` segundos.
+    - Las sesiones vencidas se borran en lotes, en segundo plano, cada `limpiar_cada` segundos.
+    - Las rutas de `sin_sesion` (estáticos) no leen el almacén.
+    """
+
+    serializador = TaggedJSONSerializer()
+    # Flask abre la sesión antes de resolver el endpoint: se filtra por prefijo de ruta
+    sin_sesion = ('/static/',)
+
+    def __init__(self, almacen, renovar_cada=300, limpiar_cada=600, lote_limpieza=1000):
+        self.almacen = almacen
+        self.renovar_cada = renovar_cada
+        self.limpiar_cada = limpiar_cada
+        self.lote_limpieza = lote_limpieza
+        self._proxima_limpieza = time.monotonic() + limpiar_cada
+        self._limpiando = threading.Lock()
+
+    def _firmador(self, app):
+        return Signer(app.secret_key, salt='tasku-sesion', key_derivation='hmac')
+
+    def open_session(self, app, request):
+        if request.path.startswith(self.sin_sesion):
+            return self.make_null_session(app)
+        token = request.cookies.get(self.get_cookie_name(app))
+        if token:
+            try:
+                sid = self._firmador(app).unsign(token).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                fila = self.almacen.cargar(_clave(sid), int(time.time()))
+                if fila is not None:
+                    datos, expira = fila
+                    try:
+                        return SesionServidor(self.serializador.loads(datos), sid, expira)
+                    except ValueError:
+                        log.warning("Sesión con datos ilegibles: se descarta")
+        return SesionServidor()
+
+    def save_session(self, app, session, response):
+        nombre = self.get_cookie_name(app)
+        dominio = self.get_cookie_domain(app)
+        ruta = self.get_cookie_path(app)
+
+        if session.sid_anterior:
+            self.almacen.eliminar(_clave(session.sid_anterior))
+            session.sid_anterior = None
+
+        if not session:
+            # Sesión vaciada (logout): se borra del almacén y del navegador
+            if session.sid is not None:
+                self.almacen.eliminar(_clave(session.sid))
+                response.delete_cookie(nombre, domain=dominio, path=ruta)
+            return
+
+        response.vary.add('Cookie')
+        ahora = int(time.time())
+        vida = int(app.permanent_session_lifetime.total_seconds())
+        expira = ahora + vida
+        enviar_cookie = False
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+            self._guardar(session, expira)
+            enviar_cookie = True
+        elif session.modified:
+            self._guardar(session, expira)
+            enviar_cookie = session.permanent
+        elif session.expira is None or expira - session.expira >= self.renovar_cada:
+            self.almacen.tocar(_clave(session.sid), expira)
+            enviar_cookie = session.permanent
+
+        if enviar_cookie:
+            response.set_cookie(
+                nombre,
+                self._firmador(app).sign(session.sid).decode(),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=dominio,
+                path=ruta,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+        self._quizas_limpiar()
+
+    def _guardar(self, session, expira):
+        self.almacen.guardar(_clave(session.sid), self.serializador.dumps(dict(session)),
+                             session.get('user_id'), expira)
+        session.expira = expira
+
+    def _quizas_limpiar(self):
+        if time.monotonic() < self._proxima_limpieza or not self._limpiando.acquire(blocking=False):
+            return
+        self._proxima_limpieza = time.monotonic() + self.limpiar_cada
+        threading.Thread(target=self._limpiar, name='limpieza-sesiones', daemon=True).start()
+
+    def _limpiar(self):
+        try:
+            total = 0
+            while True:
+                borradas = self.almacen.limpiar_vencidas(int(time.time()), self.lote_limpieza)
+                total += borradas
+                if borradas < self.lote_limpieza:
+                    break
+                time.sleep(0.1)   # lotes cortos: no retener locks de la tabla
+            if total:
+                log.info("Sesiones vencidas eliminadas", extra={'cantidad': total})
+        except Exception as e:
+            log.warning("Error limpiando sesiones vencidas", extra={'error': str(e)})
+        finally:
+            self._limpiando.release()
+
+
+def init_app(app, almacen=None, **kwargs):
+    """Instala las sesiones del servidor (por defecto en MySQL)"""
+    app.session_interface = InterfazSesiones(almacen or AlmacenMySQL(), **kwargs)
+    return app.session_interface
@@ -100,6 +100,9 @@ INSERT INTO asignatura (nombre, codigo, color) VALUES
 ('Algoritmos y Estructuras', 'INF-305', '#ffc107');
 
 -- Índices para mejorar performance
-CREATE INDEX idx_evento_usuario ON evento(usuario_id);
+CREATE INDEX idx_evento_usuario_fecha ON evento(usuario_id, fecha_limite);
 CREATE INDEX idx_evento_fecha ON evento(fecha_limite);
-CREATE INDEX idx_notificacion_usuario ON notificacion(usuario_id, leida);
\ No newline at end of file
+CREATE INDEX idx_evento_usuario_estado_fecha ON evento(usuario_id, estado, fecha_limite);
+CREATE FULLTEXT INDEX ft_evento_texto ON evento(titulo, descripcion);
+CREATE INDEX idx_notificacion_usuario ON notificacion(usuario_id, leida, fecha_programada);
+CREATE INDEX idx_notificacion_leida_fecha ON notificacion(leida, fecha_programada);
\ No newline at end of file
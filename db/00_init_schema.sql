@@ -31,7 +31,9 @@ CREATE TABLE IF NOT EXISTS usuario (
     token_recuperacion VARCHAR(255),
     fecha_expiracion_token DATETIME,
     email_lc VARCHAR(100) GENERATED ALWAYS AS (LOWER(email)) STORED,
-    UNIQUE KEY ux_usuario_email_lc (email_lc)
+    token_calendario VARCHAR(64),
+    UNIQUE KEY ux_usuario_email_lc (email_lc),
+    UNIQUE KEY ux_usuario_token_calendario (token_calendario)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 CREATE TABLE IF NOT EXISTS asignatura (
@@ -61,31 +63,92 @@ CREATE TABLE IF NOT EXISTS evento (
     prioridad ENUM('baja','media','alta') NOT NULL DEFAULT 'media',
     estado ENUM('pendiente','completada') NOT NULL DEFAULT 'pendiente',
     fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    fecha_actualizacion TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP(6) NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6),
     asignatura_id INT NULL,
     usuario_id INT NOT NULL,
     tipo ENUM('tarea','evaluacion','evento') NOT NULL,
     profesor VARCHAR(100),
-    KEY idx_evento_usuario (usuario_id),
+    -- (usuario_id, fecha_limite): rangos de calendario por usuario sin recorrer todos sus eventos
+    KEY idx_evento_usuario_fecha (usuario_id, fecha_limite),
+    -- Urgentes / próximas a vencer / páginas por estado: solo las pendientes, ya ordenadas por fecha
+    KEY idx_evento_usuario_estado_fecha (usuario_id, estado, fecha_limite),
     KEY idx_evento_asignatura (asignatura_id),
     KEY idx_evento_fecha (fecha_limite),
+    -- Búsqueda de texto (EventoModel.buscar); siempre junto a usuario_id = ?
+    FULLTEXT KEY ft_evento_texto (titulo, descripcion),
     CONSTRAINT fk_evento_asignatura FOREIGN KEY (asignatura_id)
         REFERENCES asignatura(id) ON DELETE SET NULL ON UPDATE RESTRICT,
     CONSTRAINT fk_evento_usuario FOREIGN KEY (usuario_id)
         REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Eventos que se repiten (clases, laboratorios): la regla se guarda una vez y las
+-- ocurrencias se calculan al leer (models/recurrencia.py, utils/recurrencia.py).
+-- `fin` es la última ocurrencia posible (NULL: sin fin) para filtrar por rango.
+CREATE TABLE IF NOT EXISTS evento_recurrencia (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    titulo VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    prioridad ENUM('baja','media','alta') NOT NULL DEFAULT 'media',
+    tipo ENUM('tarea','evaluacion','evento') NOT NULL,
+    profesor VARCHAR(100),
+    inicio DATETIME NOT NULL,
+    regla VARCHAR(255) NOT NULL,
+    fin DATETIME NULL,
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    asignatura_id INT NULL,
+    usuario_id INT NOT NULL,
+    -- Series del usuario que tocan un rango: inicio < hasta AND (fin IS NULL OR fin >= desde)
+    KEY idx_recurrencia_usuario_inicio (usuario_id, inicio),
+    CONSTRAINT fk_recurrencia_asignatura FOREIGN KEY (asignatura_id)
+        REFERENCES asignatura(id) ON DELETE SET NULL ON UPDATE RESTRICT,
+    CONSTRAINT fk_recurrencia_usuario FOREIGN KEY (usuario_id)
+        REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Excepciones de una serie: solo existen las ocurrencias completadas, movidas
+-- (fecha_limite distinta de la original) o canceladas.
+CREATE TABLE IF NOT EXISTS evento_ocurrencia (
+    recurrencia_id INT NOT NULL,
+    fecha_original DATETIME NOT NULL,
+    estado ENUM('pendiente','completada','cancelada') NOT NULL DEFAULT 'pendiente',
+    fecha_limite DATETIME NULL,                    -- NULL: en su fecha original
+    usuario_id INT NOT NULL,
+    PRIMARY KEY (recurrencia_id, fecha_original),
+    -- Excepciones del usuario en un rango, por fecha original o por fecha movida
+    KEY idx_ocurrencia_usuario_original (usuario_id, fecha_original),
+    KEY idx_ocurrencia_usuario_movida (usuario_id, fecha_limite),
+    CONSTRAINT fk_ocurrencia_recurrencia FOREIGN KEY (recurrencia_id)
+        REFERENCES evento_recurrencia(id) ON DELETE CASCADE ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 CREATE TABLE IF NOT EXISTS notificacion (
     id INT AUTO_INCREMENT PRIMARY KEY,
-    tipo ENUM('recordatorio','aviso','otro') NOT NULL,
+    tipo ENUM('recordatorio','recordatorio_24h','urgencia','aviso','otro') NOT NULL,
     mensaje TEXT,
     fecha_programada DATETIME,
     fecha_enviada DATETIME,
     leida TINYINT(1) NOT NULL DEFAULT 0,
     evento_id INT,
+    -- Recordatorio de una serie: solo existe el de su próxima ocurrencia
+    recurrencia_id INT NULL,
+    fecha_ocurrencia DATETIME NULL,
+    usuario_id INT NOT NULL,
     KEY idx_notif_evento (evento_id),
+    KEY idx_notif_recurrencia (recurrencia_id, fecha_enviada),
+    -- No leídas del usuario en orden (NotificacionModel.obtener_pendientes)
+    KEY idx_notif_usuario_leida (usuario_id, leida, fecha_programada),
+    -- Limpieza de leídas antiguas (eliminar_notificaciones_viejas)
+    KEY idx_notif_leida_fecha (leida, fecha_programada),
+    -- Cola del despachador: WHERE fecha_enviada IS NULL AND fecha_programada <= NOW()
+    KEY idx_notif_despacho (fecha_enviada, fecha_programada),
     CONSTRAINT fk_notif_evento FOREIGN KEY (evento_id)
-        REFERENCES evento(id) ON DELETE CASCADE ON UPDATE RESTRICT
+        REFERENCES evento(id) ON DELETE CASCADE ON UPDATE RESTRICT,
+    CONSTRAINT fk_notif_recurrencia FOREIGN KEY (recurrencia_id)
+        REFERENCES evento_recurrencia(id) ON DELETE CASCADE ON UPDATE RESTRICT,
+    CONSTRAINT fk_notif_usuario FOREIGN KEY (usuario_id)
+        REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 CREATE TABLE IF NOT EXISTS configuracion (
@@ -100,6 +163,69 @@ CREATE TABLE IF NOT EXISTS configuracion (
         REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Sesiones del lado del servidor (database/sesiones.py). id = SHA-256 del id de la cookie;
+-- expira en segundos UNIX, se desliza con cada request.
+CREATE TABLE IF NOT EXISTS sesion (
+    id CHAR(64) NOT NULL PRIMARY KEY,
+    usuario_id INT NULL,
+    datos TEXT NOT NULL,
+    expira INT UNSIGNED NOT NULL,
+    KEY idx_sesion_expira (expira),
+    KEY idx_sesion_usuario (usuario_id),
+    CONSTRAINT fk_sesion_usuario FOREIGN KEY (usuario_id)
+        REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Contadores de eventos por usuario (EventoModel.estadisticas_usuario), mantenidos por los
+-- triggers trg_evento_*_estadisticas. Lo que depende de la hora (vencidas, próximas a vencer)
+-- se calcula al leer. services/estadisticas.py corrige cualquier desvío.
+CREATE TABLE IF NOT EXISTS usuario_estadisticas (
+    usuario_id INT NOT NULL PRIMARY KEY,
+    total INT NOT NULL DEFAULT 0,
+    completadas INT NOT NULL DEFAULT 0,
+    pendientes INT NOT NULL DEFAULT 0,
+    urgentes INT NOT NULL DEFAULT 0,              -- pendientes con prioridad alta
+    pendientes_sin_fecha INT NOT NULL DEFAULT 0,
+    CONSTRAINT fk_estadisticas_usuario FOREIGN KEY (usuario_id)
+        REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Eventos completados antiguos movidos fuera de `evento` por services/retencion.py
+-- (mismas columnas y mismo id). Se consultan con EventoModel.obtener_archivados.
+-- db/03_particiones.sql la particiona por semestre (opcional).
+CREATE TABLE IF NOT EXISTS evento_archivo (
+    id INT NOT NULL,
+    titulo VARCHAR(255) NOT NULL,
+    descripcion TEXT,
+    fecha_limite DATETIME,
+    prioridad ENUM('baja','media','alta') NOT NULL DEFAULT 'media',
+    estado ENUM('pendiente','completada') NOT NULL DEFAULT 'pendiente',
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP(6) NULL DEFAULT NULL,
+    asignatura_id INT NULL,
+    usuario_id INT NOT NULL,
+    tipo ENUM('tarea','evaluacion','evento') NOT NULL,
+    profesor VARCHAR(100),
+    -- COALESCE(fecha_limite, fecha_creacion): la fecha por la que se archivó (clave de partición)
+    fecha_referencia DATE NOT NULL,
+    fecha_archivado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, fecha_referencia),
+    -- Historial archivado del usuario, más reciente primero (EventoModel.obtener_archivados)
+    KEY idx_archivo_usuario_referencia (usuario_id, fecha_referencia),
+    CONSTRAINT fk_archivo_usuario FOREIGN KEY (usuario_id)
+        REFERENCES usuario(id) ON DELETE CASCADE ON UPDATE RESTRICT
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Avance de los trabajos de services/retencion.py: un trabajo interrumpido sigue desde
+-- ultimo_id con el mismo corte. Se guarda en la misma transacción que cada lote.
+CREATE TABLE IF NOT EXISTS retencion_progreso (
+    trabajo VARCHAR(50) NOT NULL PRIMARY KEY,
+    corte DATETIME NOT NULL,
+    ultimo_id INT NOT NULL,
+    filas BIGINT NOT NULL DEFAULT 0,
+    actualizado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- =======================
 -- Triggers
 -- =======================
@@ -126,6 +252,70 @@ BEGIN
 END//
 DELIMITER ;
 
+-- Suma (p_signo = 1) o resta (-1) un evento a los contadores de su usuario
+DROP PROCEDURE IF EXISTS sp_estadisticas_sumar;
+DELIMITER //
+CREATE PROCEDURE sp_estadisticas_sumar(
+  IN p_usuario_id INT,
+  IN p_signo INT,
+  IN p_estado VARCHAR(20),
+  IN p_prioridad VARCHAR(10),
+  IN p_fecha_limite DATETIME
+)
+BEGIN
+  INSERT INTO usuario_estadisticas
+    (usuario_id, total, completadas, pendientes, urgentes, pendientes_sin_fecha)
+  VALUES
+    (p_usuario_id, p_signo,
+     p_signo * (p_estado = 'completada'),
+     p_signo * (p_estado = 'pendiente'),
+     p_signo * (p_estado = 'pendiente' AND p_prioridad = 'alta'),
+     p_signo * (p_estado = 'pendiente' AND p_fecha_limite IS NULL))
+  ON DUPLICATE KEY UPDATE
+    total = total + VALUES(total),
+    completadas = completadas + VALUES(completadas),
+    pendientes = pendientes + VALUES(pendientes),
+    urgentes = urgentes + VALUES(urgentes),
+    pendientes_sin_fecha = pendientes_sin_fecha + VALUES(pendientes_sin_fecha);
+END//
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_evento_ai_estadisticas;
+DELIMITER //
+CREATE TRIGGER trg_evento_ai_estadisticas
+AFTER INSERT ON evento
+FOR EACH ROW
+BEGIN
+  CALL sp_estadisticas_sumar(NEW.usuario_id, 1, NEW.estado, NEW.prioridad, NEW.fecha_limite);
+END//
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_evento_au_estadisticas;
+DELIMITER //
+CREATE TRIGGER trg_evento_au_estadisticas
+AFTER UPDATE ON evento
+FOR EACH ROW
+BEGIN
+  -- Editar título, descripción o mover la fecha (sin quitarla) no cambia los contadores
+  IF NOT (OLD.usuario_id <=> NEW.usuario_id AND OLD.estado <=> NEW.estado
+          AND OLD.prioridad <=> NEW.prioridad
+          AND (OLD.fecha_limite IS NULL) = (NEW.fecha_limite IS NULL)) THEN
+    CALL sp_estadisticas_sumar(OLD.usuario_id, -1, OLD.estado, OLD.prioridad, OLD.fecha_limite);
+    CALL sp_estadisticas_sumar(NEW.usuario_id, 1, NEW.estado, NEW.prioridad, NEW.fecha_limite);
+  END IF;
+END//
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_evento_ad_estadisticas;
+DELIMITER //
+CREATE TRIGGER trg_evento_ad_estadisticas
+AFTER DELETE ON evento
+FOR EACH ROW
+BEGIN
+  CALL sp_estadisticas_sumar(OLD.usuario_id, -1, OLD.estado, OLD.prioridad, OLD.fecha_limite);
+END//
+DELIMITER ;
+
 -- =======================
 -- Views y SPs
 -- =======================
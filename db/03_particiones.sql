@@ -0,0 +1,32 @@
+-- 03_particiones.sql (opcional)
+-- Particiona evento_archivo por semestre de fecha_referencia. Borrar un semestre
+-- entero pasa a ser DROP PARTITION (instantáneo) en lugar de un DELETE por lotes.
+--
+-- `evento` no se particiona: MySQL no permite particionar tablas con índices FULLTEXT
+-- (ft_evento_texto) ni con claves foráneas, y notificacion la referencia. Para que
+-- `evento` no crezca sin límite se usa el archivo (python -m services.retencion).
+--
+-- Una tabla particionada tampoco admite claves foráneas: se quita fk_archivo_usuario.
+-- Sin ella, borrar un usuario no borra su archivo:
+--     DELETE FROM evento_archivo WHERE usuario_id = ?
+USE tasku;
+
+ALTER TABLE evento_archivo DROP FOREIGN KEY fk_archivo_usuario;
+
+ALTER TABLE evento_archivo
+PARTITION BY RANGE COLUMNS (fecha_referencia) (
+    PARTITION p2024s1 VALUES LESS THAN ('2024-07-01'),
+    PARTITION p2024s2 VALUES LESS THAN ('2025-01-01'),
+    PARTITION p2025s1 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p2025s2 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p2026s1 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p2026s2 VALUES LESS THAN ('2027-01-01'),
+    PARTITION pfuturo VALUES LESS THAN (MAXVALUE)
+);
+
+-- Cada semestre: separar el siguiente desde pfuturo...
+--   ALTER TABLE evento_archivo REORGANIZE PARTITION pfuturo INTO (
+--       PARTITION p2027s1 VALUES LESS THAN ('2027-07-01'),
+--       PARTITION pfuturo VALUES LESS THAN (MAXVALUE));
+-- ...y descartar el más antiguo fuera de la retención:
+--   ALTER TABLE evento_archivo DROP PARTITION p2024s1;
@@ -58,7 +58,7 @@ CREATE TABLE IF NOT EXISTS evento (
   tipo ENUM('tarea','evaluacion','evento') NOT NULL,
   profesor VARCHAR(100) NULL,
   fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  fecha_actualizacion TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+  fecha_actualizacion TIMESTAMP(6) NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6),
   usuario_id INT NOT NULL,
   asignatura_id INT NULL,
   KEY idx_evento_usuario (usuario_id),
@@ -1,8 +1,19 @@
 # models/asignatura.py
-from database.conexion_db import ConexionDB
+from database.conexion_db import ConexionDB, al_confirmar
+from database.metricas import metricas
+from database.registro import obtener_logger
+from utils.cache import CacheLRU
+
+log = obtener_logger('models.asignatura')
 
 class AsignaturaModel:
-    """Modelo para gestión de asignaturas INACAP"""
+    """
+    Modelo para gestión de asignaturas INACAP.
+    El catálogo casi no cambia durante el semestre: las lecturas pasan por una
+    caché en memoria (compartida por todas las instancias) que las escrituras invalidan.
+    """
+    
+    cache = CacheLRU(max_items=2048, ttl=600)
     
     def __init__(self):
         self.db = ConexionDB()
@@ -18,13 +29,17 @@ class AsignaturaModel:
             self.db.ejecutar_accion(query, (nombre, codigo, color, icono))
             asignatura_id = self.db.obtener_ultimo_id()
             self.db.desconectar()
+            al_confirmar(self.invalidar_catalogo)
             return asignatura_id
         except Exception as e:
-            print(f"❌ Error creando asignatura: {e}")
+            log.error("Error creando asignatura", extra={'error': str(e)})
             return None
     
     def obtener_todas(self):
         """Obtiene todas las asignaturas disponibles"""
+        return self.cache.obtener_o_cargar('todas', self._consultar_todas)
+    
+    def _consultar_todas(self):
         query = "SELECT * FROM asignatura ORDER BY nombre"
         
         self.db.conectar()
@@ -34,14 +49,55 @@ class AsignaturaModel:
         return result
     
     def obtener_por_id(self, asignatura_id):
-        """Obtiene una asignatura específica"""
-        query = "SELECT * FROM asignatura WHERE id = %s"
-        
-        self.db.conectar()
-        result = self.db.ejecutar_consulta(query, (asignatura_id,))
-        self.db.desconectar()
-        
-        return result[0] if result else None
+        """Obtiene una asignatura específica (desde el catálogo cacheado)"""
+        return (self.catalogo() or {}).get(asignatura_id)
+    
+    def catalogo(self):
+        """Diccionario id -> asignatura armado a partir de obtener_todas()"""
+        return self.cache.obtener_o_cargar('catalogo', self._armar_catalogo)
+    
+    def _armar_catalogo(self):
+        todas = self.obtener_todas()
+        if todas is None:
+            return None
+        return {a['id']: a for a in todas}
+    
+    def decorar(self, eventos):
+        """
+        Agrega asignatura_nombre / asignatura_codigo / asignatura_color a filas de evento
+        desde el catálogo cacheado, en lugar de hacer JOIN con asignatura en cada consulta.
+        """
+        catalogo = self.catalogo() or {}
+        if any(e.get('asignatura_id') not in catalogo for e in eventos if e.get('asignatura_id')):
+            # Asignatura creada desde otro proceso: se recarga el catálogo una vez
+            self.invalidar_catalogo()
+            catalogo = self.catalogo() or {}
+        for evento in eventos:
+            self._decorar_fila(evento, catalogo)
+        return eventos
+    
+    def decorar_iterando(self, eventos):
+        """Igual que decorar(), pero fila a fila para los generadores en streaming"""
+        catalogo = self.catalogo() or {}
+        recargado = False
+        for evento in eventos:
+            if evento.get('asignatura_id') and evento['asignatura_id'] not in catalogo and not recargado:
+                self.invalidar_catalogo()
+                catalogo = self.catalogo() or {}
+                recargado = True
+            yield self._decorar_fila(evento, catalogo)
+    
+    @staticmethod
+    def _decorar_fila(evento, catalogo):
+        asignatura = catalogo.get(evento.get('asignatura_id')) or {}
+        evento['asignatura_nombre'] = asignatura.get('nombre')
+        evento['asignatura_codigo'] = asignatura.get('codigo')
+        evento['asignatura_color'] = asignatura.get('color')
+        return evento
+    
+    def invalidar_catalogo(self):
+        self.cache.invalidar('todas')
+        self.cache.invalidar('catalogo')
     
     def asignar_a_usuario(self, usuario_id, asignatura_id):
         """Asocia una asignatura a un usuario"""
@@ -54,13 +110,18 @@ class AsignaturaModel:
             self.db.conectar()
             success = self.db.ejecutar_accion(query, (usuario_id, asignatura_id))
             self.db.desconectar()
+            al_confirmar(lambda: self.cache.invalidar(('usuario', usuario_id)))
             return success
         except Exception as e:
-            print(f"❌ Error asignando asignatura: {e}")
+            log.error("Error asignando asignatura", extra={'error': str(e)})
             return False
     
     def obtener_por_usuario(self, usuario_id):
         """Obtiene las asignaturas de un usuario específico"""
+        return self.cache.obtener_o_cargar(('usuario', usuario_id),
+                                           lambda: self._consultar_por_usuario(usuario_id))
+    
+    def _consultar_por_usuario(self, usuario_id):
         query = """
         SELECT a.* FROM asignatura a
         INNER JOIN usuario_has_asignatura ua ON a.id = ua.asignatura_id
@@ -81,4 +142,13 @@ class AsignaturaModel:
         self.db.conectar()
         success = self.db.ejecutar_accion(query, (asignatura_id,))
         self.db.desconectar()
-        return success
\ No newline at end of file
+        # La asignatura puede estar en cualquier lista por usuario: se vacía todo
+        al_confirmar(self.cache.limpiar)
+        return success
+    
+    def estadisticas_cache(self):
+        """Aciertos / fallos de la caché de asignaturas"""
+        return self.cache.estadisticas()
+
+
+metricas.agregar_colector('cache_asignaturas', AsignaturaModel.cache.estadisticas)
@@ -1,12 +1,117 @@
 # models/evento.py CORREGIDO
-from database.conexion_db import ConexionDB
-from datetime import datetime, timedelta
+from database.conexion_db import ConexionDB, transaccion
+from database.sentencias import sentencia
+from mysql.connector import Error
+import itertools
+from datetime import date, datetime, timedelta
+from utils.cambios import registrar_cambio
+from utils.busqueda import consulta_booleana, terminos
+from utils.paginacion import codificar_cursor, decodificar_cursor
+from models.asignatura import AsignaturaModel
+from models.recurrencia import RecurrenciaModel
+from database.registro import obtener_logger
+
+log = obtener_logger('models.evento')
 
 class EventoModel:
     """Modelo para tareas, exámenes, proyectos y eventos académicos"""
     
+    # Consultas fijas como sentencias preparadas (database/sentencias.py); las tres
+    # primeras también las usa services/dashboard_service.py.
+    # Los datos de la asignatura (nombre, color) se agregan desde la caché de
+    # AsignaturaModel con decorar(), sin JOIN.
+    SQL_URGENTES = sentencia('evento.urgentes', """
+    SELECT e.*
+    FROM evento e
+    WHERE e.usuario_id = %s 
+    AND e.estado = 'pendiente'
+    AND fecha_limite <= DATE_ADD(NOW(), INTERVAL 48 HOUR)
+    ORDER BY fecha_limite ASC
+    LIMIT 10
+    """)
+    SQL_PROXIMAS_VENCER = sentencia('evento.proximas_vencer', """
+    SELECT e.*
+    FROM evento e
+    WHERE e.usuario_id = %s 
+    AND e.estado = 'pendiente'
+    AND fecha_limite BETWEEN NOW() AND DATE_ADD(NOW(), INTERVAL %s HOUR)
+    ORDER BY fecha_limite ASC
+    """)
+    # Contadores de usuario_estadisticas (los mantienen triggers) más un rango acotado:
+    # las pendientes desde ahora (idx_evento_usuario_estado_fecha). Las vencidas son las
+    # pendientes con fecha que no están en ese rango. Parámetros: (usuario_id, usuario_id)
+    SQL_ESTADISTICAS = sentencia('evento.estadisticas', """
+    SELECT
+        s.total,
+        s.completadas,
+        s.pendientes,
+        s.pendientes - s.pendientes_sin_fecha - f.futuras as vencidas,
+        s.urgentes,
+        f.proximas_vencer
+    FROM usuario_estadisticas s
+    CROSS JOIN (
+        SELECT COUNT(*) as futuras,
+               COALESCE(SUM(fecha_limite <= DATE_ADD(NOW(), INTERVAL 48 HOUR)), 0) as proximas_vencer
+        FROM evento
+        WHERE usuario_id = %s
+        AND estado = 'pendiente'
+        AND fecha_limite >= NOW()
+    ) f
+    WHERE s.usuario_id = %s
+    """)
+    SQL_CREAR = sentencia('evento.crear', """
+    INSERT INTO evento (titulo, descripcion, fecha_limite, prioridad, tipo, usuario_id, asignatura_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """)
+    SQL_COMPLETAR = sentencia('evento.completar', """
+    UPDATE evento 
+    SET estado = 'completada', fecha_actualizacion = NOW(6)
+    WHERE id = %s AND usuario_id = %s
+    """)
+    SQL_ELIMINAR = sentencia('evento.eliminar', "DELETE FROM evento WHERE id = %s AND usuario_id = %s")
+    SQL_PROPIETARIO = sentencia('evento.propietario', "SELECT usuario_id FROM evento WHERE id = %s")
+    # Rango semiabierto sobre la columna sin funciones: usa idx_evento_usuario_fecha
+    SQL_POR_RANGO = sentencia('evento.por_rango', """
+    SELECT e.*
+    FROM evento e
+    WHERE e.usuario_id = %s
+    AND e.fecha_limite >= %s
+    AND e.fecha_limite < %s
+    ORDER BY e.fecha_limite ASC
+    """)
+    # Eventos y series del usuario (una excepción de ocurrencia actualiza su serie).
+    # Parámetros: (usuario_id, usuario_id)
+    SQL_ULTIMA_MODIFICACION = sentencia('evento.ultima_modificacion', """
+    SELECT GREATEST(COALESCE(e.ultima, r.ultima), COALESCE(r.ultima, e.ultima)) as ultima,
+           e.total + r.total as total
+    FROM (
+        SELECT MAX(COALESCE(fecha_actualizacion, fecha_creacion)) as ultima, COUNT(*) as total
+        FROM evento
+        WHERE usuario_id = %s
+    ) e
+    CROSS JOIN (
+        SELECT MAX(fecha_actualizacion) as ultima, COUNT(*) as total
+        FROM evento_recurrencia
+        WHERE usuario_id = %s
+    ) r
+    """)
+
+    # Columnas que se pueden modificar (actualizar_evento / aplicar_lote), en orden de SET
+    CAMPOS_EDITABLES = ('titulo', 'descripcion', 'fecha_limite', 'prioridad', 'estado', 'tipo', 'asignatura_id')
+    VALORES_ENUM = {
+        'prioridad': ('baja', 'media', 'alta'),
+        'estado': ('pendiente', 'completada'),
+        'tipo': ('tarea', 'evaluacion', 'evento'),
+    }
+    MAX_LOTE = 200
+    # Columnas comunes de evento y evento_archivo (archivar_lote)
+    COLUMNAS_ARCHIVO = ('id, titulo, descripcion, fecha_limite, prioridad, estado, fecha_creacion, '
+                        'fecha_actualizacion, asignatura_id, usuario_id, tipo, profesor')
+
     def __init__(self):
         self.db = ConexionDB()
+        self.asignaturas = AsignaturaModel()
+        self.recurrencias = RecurrenciaModel()
     
     def crear_evento(self, titulo, descripcion, fecha_limite, prioridad, 
                      tipo, usuario_id, asignatura_id=None):
@@ -24,31 +129,76 @@ class EventoModel:
         # Convertir datetime a string para MySQL
         fecha_limite_str = fecha_limite_dt.strftime('%Y-%m-%d %H:%M:%S')
         
-        query = """
-        INSERT INTO evento (titulo, descripcion, fecha_limite, prioridad, tipo, usuario_id, asignatura_id)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
+        query = self.SQL_CREAR
         try:
-            self.db.conectar()
-            self.db.ejecutar_accion(query, (titulo, descripcion, fecha_limite_str, 
-                                           prioridad, tipo, usuario_id, asignatura_id))
-            evento_id = self.db.obtener_ultimo_id()
-            self.db.desconectar()
-            
-            # Crear notificación automática
-            self.crear_notificacion_automatica(evento_id, fecha_limite_dt, usuario_id)
-            
+            # Evento y recordatorio se confirman juntos (o ninguno)
+            with transaccion():
+                self.db.conectar()
+                insertado = self.db.ejecutar_accion(query, (titulo, descripcion, fecha_limite_str,
+                                                            prioridad, tipo, usuario_id, asignatura_id))
+                evento_id = self.db.obtener_ultimo_id()
+                self.db.desconectar()
+                if not insertado:
+                    raise Error(msg="No se pudo insertar el evento")
+
+                # Crear notificación automática
+                self.crear_notificacion_automatica(evento_id, fecha_limite_dt, usuario_id)
+                registrar_cambio(usuario_id)
+
             return evento_id
         except Exception as e:
-            print(f"❌ Error creando evento: {e}")
+            log.error("Error creando evento", extra={'error': str(e)})
             return None
     
+    def crear_eventos_masivo(self, usuario_id, eventos):
+        """
+        Inserta muchos eventos ya validados (dicts con titulo, descripcion, fecha_limite,
+        prioridad, tipo, asignatura_id) y sus recordatorios de 24h con dos INSERT
+        multi-fila en una sola transacción. Retorna la lista de ids creados.
+        """
+        if not eventos:
+            return []
+        
+        query = self.SQL_CREAR
+        filas = [(e['titulo'], e.get('descripcion'), e['fecha_limite'].strftime('%Y-%m-%d %H:%M:%S'),
+                  e.get('prioridad', 'media'), e.get('tipo', 'tarea'), usuario_id, e.get('asignatura_id'))
+                 for e in eventos]
+        
+        with transaccion():
+            self.db.conectar()
+            if not self.db.ejecutar_lote(query, filas):
+                self.db.desconectar()
+                raise Error(msg="No se pudieron insertar los eventos")
+            # Un INSERT multi-fila recibe ids consecutivos a partir del primero
+            primer_id = self.db.obtener_ultimo_id()
+            ids = list(range(primer_id, primer_id + len(filas)))
+            
+            limite_notif = datetime.now() + timedelta(hours=24)
+            notificaciones = [
+                ('recordatorio_24h', 'Recordatorio: Tarea vence en 24 horas',
+                 (e['fecha_limite'] - timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S'),
+                 evento_id, usuario_id)
+                for evento_id, e in zip(ids, eventos)
+                if e['fecha_limite'] > limite_notif
+            ]
+            if notificaciones:
+                query_notif = """
+                INSERT INTO notificacion (tipo, mensaje, fecha_programada, evento_id, usuario_id)
+                VALUES (%s, %s, %s, %s, %s)
+                """
+                if not self.db.ejecutar_lote(query_notif, notificaciones):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudieron crear los recordatorios")
+            self.db.desconectar()
+            registrar_cambio(usuario_id)
+        
+        return ids
+    
     def obtener_por_usuario(self, usuario_id, estado=None, limite=50):
         """Obtiene eventos de un usuario con filtros"""
         query = """
-        SELECT e.*, a.nombre as asignatura_nombre, a.codigo as asignatura_codigo, a.color as asignatura_color
+        SELECT e.*
         FROM evento e
-        LEFT JOIN asignatura a ON e.asignatura_id = a.id
         WHERE e.usuario_id = %s
         """
         params = [usuario_id]
@@ -64,112 +214,400 @@ class EventoModel:
         result = self.db.ejecutar_consulta(query, tuple(params))
         self.db.desconectar()
         
-        return result if result else []
+        return self.asignaturas.decorar(result) if result else []
     
-    def obtener_urgentes(self, usuario_id):
-        """Obtiene eventos urgentes (próximos 48h o vencidos)"""
+    def obtener_pagina(self, usuario_id, cursor=None, limite=50, estado=None):
+        """
+        Página de eventos del usuario ordenada por (fecha_limite, id) con paginación keyset.
+        Retorna {'eventos': [...], 'siguiente': token o None}; el token se pasa
+        como cursor para pedir la página siguiente. Lanza ValueError si el cursor es inválido.
+        """
         query = """
-        SELECT e.*, a.nombre as asignatura_nombre, a.color as asignatura_color
+        SELECT e.*
         FROM evento e
-        LEFT JOIN asignatura a ON e.asignatura_id = a.id
-        WHERE e.usuario_id = %s 
-        AND e.estado = 'pendiente'
-        AND fecha_limite <= DATE_ADD(NOW(), INTERVAL 48 HOUR)
-        ORDER BY fecha_limite ASC
-        LIMIT 10
+        WHERE e.usuario_id = %s
         """
+        params = [usuario_id]
+        
+        if estado:
+            query += " AND e.estado = %s"
+            params.append(estado)
+        
+        if cursor:
+            fecha, ultimo_id = decodificar_cursor(cursor, (datetime, int))
+            if fecha is None:
+                # MySQL ordena los NULL primero: seguir entre los sin fecha y luego el resto
+                query += " AND ((e.fecha_limite IS NULL AND e.id > %s) OR e.fecha_limite IS NOT NULL)"
+                params.append(ultimo_id)
+            else:
+                query += " AND (e.fecha_limite, e.id) > (%s, %s)"
+                params.extend([fecha, ultimo_id])
+        
+        # Se pide una fila extra para saber si hay página siguiente
+        query += " ORDER BY e.fecha_limite ASC, e.id ASC LIMIT %s"
+        params.append(limite + 1)
         
         self.db.conectar()
-        result = self.db.ejecutar_consulta(query, (usuario_id,))
+        result = self.db.ejecutar_consulta(query, tuple(params)) or []
         self.db.desconectar()
         
-        return result if result else []
+        siguiente = None
+        if len(result) > limite:
+            result = result[:limite]
+            ultimo = result[-1]
+            siguiente = codificar_cursor(ultimo['fecha_limite'], ultimo['id'])
+        
+        return {'eventos': self.asignaturas.decorar(result), 'siguiente': siguiente}
     
-    def obtener_proximas_vencer(self, usuario_id, horas=24):
-        """Obtiene tareas que vencen en las próximas X horas"""
+    def buscar(self, usuario_id, texto, cursor=None, limite=20, prefijo=True,
+               asignatura_id=None, estado=None, prioridad=None, desde=None, hasta=None):
+        """
+        Busca en título y descripción de los eventos del usuario con el índice FULLTEXT
+        ft_evento_texto, ordenados por relevancia (y id para desempatar).
+        prefijo=True completa la última palabra (type-ahead); desde/hasta acotan
+        fecha_limite a [desde, hasta). Paginación keyset como obtener_pagina:
+        retorna {'eventos': [... con 'relevancia'], 'siguiente': token o None}.
+        Lanza ValueError si el cursor es inválido.
+        """
+        palabras = terminos(texto)
+        if not palabras:
+            return {'eventos': [], 'siguiente': None}
+        consulta = consulta_booleana(palabras, prefijo)
+        
+        match = "MATCH(e.titulo, e.descripcion) AGAINST (%s IN BOOLEAN MODE)"
+        query = f"""
+        SELECT e.*, {match} as relevancia
+        FROM evento e
+        WHERE {match}
+        AND e.usuario_id = %s
+        """
+        params = [consulta, consulta, usuario_id]
+        
+        for columna, valor in (('asignatura_id', asignatura_id), ('estado', estado), ('prioridad', prioridad)):
+            if valor is not None:
+                query += f" AND e.{columna} = %s"
+                params.append(valor)
+        if desde is not None:
+            query += " AND e.fecha_limite >= %s"
+            params.append(desde)
+        if hasta is not None:
+            query += " AND e.fecha_limite < %s"
+            params.append(hasta)
+        
+        if cursor:
+            relevancia, ultimo_id = decodificar_cursor(cursor, (float, int))
+            query += f" AND ({match} < %s OR ({match} = %s AND e.id < %s))"
+            params.extend([consulta, relevancia, consulta, relevancia, ultimo_id])
+        
+        query += " ORDER BY relevancia DESC, e.id DESC LIMIT %s"
+        params.append(limite + 1)
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, tuple(params)) or []
+        self.db.desconectar()
+        
+        siguiente = None
+        if len(result) > limite:
+            result = result[:limite]
+            ultimo = result[-1]
+            siguiente = codificar_cursor(ultimo['relevancia'], ultimo['id'])
+        
+        return {'eventos': self.asignaturas.decorar(result), 'siguiente': siguiente}
+    
+    def iterar_por_usuario(self, usuario_id, tamano_lote=500, archivados=True):
+        """
+        Generador con el historial completo del usuario, leído por lotes (para exportar).
+        Con archivados=True primero van los de evento_archivo (los más antiguos) y luego los activos
+        """
         query = """
-        SELECT e.*, a.nombre as asignatura_nombre
+        SELECT e.id, e.titulo, e.descripcion, e.fecha_limite, e.prioridad, e.estado, e.tipo,
+               e.fecha_creacion, e.fecha_actualizacion, e.asignatura_id
         FROM evento e
-        LEFT JOIN asignatura a ON e.asignatura_id = a.id
-        WHERE e.usuario_id = %s 
-        AND e.estado = 'pendiente'
-        AND fecha_limite BETWEEN NOW() AND DATE_ADD(NOW(), INTERVAL %s HOUR)
-        ORDER BY fecha_limite ASC
+        WHERE e.usuario_id = %s
+        ORDER BY e.fecha_limite ASC, e.id ASC
+        """
+        filas = self.db.iterar_consulta(query, (usuario_id,), tamano_lote)
+        if archivados:
+            query_archivo = """
+            SELECT a.id, a.titulo, a.descripcion, a.fecha_limite, a.prioridad, a.estado, a.tipo,
+                   a.fecha_creacion, a.fecha_actualizacion, a.asignatura_id
+            FROM evento_archivo a
+            WHERE a.usuario_id = %s
+            ORDER BY a.fecha_referencia ASC, a.id ASC
+            """
+            filas = itertools.chain(self.db.iterar_consulta(query_archivo, (usuario_id,), tamano_lote), filas)
+        return self.asignaturas.decorar_iterando(filas)
+    
+    def obtener_archivados(self, usuario_id, cursor=None, limite=50):
+        """
+        Página de eventos archivados del usuario (evento_archivo), del más reciente al más
+        antiguo, con paginación keyset sobre (fecha_referencia, id) como obtener_pagina.
+        Lanza ValueError si el cursor es inválido.
         """
+        query = """
+        SELECT a.*
+        FROM evento_archivo a
+        WHERE a.usuario_id = %s
+        """
+        params = [usuario_id]
+        
+        if cursor:
+            fecha, ultimo_id = decodificar_cursor(cursor, (date, int))
+            query += " AND (a.fecha_referencia, a.id) < (%s, %s)"
+            params.extend([fecha, ultimo_id])
+        
+        query += " ORDER BY a.fecha_referencia DESC, a.id DESC LIMIT %s"
+        params.append(limite + 1)
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, tuple(params)) or []
+        self.db.desconectar()
+        
+        siguiente = None
+        if len(result) > limite:
+            result = result[:limite]
+            ultimo = result[-1]
+            siguiente = codificar_cursor(ultimo['fecha_referencia'], ultimo['id'])
+        
+        return {'eventos': self.asignaturas.decorar(result), 'siguiente': siguiente}
+    
+    def archivar_lote(self, antes_de, desde_id=0, limite=500):
+        """
+        Mueve a evento_archivo hasta `limite` eventos completados cuya fecha límite (o de
+        creación, si no tiene) es anterior a antes_de, recorriendo por id desde desde_id
+        (exclusivo). Copia y borrado van en una transacción; sus recordatorios se borran
+        con el evento (ON DELETE CASCADE). Retorna los ids archivados en orden
+        (menos de `limite`: no quedan más).
+        """
+        condicion = "estado = 'completada' AND COALESCE(fecha_limite, fecha_creacion) < %s"
+        with transaccion():
+            self.db.conectar()
+            candidatos = self.db.ejecutar_consulta(f"""
+            SELECT id, usuario_id FROM evento
+            WHERE id > %s AND {condicion}
+            ORDER BY id
+            LIMIT %s
+            """, (desde_id, antes_de, limite))
+            if candidatos is None:
+                self.db.desconectar()
+                raise Error(msg="No se pudieron leer los eventos a archivar")
+            
+            if candidatos:
+                ids = [fila['id'] for fila in candidatos]
+                marcas = ', '.join(['%s'] * len(ids))
+                # INSERT ... SELECT deja las filas copiadas bloqueadas hasta el commit:
+                # ninguna cambia entre la copia y el borrado
+                copiados = self.db.ejecutar_accion(f"""
+                INSERT INTO evento_archivo ({self.COLUMNAS_ARCHIVO}, fecha_referencia)
+                SELECT {self.COLUMNAS_ARCHIVO}, DATE(COALESCE(fecha_limite, fecha_creacion))
+                FROM evento
+                WHERE id IN ({marcas}) AND {condicion}
+                """, (*ids, antes_de))
+                if not copiados or not self.db.ejecutar_accion(
+                        f"DELETE FROM evento WHERE id IN ({marcas}) AND {condicion}", (*ids, antes_de)):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudieron archivar los eventos")
+                for usuario_id in {fila['usuario_id'] for fila in candidatos}:
+                    registrar_cambio(usuario_id)
+            self.db.desconectar()
+        
+        return [fila['id'] for fila in candidatos]
+    
+    def iterar_para_calendario(self, usuario_id, desde, tamano_lote=500):
+        """Generador de eventos con fecha_limite >= desde y datos de su asignatura (feed .ics)"""
+        query = """
+        SELECT e.id, e.titulo, e.descripcion, e.fecha_limite, e.prioridad, e.estado,
+               e.fecha_creacion, e.fecha_actualizacion, e.asignatura_id
+        FROM evento e
+        WHERE e.usuario_id = %s
+        AND e.fecha_limite >= %s
+        ORDER BY e.fecha_limite ASC
+        """
+        return self.asignaturas.decorar_iterando(self.db.iterar_consulta(query, (usuario_id, desde), tamano_lote))
+    
+    def obtener_urgentes(self, usuario_id):
+        """
+        Obtiene eventos urgentes (próximos 48h o vencidos), junto con las ocurrencias
+        pendientes de series en la ventana de RecurrenciaModel.ventana_activa()
+        """
+        query = self.SQL_URGENTES
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, (usuario_id,))
+        self.db.desconectar()
+        
+        eventos = self.asignaturas.decorar(result) if result else []
+        return RecurrenciaModel.mezclar(eventos, self.recurrencias.ventana_activa(usuario_id), limite=10)
+    
+    def obtener_proximas_vencer(self, usuario_id, horas=24):
+        """Obtiene tareas (y ocurrencias de series) que vencen en las próximas X horas"""
+        query = self.SQL_PROXIMAS_VENCER
         
         self.db.conectar()
         result = self.db.ejecutar_consulta(query, (usuario_id, horas))
         self.db.desconectar()
         
-        return result if result else []
+        ahora = datetime.now()
+        eventos = self.asignaturas.decorar(result) if result else []
+        return RecurrenciaModel.mezclar(eventos, self.recurrencias.ocurrencias_en_rango(
+            usuario_id, ahora, ahora + timedelta(hours=horas), estado='pendiente'))
     
     def completar_evento(self, evento_id, usuario_id):
         """Marca un evento como completado"""
-        query = """
-        UPDATE evento 
-        SET estado = 'completada', fecha_actualizacion = NOW()
-        WHERE id = %s AND usuario_id = %s
-        """
+        query = self.SQL_COMPLETAR
         
         self.db.conectar()
         success = self.db.ejecutar_accion(query, (evento_id, usuario_id))
         self.db.desconectar()
+        if success:
+            registrar_cambio(usuario_id)
         return success
     
-    def actualizar_evento(self, evento_id, datos):
-        """Actualiza información del evento"""
-        campos = []
-        valores = []
-        for campo, valor in datos.items():
-            if campo not in ['id', 'usuario_id', 'fecha_creacion']:  # Campos protegidos
-                campos.append(f"{campo} = %s")
-                valores.append(valor)
-        
-        if not campos:
+    def actualizar_evento(self, evento_id, datos, usuario_id=None):
+        """
+        Actualiza información del evento (si se indica usuario_id, solo si le pertenece).
+        Solo columnas de CAMPOS_EDITABLES; lanza ValueError si hay otras o valores inválidos.
+        Si cambia fecha_limite, el recordatorio de 24h pendiente se mueve con ella (como en aplicar_lote).
+        """
+        if usuario_id is None:
+            usuario_id = self.obtener_propietario(evento_id)
+            if usuario_id is None:
+                return False
+        cambios = self._validar_cambios(datos, usuario_id)
+        if not cambios:
             return False
-            
-        valores.append(evento_id)
         
         query = f"""
         UPDATE evento 
-        SET {', '.join(campos)}, fecha_actualizacion = NOW()
-        WHERE id = %s
+        SET {', '.join(f"{campo} = %s" for campo in cambios)}, fecha_actualizacion = NOW(6)
+        WHERE id = %s AND usuario_id = %s
         """
         
-        self.db.conectar()
-        success = self.db.ejecutar_accion(query, tuple(valores))
-        self.db.desconectar()
-        return success
+        try:
+            # Evento y recordatorio se actualizan juntos (o ninguno)
+            with transaccion():
+                self.db.conectar()
+                if not self.db.ejecutar_accion(query, (*cambios.values(), evento_id, usuario_id)):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudo actualizar el evento")
+                if cambios.get('fecha_limite') is not None and not self.db.ejecutar_accion(
+                        *self._sql_reprogramar_recordatorios(usuario_id, {evento_id: cambios['fecha_limite']})):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudo reprogramar el recordatorio")
+                self.db.desconectar()
+                registrar_cambio(usuario_id)
+        except Error as e:
+            log.error("Error actualizando evento", extra={'error': str(e)})
+            return False
+        return True
+    
+    def aplicar_lote(self, usuario_id, operaciones):
+        """
+        Aplica muchos cambios a eventos del usuario en una sola transacción:
+        un UPDATE multi-fila (CASE por columna) y un DELETE, sin importar cuántos sean.
+        
+        operaciones: [{'id': 5, 'version': ..., 'cambios': {'estado': 'completada'}},
+                      {'id': 6, 'version': ..., 'eliminar': True}, ...]
+        version es la fecha_actualizacion que leyó el cliente (None si nunca se modificó).
+        Control optimista: si el evento cambió desde entonces no se toca y se informa
+        como conflicto con su versión actual, en vez de pisar el cambio de otro.
+        
+        Retorna {'aplicados': [{'id', 'version'}], 'eliminados': [ids],
+                 'conflictos': [{'id', 'version'}], 'no_encontrados': [ids]}
+        Lanza ValueError si alguna operación es inválida (entonces no se aplica ninguna).
+        """
+        pedidas = self._validar_lote(operaciones, usuario_id)
+        resultado = {'aplicados': [], 'eliminados': [], 'conflictos': [], 'no_encontrados': []}
+        if not pedidas:
+            return resultado
+        
+        marcas = ', '.join(['%s'] * len(pedidas))
+        with transaccion():
+            self.db.conectar()
+            # Bloquea las filas: entre la comparación de versiones y la escritura nadie las cambia
+            actuales = self.db.ejecutar_consulta(f"""
+            SELECT id, fecha_actualizacion, NOW(6) as ahora
+            FROM evento
+            WHERE usuario_id = %s AND id IN ({marcas})
+            FOR UPDATE
+            """, (usuario_id, *pedidas))
+            if actuales is None:
+                self.db.desconectar()
+                raise Error(msg="No se pudieron leer los eventos del lote")
+            versiones = {fila['id']: fila['fecha_actualizacion'] for fila in actuales}
+            
+            actualizar, eliminar = {}, []
+            for evento_id, (version, cambios) in pedidas.items():
+                if evento_id not in versiones:
+                    resultado['no_encontrados'].append(evento_id)
+                elif versiones[evento_id] != version:
+                    resultado['conflictos'].append({'id': evento_id, 'version': versiones[evento_id]})
+                elif cambios is None:
+                    eliminar.append(evento_id)
+                elif cambios:
+                    actualizar[evento_id] = cambios
+            
+            if actualizar:
+                ahora = actuales[0]['ahora']
+                if not self.db.ejecutar_accion(*self._sql_actualizar_lote(usuario_id, actualizar, ahora)):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudieron actualizar los eventos")
+                reprogramados = {evento_id: cambios['fecha_limite'] for evento_id, cambios in actualizar.items()
+                                 if cambios.get('fecha_limite') is not None}
+                if reprogramados and not self.db.ejecutar_accion(
+                        *self._sql_reprogramar_recordatorios(usuario_id, reprogramados)):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudieron reprogramar los recordatorios")
+                resultado['aplicados'] = [{'id': evento_id, 'version': ahora} for evento_id in actualizar]
+            
+            if eliminar:
+                if not self.db.ejecutar_accion(f"""
+                DELETE FROM evento WHERE usuario_id = %s AND id IN ({', '.join(['%s'] * len(eliminar))})
+                """, (usuario_id, *eliminar)):
+                    self.db.desconectar()
+                    raise Error(msg="No se pudieron eliminar los eventos")
+                resultado['eliminados'] = eliminar
+            
+            self.db.desconectar()
+            if actualizar or eliminar:
+                registrar_cambio(usuario_id)
+        
+        return resultado
     
     def eliminar_evento(self, evento_id, usuario_id):
         """Elimina un evento (solo si pertenece al usuario)"""
-        query = "DELETE FROM evento WHERE id = %s AND usuario_id = %s"
+        query = self.SQL_ELIMINAR
         
         self.db.conectar()
         success = self.db.ejecutar_accion(query, (evento_id, usuario_id))
         self.db.desconectar()
+        if success:
+            registrar_cambio(usuario_id)
         return success
     
+    def obtener_propietario(self, evento_id):
+        """Obtiene el usuario_id dueño de un evento"""
+        query = self.SQL_PROPIETARIO
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, (evento_id,))
+        self.db.desconectar()
+        
+        return result[0]['usuario_id'] if result else None
+    
     def estadisticas_usuario(self, usuario_id):
-        """Obtiene estadísticas de eventos del usuario"""
-        query = """
-        SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN estado = 'completada' THEN 1 ELSE 0 END) as completadas,
-            SUM(CASE WHEN estado = 'pendiente' THEN 1 ELSE 0 END) as pendientes,
-            SUM(CASE WHEN fecha_limite < NOW() AND estado = 'pendiente' THEN 1 ELSE 0 END) as vencidas,
-            SUM(CASE WHEN prioridad = 'alta' AND estado = 'pendiente' THEN 1 ELSE 0 END) as urgentes,
-            SUM(CASE WHEN fecha_limite BETWEEN NOW() AND DATE_ADD(NOW(), INTERVAL 48 HOUR) 
-                AND estado = 'pendiente' THEN 1 ELSE 0 END) as proximas_vencer
-        FROM evento
-        WHERE usuario_id = %s
         """
+        Obtiene estadísticas de eventos del usuario. Las ocurrencias de series suman
+        solo las pendientes de la ventana activa (RecurrenciaModel.ventana_activa)
+        """
+        query = self.SQL_ESTADISTICAS
         
         self.db.conectar()
-        result = self.db.ejecutar_consulta(query, (usuario_id,))
+        result = self.db.ejecutar_consulta(query, (usuario_id, usuario_id))
         self.db.desconectar()
         
-        return result[0] if result else {
+        # Sin fila en usuario_estadisticas: el usuario todavía no tiene eventos
+        estadisticas = dict(result[0]) if result else {
             'total': 0,
             'completadas': 0,
             'pendientes': 0,
@@ -177,45 +615,173 @@ class EventoModel:
             'urgentes': 0,
             'proximas_vencer': 0
         }
+        ahora = datetime.now()
+        ocurrencias = self.recurrencias.ventana_activa(usuario_id, ahora)
+        for clave, cantidad in RecurrenciaModel.contar(ocurrencias, ahora).items():
+            estadisticas[clave] = int(estadisticas[clave] or 0) + cantidad
+        return estadisticas
     
     def obtener_por_mes(self, usuario_id, año, mes):
         """Obtiene eventos de un mes específico para el calendario"""
-        query = """
-        SELECT e.*, a.nombre as asignatura_nombre, a.color as asignatura_color
-        FROM evento e
-        LEFT JOIN asignatura a ON e.asignatura_id = a.id
-        WHERE e.usuario_id = %s
-        AND YEAR(e.fecha_limite) = %s
-        AND MONTH(e.fecha_limite) = %s
-        ORDER BY e.fecha_limite ASC
+        desde = datetime(año, mes, 1)
+        hasta = datetime(año + 1, 1, 1) if mes == 12 else datetime(año, mes + 1, 1)
+        return self.obtener_por_rango(usuario_id, desde, hasta)
+    
+    def obtener_por_rango(self, usuario_id, desde, hasta):
         """
+        Obtiene eventos con fecha_limite en [desde, hasta), más las ocurrencias de
+        series en ese rango (expandidas solo ahí), todo en orden de fecha.
+        El rango semiabierto sobre la columna sin funciones usa idx_evento_usuario_fecha
+        """
+        query = self.SQL_POR_RANGO
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, (usuario_id, desde, hasta))
+        self.db.desconectar()
+        
+        eventos = self.asignaturas.decorar(result) if result else []
+        return RecurrenciaModel.mezclar(eventos, self.recurrencias.ocurrencias_en_rango(usuario_id, desde, hasta))
+    
+    def ultima_modificacion(self, usuario_id):
+        """
+        Fecha del último cambio en los eventos y series del usuario y cuántos tiene
+        (el total detecta eliminaciones, que no dejan fecha_actualizacion)
+        """
+        query = self.SQL_ULTIMA_MODIFICACION
         
         self.db.conectar()
-        result = self.db.ejecutar_consulta(query, (usuario_id, año, mes))
+        result = self.db.ejecutar_consulta(query, (usuario_id, usuario_id))
         self.db.desconectar()
         
-        return result if result else []
+        return result[0] if result else {'ultima': None, 'total': 0}
     
     def crear_notificacion_automatica(self, evento_id, fecha_limite, usuario_id):
-        """Crea notificación automática para eventos"""
-        try:
-            from models.notificacion import NotificacionModel
-            notif_model = NotificacionModel()
-            
-            # Calcular fecha para notificación (24 horas antes)
-            fecha_notif = fecha_limite - timedelta(hours=24)
-            
-            # Solo crear si la fecha de notificación es futura
-            if fecha_notif > datetime.now():
-                fecha_notif_str = fecha_notif.strftime('%Y-%m-%d %H:%M:%S')
-                
-                notif_model.crear_notificacion(
-                    tipo='recordatorio_24h',
-                    mensaje=f'Recordatorio: Tarea vence en 24 horas',
-                    fecha_programada=fecha_notif_str,
-                    evento_id=evento_id,
-                    usuario_id=usuario_id
-                )
-        except Exception as e:
-            print(f"⚠️ No se pudo crear notificación: {e}")
-            # No falla la creación del evento si falla la notificación
\ No newline at end of file
+        """
+        Crea notificación automática para eventos.
+        Se llama dentro de la transacción de crear_evento: si falla, lanza
+        excepción para que el evento no quede sin su recordatorio.
+        """
+        from models.notificacion import NotificacionModel
+        notif_model = NotificacionModel()
+
+        # Calcular fecha para notificación (24 horas antes)
+        fecha_notif = fecha_limite - timedelta(hours=24)
+
+        # Solo crear si la fecha de notificación es futura
+        if fecha_notif > datetime.now():
+            fecha_notif_str = fecha_notif.strftime('%Y-%m-%d %H:%M:%S')
+
+            notif_id = notif_model.crear_notificacion(
+                tipo='recordatorio_24h',
+                mensaje=f'Recordatorio: Tarea vence en 24 horas',
+                fecha_programada=fecha_notif_str,
+                evento_id=evento_id,
+                usuario_id=usuario_id
+            )
+            if notif_id is None:
+                raise Error(msg="No se pudo crear la notificación del evento")
+    
+    def _validar_lote(self, operaciones, usuario_id):
+        """{evento_id: (version, cambios validados | None para eliminar)} en el orden recibido"""
+        if not isinstance(operaciones, list):
+            raise ValueError("operaciones debe ser una lista")
+        if len(operaciones) > self.MAX_LOTE:
+            raise ValueError(f"Máximo {self.MAX_LOTE} operaciones por lote")
+        
+        pedidas = {}
+        for posicion, operacion in enumerate(operaciones):
+            try:
+                if not isinstance(operacion, dict):
+                    raise ValueError("cada operación debe ser un objeto")
+                evento_id = operacion.get('id')
+                if not isinstance(evento_id, int) or isinstance(evento_id, bool):
+                    raise ValueError("id debe ser un número")
+                if evento_id in pedidas:
+                    raise ValueError(f"el evento {evento_id} aparece más de una vez")
+                if 'version' not in operacion:
+                    raise ValueError("falta version (fecha_actualizacion leída, o null)")
+                version = self._version(operacion['version'])
+                if operacion.get('eliminar'):
+                    pedidas[evento_id] = (version, None)
+                else:
+                    pedidas[evento_id] = (version, self._validar_cambios(operacion.get('cambios'), usuario_id))
+            except ValueError as e:
+                raise ValueError(f"operación {posicion}: {e}") from None
+        return pedidas
+    
+    def _validar_cambios(self, datos, usuario_id):
+        """Cambios normalizados, solo de CAMPOS_EDITABLES; lanza ValueError si algo no es válido"""
+        if not isinstance(datos, dict):
+            raise ValueError("cambios debe ser un objeto")
+        desconocidos = set(datos) - set(self.CAMPOS_EDITABLES)
+        if desconocidos:
+            raise ValueError(f"campos no editables: {', '.join(sorted(desconocidos))}")
+        
+        cambios = {}
+        for campo, valor in datos.items():
+            if campo == 'titulo':
+                if not isinstance(valor, str) or not valor.strip() or len(valor.strip()) > 255:
+                    raise ValueError("titulo es obligatorio (máximo 255 caracteres)")
+                valor = valor.strip()
+            elif campo == 'descripcion':
+                if valor is not None and not isinstance(valor, str):
+                    raise ValueError("descripcion debe ser texto")
+            elif campo == 'fecha_limite':
+                if isinstance(valor, str):
+                    valor = datetime.fromisoformat(valor)
+                if valor is not None and (not isinstance(valor, datetime) or valor.tzinfo is not None):
+                    raise ValueError("fecha_limite debe ser una fecha ISO sin zona horaria")
+                if valor is not None and valor < datetime.now():
+                    raise ValueError("La fecha límite no puede ser en el pasado")
+            elif campo in self.VALORES_ENUM:
+                if valor not in self.VALORES_ENUM[campo]:
+                    raise ValueError(f"{campo} debe ser uno de: {', '.join(self.VALORES_ENUM[campo])}")
+            elif campo == 'asignatura_id' and valor is not None:
+                # Primero el tipo: un valor JSON no hashable (lista, objeto) no puede ir al set
+                if not isinstance(valor, int) or isinstance(valor, bool):
+                    raise ValueError("asignatura_id debe ser un número")
+                propias = {a['id'] for a in self.asignaturas.obtener_por_usuario(usuario_id) or []}
+                if valor not in propias:
+                    raise ValueError("asignatura_id no es una asignatura del usuario")
+            cambios[campo] = valor
+        return cambios
+    
+    @staticmethod
+    def _version(valor):
+        """fecha_actualizacion enviada por el cliente (ISO 8601, como la serializa fila_a_json)"""
+        if valor is None or isinstance(valor, datetime):
+            return valor
+        if isinstance(valor, str):
+            return datetime.fromisoformat(valor)
+        raise ValueError("version debe ser una fecha ISO o null")
+    
+    @staticmethod
+    def _sql_actualizar_lote(usuario_id, actualizar, ahora):
+        """UPDATE único para todo el lote: cada columna toma su valor por id con CASE"""
+        asignaciones, params = [], []
+        for campo in EventoModel.CAMPOS_EDITABLES:
+            ramas = [(evento_id, cambios[campo]) for evento_id, cambios in actualizar.items() if campo in cambios]
+            if not ramas:
+                continue
+            asignaciones.append(f"{campo} = CASE id {' '.join(['WHEN %s THEN %s'] * len(ramas))} ELSE {campo} END")
+            params.extend(valor for rama in ramas for valor in rama)
+        query = f"""
+        UPDATE evento
+        SET {', '.join(asignaciones)}, fecha_actualizacion = %s
+        WHERE usuario_id = %s AND id IN ({', '.join(['%s'] * len(actualizar))})
+        """
+        return query, (*params, ahora, usuario_id, *actualizar)
+    
+    @staticmethod
+    def _sql_reprogramar_recordatorios(usuario_id, reprogramados):
+        """Mueve los recordatorios de 24h aún no enviados a la nueva fecha de cada evento"""
+        ramas = [(evento_id, fecha - timedelta(hours=24)) for evento_id, fecha in reprogramados.items()]
+        query = f"""
+        UPDATE notificacion
+        SET fecha_programada = CASE evento_id {' '.join(['WHEN %s THEN %s'] * len(ramas))} END
+        WHERE usuario_id = %s
+        AND tipo = 'recordatorio_24h'
+        AND fecha_enviada IS NULL
+        AND evento_id IN ({', '.join(['%s'] * len(ramas))})
+        """
+        return query, (*(valor for rama in ramas for valor in rama), usuario_id, *reprogramados)
@@ -1,38 +1,55 @@
 # models/notificacion.py
-from database.conexion_db import ConexionDB
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from database.conexion_db import ConexionDB, transaccion
+from database.sentencias import sentencia
+from utils.cambios import registrar_cambio
+from database.registro import obtener_logger
+
+log = obtener_logger('models.notificacion')
 
 class NotificacionModel:
     """Modelo para notificaciones de recordatorio"""
     
+    # Sentencias preparadas (database/sentencias.py); SQL_PENDIENTES también la usa
+    # services/dashboard_service.py
+    SQL_PENDIENTES = sentencia('notificacion.pendientes', """
+    SELECT n.*, COALESCE(e.titulo, r.titulo) as evento_titulo
+    FROM notificacion n
+    LEFT JOIN evento e ON n.evento_id = e.id
+    LEFT JOIN evento_recurrencia r ON n.recurrencia_id = r.id
+    WHERE n.usuario_id = %s AND n.leida = 0
+    ORDER BY n.fecha_programada ASC
+    LIMIT %s
+    """)
+    SQL_CREAR = sentencia('notificacion.crear', """
+    INSERT INTO notificacion (tipo, mensaje, fecha_programada, evento_id, usuario_id)
+    VALUES (%s, %s, %s, %s, %s)
+    """)
+    SQL_MARCAR_LEIDA = sentencia('notificacion.marcar_leida', "UPDATE notificacion SET leida = 1 WHERE id = %s")
+    SQL_PROPIETARIO = sentencia('notificacion.propietario', "SELECT usuario_id FROM notificacion WHERE id = %s")
+
     def __init__(self):
         self.db = ConexionDB()
     
     def crear_notificacion(self, tipo, mensaje, fecha_programada, evento_id, usuario_id):
         """Crea una notificación programada"""
-        query = """
-        INSERT INTO notificacion (tipo, mensaje, fecha_programada, evento_id, usuario_id)
-        VALUES (%s, %s, %s, %s, %s)
-        """
+        query = self.SQL_CREAR
         try:
             self.db.conectar()
-            self.db.ejecutar_accion(query, (tipo, mensaje, fecha_programada, evento_id, usuario_id))
+            insertada = self.db.ejecutar_accion(query, (tipo, mensaje, fecha_programada, evento_id, usuario_id))
             notif_id = self.db.obtener_ultimo_id()
             self.db.desconectar()
-            return notif_id
+            return notif_id if insertada else None
         except Exception as e:
-            print(f"❌ Error creando notificación: {e}")
+            log.error("Error creando notificación", extra={'error': str(e)})
             return None
     
     def obtener_pendientes(self, usuario_id, limite=20):
         """Obtiene notificaciones no leídas"""
-        query = """
-        SELECT n.*, e.titulo as evento_titulo
-        FROM notificacion n
-        INNER JOIN evento e ON n.evento_id = e.id
-        WHERE n.usuario_id = %s AND n.leida = 0
-        ORDER BY n.fecha_programada ASC
-        LIMIT %s
-        """
+        query = self.SQL_PENDIENTES
         
         self.db.conectar()
         result = self.db.ejecutar_consulta(query, (usuario_id, limite))
@@ -40,23 +57,65 @@ class NotificacionModel:
         
         return result
     
-    def marcar_leida(self, notificacion_id):
+    def marcar_leida(self, notificacion_id, usuario_id=None):
         """Marca una notificación como leída"""
-        query = "UPDATE notificacion SET leida = 1 WHERE id = %s"
+        query = self.SQL_MARCAR_LEIDA
+        
+        if usuario_id is None:
+            usuario_id = self.obtener_propietario(notificacion_id)
         
         self.db.conectar()
         success = self.db.ejecutar_accion(query, (notificacion_id,))
         self.db.desconectar()
+        if success:
+            registrar_cambio(usuario_id)
         return success
     
-    def eliminar_notificaciones_viejas(self, dias=30):
-        """Elimina notificaciones leídas de más de X días"""
-        query = """
-        DELETE FROM notificacion 
-        WHERE leida = 1 AND fecha_programada < DATE_SUB(NOW(), INTERVAL %s DAY)
-        """
+    def obtener_propietario(self, notificacion_id):
+        """Obtiene el usuario_id dueño de una notificación"""
+        query = self.SQL_PROPIETARIO
         
         self.db.conectar()
-        success = self.db.ejecutar_accion(query, (dias,))
+        result = self.db.ejecutar_consulta(query, (notificacion_id,))
         self.db.desconectar()
-        return success
\ No newline at end of file
+        
+        return result[0]['usuario_id'] if result else None
+    
+    def eliminar_notificaciones_viejas(self, dias=30, tamano_lote=500):
+        """Elimina notificaciones leídas de más de X días en lotes cortos; retorna cuántas"""
+        antes_de = datetime.now() - timedelta(days=dias)
+        total, ultimo_id = 0, 0
+        while True:
+            ids = self.eliminar_leidas_lote(antes_de, ultimo_id, tamano_lote)
+            total += len(ids)
+            if len(ids) < tamano_lote:
+                return total
+            ultimo_id = ids[-1]
+    
+    def eliminar_leidas_lote(self, antes_de, desde_id=0, limite=500):
+        """
+        Elimina hasta `limite` notificaciones leídas programadas antes de antes_de,
+        recorriendo por id desde desde_id (exclusivo): cada lote bloquea solo sus filas.
+        Retorna los ids eliminados en orden (menos de `limite`: no quedan más).
+        """
+        condicion = "leida = 1 AND fecha_programada < %s"
+        with transaccion():
+            self.db.conectar()
+            filas = self.db.ejecutar_consulta(f"""
+            SELECT id FROM notificacion
+            WHERE id > %s AND {condicion}
+            ORDER BY id
+            LIMIT %s
+            """, (desde_id, antes_de, limite))
+            if filas is None:
+                self.db.desconectar()
+                raise Error(msg="No se pudieron leer las notificaciones a eliminar")
+            
+            ids = [fila['id'] for fila in filas]
+            if ids and not self.db.ejecutar_accion(f"""
+            DELETE FROM notificacion WHERE id IN ({', '.join(['%s'] * len(ids))}) AND {condicion}
+            """, (*ids, antes_de)):
+                self.db.desconectar()
+                raise Error(msg="No se pudieron eliminar las notificaciones")
+            self.db.desconectar()
+        return ids
\ No newline at end of file
@@ -0,0 +1,366 @@
+# models/recurrencia.py
+# Eventos que se repiten: la regla se guarda una vez en evento_recurrencia y solo las
+# ocurrencias con cambios (completadas, movidas, canceladas) tienen fila en evento_ocurrencia.
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from database.conexion_db import ConexionDB, transaccion
+from database.sentencias import sentencia
+from database.registro import obtener_logger
+from models.asignatura import AsignaturaModel
+from utils.cambios import registrar_cambio
+from utils.recurrencia import es_ocurrencia, fin_serie, formatear_regla, ocurrencias, parsear_regla
+
+log = obtener_logger('models.recurrencia')
+
+
+class RecurrenciaModel:
+    """
+    Series de eventos. Las ocurrencias no se guardan: las lecturas expanden la regla
+    solo dentro de la ventana pedida (generadores de utils.recurrencia) y aplican las
+    excepciones. Cada ocurrencia tiene la forma de una fila de evento (id None, más
+    recurrencia_id y fecha_original), así se mezcla con los eventos sueltos.
+    """
+
+    # Las series no terminan, así que "todas las vencidas" no está acotado: en urgentes y
+    # estadísticas cuentan las ocurrencias pendientes de los últimos DIAS_VENCIDAS días
+    DIAS_VENCIDAS = 7
+    HORAS_URGENTES = 48
+    ESTADOS = ('pendiente', 'completada', 'cancelada')
+    PRIORIDADES = ('baja', 'media', 'alta')
+    TIPOS = ('tarea', 'evaluacion', 'evento')
+
+    # Series que tocan [desde, hasta), más las que tienen una ocurrencia movida a ese rango.
+    # Parámetros: (usuario_id, hasta, desde, usuario_id, desde, hasta)
+    SQL_SERIES_EN_RANGO = sentencia('recurrencia.series_en_rango', """
+    SELECT r.*
+    FROM evento_recurrencia r
+    WHERE r.usuario_id = %s
+    AND r.inicio < %s
+    AND (r.fin IS NULL OR r.fin >= %s)
+    UNION
+    SELECT r.*
+    FROM evento_recurrencia r
+    INNER JOIN evento_ocurrencia o ON o.recurrencia_id = r.id
+    WHERE o.usuario_id = %s
+    AND o.fecha_limite >= %s
+    AND o.fecha_limite < %s
+    """)
+    # Excepciones cuya fecha original o movida cae en [desde, hasta)
+    SQL_EXCEPCIONES_EN_RANGO = sentencia('recurrencia.excepciones_en_rango', """
+    SELECT o.recurrencia_id, o.fecha_original, o.estado, o.fecha_limite
+    FROM evento_ocurrencia o
+    WHERE o.usuario_id = %s
+    AND (o.fecha_original >= %s AND o.fecha_original < %s
+         OR o.fecha_limite >= %s AND o.fecha_limite < %s)
+    """)
+    SQL_SERIE = sentencia('recurrencia.serie', "SELECT * FROM evento_recurrencia WHERE id = %s")
+    SQL_EXCEPCIONES_DESDE = sentencia('recurrencia.excepciones_desde', """
+    SELECT recurrencia_id, fecha_original, estado, fecha_limite
+    FROM evento_ocurrencia
+    WHERE recurrencia_id = %s
+    AND (fecha_original >= %s OR fecha_limite >= %s)
+    """)
+    SQL_EXCEPCION = sentencia('recurrencia.excepcion', """
+    SELECT estado, fecha_limite FROM evento_ocurrencia
+    WHERE recurrencia_id = %s AND fecha_original = %s
+    FOR UPDATE
+    """)
+    SQL_CREAR = sentencia('recurrencia.crear', """
+    INSERT INTO evento_recurrencia (titulo, descripcion, prioridad, tipo, inicio, regla, fin,
+                                    asignatura_id, usuario_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """)
+    SQL_ELIMINAR = sentencia('recurrencia.eliminar',
+                             "DELETE FROM evento_recurrencia WHERE id = %s AND usuario_id = %s")
+    SQL_GUARDAR_EXCEPCION = sentencia('recurrencia.guardar_excepcion', """
+    INSERT INTO evento_ocurrencia (recurrencia_id, fecha_original, estado, fecha_limite, usuario_id)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE estado = VALUES(estado), fecha_limite = VALUES(fecha_limite)
+    """)
+    SQL_QUITAR_EXCEPCION = sentencia('recurrencia.quitar_excepcion', """
+    DELETE FROM evento_ocurrencia WHERE recurrencia_id = %s AND fecha_original = %s
+    """)
+    # Cambia la versión de la serie (ETag del calendario) al tocar una de sus ocurrencias
+    SQL_TOCAR_SERIE = sentencia('recurrencia.tocar', """
+    UPDATE evento_recurrencia SET fecha_actualizacion = NOW(6) WHERE id = %s
+    """)
+    SQL_QUITAR_RECORDATORIO = sentencia('recurrencia.quitar_recordatorio', """
+    DELETE FROM notificacion WHERE recurrencia_id = %s AND fecha_enviada IS NULL
+    """)
+    SQL_CREAR_RECORDATORIO = sentencia('recurrencia.crear_recordatorio', """
+    INSERT INTO notificacion (tipo, mensaje, fecha_programada, recurrencia_id, fecha_ocurrencia, usuario_id)
+    VALUES ('recordatorio_24h', %s, %s, %s, %s, %s)
+    """)
+
+    def __init__(self):
+        self.db = ConexionDB()
+        self.asignaturas = AsignaturaModel()
+
+    def crear_serie(self, titulo, inicio, regla, usuario_id, descripcion=None,
+                    prioridad='media', tipo='tarea', asignatura_id=None):
+        """
+        Crea una serie desde `inicio` (primera ocurrencia) con una regla RRULE
+        ('FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250715'). Lanza ValueError si los datos no
+        son válidos; retorna el id, o None si falla la BD.
+        """
+        if not isinstance(titulo, str) or not titulo.strip() or len(titulo.strip()) > 255:
+            raise ValueError("titulo es obligatorio (máximo 255 caracteres)")
+        titulo = titulo.strip()
+        if descripcion is not None and not isinstance(descripcion, str):
+            raise ValueError("descripcion debe ser texto")
+        if not isinstance(regla, str):
+            raise ValueError("regla debe ser texto, p.ej. FREQ=WEEKLY;BYDAY=MO")
+        inicio = self._fecha(inicio)
+        regla = parsear_regla(regla)
+        if prioridad not in self.PRIORIDADES:
+            raise ValueError(f"prioridad debe ser una de: {', '.join(self.PRIORIDADES)}")
+        if tipo not in self.TIPOS:
+            raise ValueError(f"tipo debe ser uno de: {', '.join(self.TIPOS)}")
+        if asignatura_id is not None:
+            # Primero el tipo: un valor JSON no hashable (lista, objeto) no puede ir al set
+            if not isinstance(asignatura_id, int) or isinstance(asignatura_id, bool):
+                raise ValueError("asignatura_id debe ser un número")
+            if asignatura_id not in {a['id'] for a in self.asignaturas.obtener_por_usuario(usuario_id) or []}:
+                raise ValueError("La asignatura no existe o no es del usuario")
+
+        try:
+            # Serie y recordatorio de su primera ocurrencia se confirman juntos
+            with transaccion():
+                self.db.conectar()
+                insertada = self.db.ejecutar_accion(self.SQL_CREAR, (
+                    titulo, descripcion, prioridad, tipo, inicio, formatear_regla(regla),
+                    fin_serie(regla, inicio), asignatura_id, usuario_id))
+                recurrencia_id = self.db.obtener_ultimo_id()
+                self.db.desconectar()
+                if not insertada:
+                    raise Error(msg="No se pudo insertar la serie")
+
+                self.programar_recordatorio(recurrencia_id)
+                registrar_cambio(usuario_id)
+            return recurrencia_id
+        except Exception as e:
+            log.error("Error creando serie", extra={'error': str(e)})
+            return None
+
+    def eliminar_serie(self, recurrencia_id, usuario_id):
+        """Elimina la serie con sus excepciones y recordatorios (solo si es del usuario)"""
+        self.db.conectar()
+        success = self.db.ejecutar_accion(self.SQL_ELIMINAR, (recurrencia_id, usuario_id))
+        self.db.desconectar()
+        if success:
+            registrar_cambio(usuario_id)
+        return success
+
+    def ocurrencias_en_rango(self, usuario_id, desde, hasta, estado=None):
+        """
+        Ocurrencias con fecha_limite en [desde, hasta) en orden de fecha, como generador.
+        Las dos consultas (series y excepciones del rango) se hacen al llamar; la expansión
+        de cada regla es perezosa y no pasa de `hasta`. Las canceladas no aparecen;
+        estado filtra entre 'pendiente' y 'completada'.
+        """
+        self.db.conectar()
+        series = self.db.ejecutar_consulta(self.SQL_SERIES_EN_RANGO,
+                                           (usuario_id, hasta, desde, usuario_id, desde, hasta))
+        excepciones = self.db.ejecutar_consulta(self.SQL_EXCEPCIONES_EN_RANGO,
+                                                (usuario_id, desde, hasta, desde, hasta)) if series else []
+        self.db.desconectar()
+        if not series or excepciones is None:
+            return iter(())
+
+        por_serie = {}
+        for fila in excepciones:
+            por_serie.setdefault(fila['recurrencia_id'], {})[fila['fecha_original']] = fila
+        expandidas = heapq.merge(*(self._expandir(serie, por_serie.get(serie['id'], {}), desde, hasta)
+                                   for serie in series),
+                                 key=lambda o: o['fecha_limite'])
+        if estado is not None:
+            expandidas = (o for o in expandidas if o['estado'] == estado)
+        return self.asignaturas.decorar_iterando(expandidas)
+
+    def ventana_activa(self, usuario_id, ahora=None):
+        """
+        Ocurrencias pendientes que cuentan para urgentes y estadísticas: de los últimos
+        DIAS_VENCIDAS días (vencidas) a las próximas HORAS_URGENTES horas
+        """
+        ahora = ahora or datetime.now()
+        return list(self.ocurrencias_en_rango(usuario_id, ahora - timedelta(days=self.DIAS_VENCIDAS),
+                                              ahora + timedelta(hours=self.HORAS_URGENTES),
+                                              estado='pendiente'))
+
+    def modificar_ocurrencia(self, recurrencia_id, fecha_original, usuario_id, estado=None, fecha_limite=None):
+        """
+        Completa, cancela o mueve una ocurrencia (la identifica su fecha según la regla).
+        estado='pendiente' con fecha_limite=fecha_original la devuelve a como era.
+        Lanza ValueError si la ocurrencia o los cambios no son válidos.
+        """
+        fecha_original = self._fecha(fecha_original)
+        if estado is not None and estado not in self.ESTADOS:
+            raise ValueError(f"estado debe ser uno de: {', '.join(self.ESTADOS)}")
+        if fecha_limite is not None:
+            fecha_limite = self._fecha(fecha_limite)
+            if fecha_limite != fecha_original and fecha_limite < datetime.now():
+                raise ValueError("La fecha límite no puede ser en el pasado")
+
+        with transaccion():
+            self.db.conectar()
+            serie = self.db.ejecutar_consulta(self.SQL_SERIE, (recurrencia_id,))
+            if not serie or serie[0]['usuario_id'] != usuario_id:
+                self.db.desconectar()
+                raise ValueError("La serie no existe")
+            serie = serie[0]
+            if not es_ocurrencia(parsear_regla(serie['regla']), serie['inicio'], fecha_original):
+                self.db.desconectar()
+                raise ValueError("La fecha no corresponde a una ocurrencia de la serie")
+
+            actual = self.db.ejecutar_consulta(self.SQL_EXCEPCION, (recurrencia_id, fecha_original))
+            actual = actual[0] if actual else {'estado': 'pendiente', 'fecha_limite': None}
+            estado = estado or actual['estado']
+            fecha_limite = fecha_limite or actual['fecha_limite']
+            if fecha_limite == fecha_original:
+                fecha_limite = None
+
+            # Sin cambios respecto de la regla no hace falta guardar la excepción
+            if estado == 'pendiente' and fecha_limite is None:
+                guardado = self.db.ejecutar_accion(self.SQL_QUITAR_EXCEPCION, (recurrencia_id, fecha_original))
+            else:
+                guardado = self.db.ejecutar_accion(self.SQL_GUARDAR_EXCEPCION, (
+                    recurrencia_id, fecha_original, estado, fecha_limite, usuario_id))
+            if not guardado or not self.db.ejecutar_accion(self.SQL_TOCAR_SERIE, (recurrencia_id,)):
+                self.db.desconectar()
+                raise Error(msg="No se pudo guardar la ocurrencia")
+            self.db.desconectar()
+
+            self.programar_recordatorio(recurrencia_id)
+            registrar_cambio(usuario_id)
+
+        return self._ocurrencia(serie, fecha_original, fecha_limite or fecha_original, estado)
+
+    def programar_recordatorio(self, recurrencia_id, recordada=None):
+        """
+        Deja programado solo el recordatorio de la próxima ocurrencia pendiente (24 h antes):
+        borra el que no se ha enviado y crea el nuevo. recordada: fecha_original de la
+        ocurrencia cuyo recordatorio se acaba de entregar (el despachador la salta).
+        Se usa dentro de la transacción de quien cambia la serie; lanza Error si falla.
+        Retorna la fecha de la ocurrencia recordada, o None si no queda ninguna.
+        """
+        desde = datetime.now() + timedelta(hours=24)
+        with transaccion():
+            self.db.conectar()
+            serie = self.db.ejecutar_consulta(self.SQL_SERIE, (recurrencia_id,))
+            excepciones = self.db.ejecutar_consulta(self.SQL_EXCEPCIONES_DESDE, (recurrencia_id, desde, desde))
+            if serie is None or excepciones is None:
+                self.db.desconectar()
+                raise Error(msg="No se pudo leer la serie")
+            if not serie:
+                self.db.desconectar()
+                return None
+            serie = serie[0]
+
+            siguiente = self._siguiente(serie, {e['fecha_original']: e for e in excepciones}, desde, recordada)
+            borrado = self.db.ejecutar_accion(self.SQL_QUITAR_RECORDATORIO, (recurrencia_id,))
+            if borrado and siguiente is not None:
+                borrado = self.db.ejecutar_accion(self.SQL_CREAR_RECORDATORIO, (
+                    'Recordatorio: Tarea vence en 24 horas', siguiente['fecha_limite'] - timedelta(hours=24),
+                    recurrencia_id, siguiente['fecha_original'], serie['usuario_id']))
+            self.db.desconectar()
+            if not borrado:
+                raise Error(msg="No se pudo programar el recordatorio de la serie")
+
+        return siguiente['fecha_limite'] if siguiente else None
+
+    @staticmethod
+    def contar(ocurrencias_pendientes, ahora):
+        """Cuánto suman a las estadísticas las ocurrencias de ventana_activa()"""
+        conteo = dict.fromkeys(('total', 'pendientes', 'vencidas', 'urgentes', 'proximas_vencer'), 0)
+        for ocurrencia in ocurrencias_pendientes:
+            conteo['total'] += 1
+            conteo['pendientes'] += 1
+            conteo['vencidas' if ocurrencia['fecha_limite'] < ahora else 'proximas_vencer'] += 1
+            if ocurrencia['prioridad'] == 'alta':
+                conteo['urgentes'] += 1
+        return conteo
+
+    @staticmethod
+    def mezclar(filas, ocurrencias_ordenadas, limite=None):
+        """Eventos y ocurrencias (ambos ya ordenados por fecha_limite) en una sola lista ordenada"""
+        mezcla = heapq.merge(filas, ocurrencias_ordenadas, key=lambda fila: fila['fecha_limite'])
+        return list(itertools.islice(mezcla, limite))
+
+    def _siguiente(self, serie, excepciones, desde, recordada):
+        """Primera ocurrencia pendiente desde `desde`, buscando en ventanas que se duplican"""
+        regla = parsear_regla(serie['regla'])
+        ultima = serie['fin']
+        if ultima is not None:
+            ultima = max([ultima] + [e['fecha_limite'] for e in excepciones.values() if e['fecha_limite']])
+        tope = desde + timedelta(days=5 * 366)
+
+        inicio, paso = desde, timedelta(days=7)
+        while inicio < tope and (ultima is None or inicio <= ultima):
+            for ocurrencia in self._expandir(serie, excepciones, inicio, inicio + paso, regla):
+                if ocurrencia['estado'] == 'pendiente' and ocurrencia['fecha_original'] != recordada:
+                    return ocurrencia
+            inicio, paso = inicio + paso, paso * 2
+        return None
+
+    @classmethod
+    def _expandir(cls, serie, excepciones, desde, hasta, regla=None):
+        """
+        Generador de las ocurrencias de una serie con fecha_limite en [desde, hasta), en orden.
+        excepciones: {fecha_original: fila de evento_ocurrencia} que tocan el rango.
+        """
+        regla = regla or parsear_regla(serie['regla'])
+        movidas = sorted((e for e in excepciones.values()
+                          if e['fecha_limite'] is not None and e['estado'] != 'cancelada'
+                          and desde <= e['fecha_limite'] < hasta),
+                         key=lambda e: e['fecha_limite'])
+
+        def en_su_fecha():
+            for fecha in ocurrencias(regla, serie['inicio'], desde, hasta):
+                excepcion = excepciones.get(fecha)
+                if excepcion is None:
+                    yield cls._ocurrencia(serie, fecha, fecha, 'pendiente')
+                elif excepcion['fecha_limite'] is None and excepcion['estado'] != 'cancelada':
+                    yield cls._ocurrencia(serie, fecha, fecha, excepcion['estado'])
+
+        yield from heapq.merge(en_su_fecha(),
+                               (cls._ocurrencia(serie, e['fecha_original'], e['fecha_limite'], e['estado'])
+                                for e in movidas),
+                               key=lambda o: o['fecha_limite'])
+
+    @staticmethod
+    def _ocurrencia(serie, fecha_original, fecha_limite, estado):
+        return {
+            'id': None,
+            'recurrencia_id': serie['id'],
+            'fecha_original': fecha_original,
+            'titulo': serie['titulo'],
+            'descripcion': serie['descripcion'],
+            'fecha_limite': fecha_limite,
+            'prioridad': serie['prioridad'],
+            'estado': estado,
+            'tipo': serie['tipo'],
+            'profesor': serie['profesor'],
+            'asignatura_id': serie['asignatura_id'],
+            'usuario_id': serie['usuario_id'],
+            'fecha_creacion': serie['fecha_creacion'],
+            'fecha_actualizacion': serie['fecha_actualizacion'],
+        }
+
+    @staticmethod
+    def _fecha(valor):
+        """
+        datetime (al segundo, como DATETIME) desde un datetime o un texto ISO
+        ('2025-03-10T14:00'); ValueError si no lo es
+        """
+        if not isinstance(valor, datetime):
+            try:
+                valor = datetime.fromisoformat(valor)
+            except (TypeError, ValueError):
+                raise ValueError("Las fechas deben tener formato AAAA-MM-DDTHH:MM") from None
+        if valor.tzinfo is not None:
+            raise ValueError("Las fechas van en hora local, sin zona horaria")
+        return valor.replace(microsecond=0)
@@ -1,10 +1,27 @@
 # models/usuario.py
+import secrets
+
 from database.conexion_db import ConexionDB
-from utils.security import SecurityManager
+from database.sentencias import sentencia
+from utils.security import SecurityManager, SeguridadSaturadaError
+from database.registro import obtener_logger
+
+log = obtener_logger('models.usuario')
 
 class UsuarioModel:
     """Modelo para operaciones de usuario con encriptación bcrypt"""
     
+    # Sentencias preparadas (database/sentencias.py).
+    # email_lc (generada, con índice único): filtrar por email recorre toda la tabla
+    SQL_AUTENTICAR = sentencia('usuario.autenticar',
+                               "SELECT id, nombre, email, password_hash, rol FROM usuario WHERE email_lc = LOWER(%s)")
+    SQL_POR_EMAIL = sentencia('usuario.por_email', "SELECT id, email FROM usuario WHERE email_lc = LOWER(%s)")
+    SQL_POR_ID = sentencia('usuario.por_id',
+                           "SELECT id, nombre, email, rol, fecha_registro FROM usuario WHERE id = %s")
+    SQL_ULTIMO_ACCESO = sentencia('usuario.ultimo_acceso', "UPDATE usuario SET ultimo_acceso = NOW() WHERE id = %s")
+    SQL_ID_POR_TOKEN = sentencia('usuario.id_por_token',
+                                 "SELECT id FROM usuario WHERE token_calendario = %s AND activo = 1")
+    
     def __init__(self):
         self.db = ConexionDB()
     
@@ -35,12 +52,12 @@ class UsuarioModel:
             self.db.desconectar()
             return user_id
         except Exception as e:
-            print(f"❌ Error creando usuario: {e}")
+            log.error("Error creando usuario", extra={'error': str(e)})
             return None
     
     def autenticar(self, email, password):
         """Autentica usuario verificando hash"""
-        query = "SELECT id, nombre, email, password_hash, rol FROM usuario WHERE email = %s"
+        query = self.SQL_AUTENTICAR
         
         self.db.conectar()
         result = self.db.ejecutar_consulta(query, (email,))
@@ -49,13 +66,29 @@ class UsuarioModel:
         if result and len(result) > 0:
             user = result[0]
             if SecurityManager.verify_password(password, user['password_hash']):
+                # Hash con un costo distinto al actual: se regenera aprovechando la contraseña en claro
+                if SecurityManager.necesita_rehash(user['password_hash']):
+                    try:
+                        nuevo_hash = SecurityManager.hash_password(password)
+                        self.actualizar_password_hash(user['id'], nuevo_hash)
+                    except SeguridadSaturadaError:
+                        pass  # Se reintentará en el próximo login
                 del user['password_hash']  # NUNCA enviar el hash
                 return user
         return None
     
+    def actualizar_password_hash(self, user_id, password_hash):
+        """Reemplaza el hash guardado (rehash al cambiar el costo de bcrypt)"""
+        query = "UPDATE usuario SET password_hash = %s WHERE id = %s"
+        
+        self.db.conectar()
+        success = self.db.ejecutar_accion(query, (password_hash, user_id))
+        self.db.desconectar()
+        return success
+    
     def obtener_por_email(self, email):
         """Busca usuario por email (para verificar duplicados)"""
-        query = "SELECT id, email FROM usuario WHERE email = %s"
+        query = self.SQL_POR_EMAIL
     
         self.db.conectar()
         result = self.db.ejecutar_consulta(query, (email,))
@@ -65,7 +98,7 @@ class UsuarioModel:
     
     def obtener_por_id(self, user_id):
         """Obtiene usuario por ID (para sesiones)"""
-        query = "SELECT id, nombre, email, rol, fecha_registro FROM usuario WHERE id = %s"
+        query = self.SQL_POR_ID
         
         self.db.conectar()
         result = self.db.ejecutar_consulta(query, (user_id,))
@@ -75,9 +108,41 @@ class UsuarioModel:
     
     def actualizar_ultimo_acceso(self, user_id):
         """Actualiza la fecha de último acceso"""
-        query = "UPDATE usuario SET ultimo_acceso = NOW() WHERE id = %s"
+        query = self.SQL_ULTIMO_ACCESO
         
         self.db.conectar()
         success = self.db.ejecutar_accion(query, (user_id,))
         self.db.desconectar()
-        return success
\ No newline at end of file
+        return success
+    
+    def obtener_token_calendario(self, user_id):
+        """Token secreto de la suscripción iCalendar del usuario (se crea la primera vez)"""
+        query = "SELECT token_calendario FROM usuario WHERE id = %s"
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, (user_id,))
+        self.db.desconectar()
+        
+        if not result:
+            return None
+        return result[0]['token_calendario'] or self.regenerar_token_calendario(user_id)
+    
+    def regenerar_token_calendario(self, user_id):
+        """Crea un token nuevo (invalida la URL de suscripción anterior)"""
+        token = secrets.token_urlsafe(32)
+        query = "UPDATE usuario SET token_calendario = %s WHERE id = %s"
+        
+        self.db.conectar()
+        success = self.db.ejecutar_accion(query, (token, user_id))
+        self.db.desconectar()
+        return token if success else None
+    
+    def obtener_id_por_token_calendario(self, token):
+        """Usuario dueño de un token de suscripción (o None)"""
+        query = self.SQL_ID_POR_TOKEN
+        
+        self.db.conectar()
+        result = self.db.ejecutar_consulta(query, (token,))
+        self.db.desconectar()
+        
+        return result[0]['id'] if result else None
@@ -0,0 +1,200 @@
+# services/calendario_ics.py
+# Feed iCalendar (.ics) por usuario para suscribirse desde el calendario del teléfono
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from models.evento import EventoModel
+from models.usuario import UsuarioModel
+from utils import cambios
+
+PRIORIDAD_ICS = {'alta': 1, 'media': 5, 'baja': 9}
+
+
+class FeedCalendario:
+    """
+    Genera el .ics de un usuario en streaming y guarda el resultado en memoria,
+    asociado a la versión de cambios del usuario (utils.cambios). Mientras la
+    versión no cambie, cada sondeo del cliente se responde desde la caché sin
+    tocar la BD.
+
+    El ETag sale solo de los datos (EventoModel.ultima_modificacion), así que es
+    el mismo en todos los procesos y entre reinicios: sin caché basta una consulta
+    barata para responder 304.
+
+    El TTL acota cuánto puede quedar desactualizado un feed si la escritura
+    ocurrió en otro proceso, cuya versión este proceso no ve; ttl_tokens hace lo
+    mismo con un token regenerado desde otro proceso.
+    """
+
+    def __init__(self, ttl=300, max_usuarios=500, dias_historial=90, ttl_tokens=60, max_tokens=1000):
+        self.evento_model = EventoModel()
+        self.usuario_model = UsuarioModel()
+        self.ttl = ttl
+        self.max_usuarios = max_usuarios
+        self.dias_historial = dias_historial
+        self.ttl_tokens = ttl_tokens
+        self.max_tokens = max_tokens
+        self._feeds = OrderedDict()   # usuario_id -> (version, expira, etag, cuerpo)
+        self._tokens = OrderedDict()  # token -> (usuario_id, expira)
+        self._lock = threading.Lock()
+
+    def usuario_por_token(self, token):
+        """Dueño del token de suscripción o None; se vuelve a validar en la BD cada ttl_tokens"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._tokens.get(token)
+            if entrada is not None:
+                if entrada[1] > ahora:
+                    self._tokens.move_to_end(token)
+                    return entrada[0]
+                del self._tokens[token]
+        usuario_id = self.usuario_model.obtener_id_por_token_calendario(token)
+        if usuario_id is not None:
+            with self._lock:
+                self._tokens[token] = (usuario_id, ahora + self.ttl_tokens)
+                self._tokens.move_to_end(token)
+                while len(self._tokens) > self.max_tokens:
+                    self._tokens.popitem(last=False)
+        return usuario_id
+
+    def olvidar_token(self, token):
+        """
+        Se llama al regenerar el token para que el anterior deje de funcionar
+        (en este proceso; los demás lo descartan al vencer su entrada)
+        """
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def vigente(self, usuario_id):
+        """(etag, cuerpo) cacheado si sigue vigente para la versión actual; si no, None"""
+        with self._lock:
+            entrada = self._feeds.get(usuario_id)
+            if entrada is None:
+                return None
+            version, expira, etag, cuerpo = entrada
+            if version != cambios.version(usuario_id) or expira <= time.monotonic():
+                del self._feeds[usuario_id]
+                return None
+            self._feeds.move_to_end(usuario_id)
+            return etag, cuerpo
+
+    def etag(self, usuario_id):
+        """ETag del feed según la versión de los datos del usuario y el día de inicio del historial"""
+        estado = self.evento_model.ultima_modificacion(usuario_id)
+        return hashlib.sha1(
+            f"{usuario_id}|{self._desde():%Y%m%d}|{estado['ultima']}|{estado['total']}".encode()
+        ).hexdigest()
+
+    def construir(self, usuario_id, etag):
+        """
+        Generador de bytes del feed (etag: el de etag(), leído antes). Se envía a medida
+        que se lee de la BD y, si se llega al final sin cambios de por medio, queda cacheado.
+        """
+        version = cambios.version(usuario_id)
+        desde = self._desde()
+
+        def generar():
+            partes = []
+            for linea in generar_ics(self.evento_model.iterar_para_calendario(usuario_id, desde)):
+                trozo = linea.encode('utf-8')
+                partes.append(trozo)
+                yield trozo
+            self._guardar(usuario_id, version, etag, b''.join(partes))
+
+        return generar()
+
+    def _desde(self):
+        """Inicio del historial del feed, a medianoche (cambia una vez al día, igual que el ETag)"""
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return hoy - timedelta(days=self.dias_historial)
+
+    def _guardar(self, usuario_id, version, etag, cuerpo):
+        with self._lock:
+            if cambios.version(usuario_id) != version:
+                return
+            self._feeds[usuario_id] = (version, time.monotonic() + self.ttl, etag, cuerpo)
+            self._feeds.move_to_end(usuario_id)
+            while len(self._feeds) > self.max_usuarios:
+                self._feeds.popitem(last=False)
+
+
+def generar_ics(eventos):
+    """Generador de líneas iCalendar (RFC 5545, terminadas en CRLF) para los eventos dados"""
+    yield from _lineas([
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//TaskU INACAP//Calendario//ES',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:TaskU',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+        'X-PUBLISHED-TTL:PT15M',
+    ])
+    for evento in eventos:
+        yield from _lineas(_vevent(evento))
+    yield from _lineas(['END:VCALENDAR'])
+
+
+def _vevent(evento):
+    modificado = evento.get('fecha_actualizacion') or evento.get('fecha_creacion') or datetime.now()
+    titulo = evento['titulo']
+    if evento.get('estado') == 'completada':
+        titulo = f"✔ {titulo}"
+    if evento.get('asignatura_nombre'):
+        titulo = f"[{evento['asignatura_nombre']}] {titulo}"
+
+    lineas = [
+        'BEGIN:VEVENT',
+        f"UID:evento-{evento['id']}@tasku",
+        f"DTSTAMP:{_utc(modificado)}",
+        f"DTSTART:{evento['fecha_limite']:%Y%m%dT%H%M%S}",
+        'DURATION:PT30M',
+        f"SUMMARY:{_escapar(titulo)}",
+        f"PRIORITY:{PRIORIDAD_ICS.get(evento.get('prioridad'), 0)}",
+    ]
+    if evento.get('descripcion'):
+        lineas.append(f"DESCRIPTION:{_escapar(evento['descripcion'])}")
+    if evento.get('asignatura_nombre'):
+        lineas.append(f"CATEGORIES:{_escapar(evento['asignatura_nombre'])}")
+    if evento.get('asignatura_color'):
+        lineas.append(f"X-TASKU-COLOR:{evento['asignatura_color']}")
+    lineas.append('END:VEVENT')
+    return lineas
+
+
+def _lineas(lineas):
+    for linea in lineas:
+        yield _plegar(linea) + '\r\n'
+
+
+def _plegar(linea, limite=75):
+    """Parte líneas de más de 75 octetos sin cortar caracteres UTF-8 (line folding)"""
+    if len(linea.encode('utf-8')) <= limite:
+        return linea
+    partes, actual, tamano = [], '', 0
+    for caracter in linea:
+        largo = len(caracter.encode('utf-8'))
+        # Las líneas de continuación empiezan con un espacio, que también cuenta
+        if tamano + largo > limite:
+            partes.append(actual)
+            actual, tamano = ' ', 1
+        actual += caracter
+        tamano += largo
+    partes.append(actual)
+    return '\r\n'.join(partes)
+
+
+def _escapar(texto):
+    return (texto.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+                 .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _utc(fecha):
+    """Hora local de MySQL → UTC en formato iCalendar"""
+    return fecha.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+feed_calendario = FeedCalendario()
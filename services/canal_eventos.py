@@ -0,0 +1,182 @@
+# services/canal_eventos.py
+# Pub/sub en memoria para el canal Server-Sent Events (/eventos/stream).
+# Las escrituras confirmadas (utils.cambios) y el despachador de recordatorios publican aquí;
+# cada pestaña abierta es una suscripción que espera sin tocar la BD.
+import itertools
+import json
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+
+from database.metricas import metricas
+from utils import cambios
+from utils.serializacion import fila_a_json
+
+
+class LimiteConexionesError(RuntimeError):
+    """El usuario ya tiene el máximo de conexiones abiertas al canal"""
+
+
+class Suscripcion:
+    """Cola de eventos de una conexión; `cerrada` se activa si el cliente no alcanzó a leer"""
+
+    def __init__(self, usuario_id, max_pendientes):
+        self.usuario_id = usuario_id
+        self.cola = queue.Queue(maxsize=max_pendientes)
+        self.cerrada = False
+
+    def entregar(self, evento):
+        if self.cerrada:
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except queue.Full:
+            # Cliente lento: se corta y al reconectar retoma con Last-Event-ID (o recarga todo)
+            self.cerrada = True
+
+    def siguiente(self, timeout):
+        """Próximo evento o None si pasó timeout sin novedades"""
+        try:
+            return self.cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class _Historial:
+    """Últimos eventos de un usuario y el mayor n que ya se descartó (para detectar huecos)"""
+
+    def __init__(self, maximo):
+        self.eventos = deque(maxlen=maximo)   # (n, instante, evento)
+        self.descartado = 0
+
+    def agregar(self, n, instante, evento):
+        if len(self.eventos) == self.eventos.maxlen:
+            self.descartado = self.eventos[0][0]
+        self.eventos.append((n, instante, evento))
+
+    def vencer(self, limite):
+        while self.eventos and self.eventos[0][1] < limite:
+            self.descartado = self.eventos.popleft()[0]
+
+
+class CanalEventos:
+    """
+    Broker por proceso. Los ids de evento son '<arranque>:<n>': con Last-Event-ID se
+    reenvía lo que el cliente no vio si sigue en el historial del usuario (los últimos
+    `historial` eventos, por `retencion` segundos). Si no (otro proceso, reinicio,
+    historial superado) se envía 'reset' para que el cliente recargue sus datos.
+    """
+
+    def __init__(self, max_conexiones=5, historial=50, retencion=300, max_pendientes=100):
+        self.max_conexiones = max_conexiones
+        self.historial = historial
+        self.retencion = retencion
+        self.max_pendientes = max_pendientes
+        self.arranque = secrets.token_hex(4)
+        self._secuencia = itertools.count(1)
+        self._suscripciones = {}    # usuario_id -> [Suscripcion]
+        self._historiales = {}      # usuario_id -> _Historial
+        self._publicados = 0
+        self._podado = 0            # mayor n de los historiales ya descartados
+        self._lock = threading.Lock()
+
+    def suscribir(self, usuario_id):
+        """Nueva suscripción; lanza LimiteConexionesError si el usuario llegó al máximo"""
+        suscripcion = Suscripcion(usuario_id, self.max_pendientes)
+        with self._lock:
+            actuales = self._suscripciones.setdefault(usuario_id, [])
+            if len(actuales) >= self.max_conexiones:
+                raise LimiteConexionesError(f"Máximo {self.max_conexiones} conexiones por usuario")
+            actuales.append(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            actuales = self._suscripciones.get(suscripcion.usuario_id, [])
+            if suscripcion in actuales:
+                actuales.remove(suscripcion)
+            if not actuales:
+                self._suscripciones.pop(suscripcion.usuario_id, None)
+
+    def publicar(self, usuario_id, tipo, datos=None):
+        """Envía un evento a las conexiones del usuario (no bloquea: se llama desde las escrituras)"""
+        if usuario_id is None:
+            return
+        n = next(self._secuencia)
+        evento = {'id': f"{self.arranque}:{n}", 'tipo': tipo,
+                  'datos': json.dumps(datos if datos is not None else {}, separators=(',', ':'))}
+        ahora = time.monotonic()
+        with self._lock:
+            historial = self._historiales.get(usuario_id)
+            if historial is None:
+                historial = self._historiales[usuario_id] = _Historial(self.historial)
+            historial.agregar(n, ahora, evento)
+            destinos = list(self._suscripciones.get(usuario_id, ()))
+            self._publicados += 1
+            if self._publicados % 1000 == 0:
+                self._podar(ahora)
+        for suscripcion in destinos:
+            suscripcion.entregar(evento)
+
+    def pendientes_desde(self, usuario_id, ultimo_id):
+        """
+        Eventos posteriores a ultimo_id (el Last-Event-ID del cliente),
+        o None si no se pueden reconstruir (el cliente debe recargar)
+        """
+        arranque, _, n = (ultimo_id or '').partition(':')
+        if arranque != self.arranque or not n.isdigit():
+            return None
+        n = int(n)
+        with self._lock:
+            historial = self._historiales.get(usuario_id)
+            if historial is None:
+                return None if n < self._podado else []
+            historial.vencer(time.monotonic() - self.retencion)
+            if n < historial.descartado:
+                return None   # hay eventos posteriores a n que ya no están
+            return [evento for m, _, evento in historial.eventos if m > n]
+
+    def posicion(self):
+        """Id a partir del cual un cliente recién sincronizado (tras 'reset') sigue escuchando"""
+        return f"{self.arranque}:{next(self._secuencia)}"
+
+    def publicar_recordatorios(self, notificaciones):
+        """Callback `entregar` de DespachadorRecordatorios: un evento por notificación"""
+        for notificacion in notificaciones:
+            self.publicar(notificacion['usuario_id'], 'recordatorio', fila_a_json({
+                'id': notificacion['id'],
+                'tipo': notificacion['tipo'],
+                'mensaje': notificacion['mensaje'],
+                'evento_id': notificacion['evento_id'],
+                'recurrencia_id': notificacion.get('recurrencia_id'),
+                'fecha_programada': notificacion['fecha_programada'],
+            }))
+
+    def _al_cambiar(self, usuario_id):
+        self.publicar(usuario_id, 'cambios')
+
+    def _podar(self, ahora):
+        """Descarta historiales vencidos de usuarios sin conexiones (con lock tomado)"""
+        limite = ahora - self.retencion
+        for usuario_id in [u for u, h in self._historiales.items()
+                           if u not in self._suscripciones and (not h.eventos or h.eventos[-1][1] < limite)]:
+            historial = self._historiales.pop(usuario_id)
+            if historial.eventos:
+                self._podado = max(self._podado, historial.eventos[-1][0])
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'usuarios_conectados': len(self._suscripciones),
+                'conexiones': sum(len(s) for s in self._suscripciones.values()),
+                'historiales': len(self._historiales),
+                'publicados': self._publicados,
+            }
+
+
+canal = CanalEventos()
+# Cada cambio confirmado de eventos/notificaciones de un usuario avisa a sus pestañas
+cambios.suscribir(canal._al_cambiar)
+metricas.agregar_colector('canal_eventos', canal.estadisticas)
@@ -0,0 +1,140 @@
+# services/dashboard_service.py
+# Datos del dashboard con sus consultas en paralelo, con caché por usuario
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from database.concurrencia import en_paralelo
+from database.conexion_db import ConexionDB
+from models.asignatura import AsignaturaModel
+from models.evento import EventoModel
+from models.notificacion import NotificacionModel
+from models.recurrencia import RecurrenciaModel
+from utils import cambios
+
+
+@dataclass
+class DashboardSnapshot:
+    """Todo lo que necesita /dashboard para un usuario"""
+    usuario_id: int
+    estadisticas: dict
+    urgentes: list
+    proximas_vencer: list
+    notificaciones: list
+    generado: datetime = field(default_factory=datetime.now)
+    # Partes que fallaron o vencieron (se muestran vacías; el snapshot no se cachea)
+    incompletas: list = field(default_factory=list)
+
+
+class DashboardService:
+    """
+    Arma el DashboardSnapshot con las partes del dashboard lanzadas a la vez
+    (database.concurrencia), cada una en su conexión del pool, y lo guarda
+    en memoria. Si una parte falla o supera `timeout` se muestra vacía y el resto
+    del dashboard igual se entrega.
+    Las ocurrencias de series (RecurrenciaModel.ventana_activa) se leen como una parte
+    más y se suman a estadísticas, urgentes y próximas a vencer.
+    Las escrituras de EventoModel / RecurrenciaModel / NotificacionModel invalidan la
+    caché del usuario a través de utils.cambios.
+    """
+
+    ESTADISTICAS_VACIAS = {
+        'total': 0,
+        'completadas': 0,
+        'pendientes': 0,
+        'vencidas': 0,
+        'urgentes': 0,
+        'proximas_vencer': 0
+    }
+
+    def __init__(self, ttl=60, horas_proximas=24, limite_notificaciones=20, timeout=2.0):
+        """
+        ttl: segundos que vive un snapshot aunque no haya escrituras
+             (los contadores 'vencidas' / 'próximas' dependen de la hora)
+        timeout: segundos máximos por consulta
+        """
+        self.db = ConexionDB()
+        self.asignaturas = AsignaturaModel()
+        self.recurrencias = RecurrenciaModel()
+        self.ttl = ttl
+        self.horas_proximas = horas_proximas
+        self.limite_notificaciones = limite_notificaciones
+        self.timeout = timeout
+        self._cache = {}
+        self._lock = threading.Lock()
+        cambios.suscribir(self.invalidar)
+
+    def obtener(self, usuario_id):
+        """Snapshot del usuario desde caché, o desde la BD si no hay uno vigente"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._cache.get(usuario_id)
+        if entrada and entrada[0] > ahora:
+            return entrada[1]
+
+        version = cambios.version(usuario_id)
+        snapshot = self._consultar(usuario_id)
+        if snapshot is None:
+            return None
+
+        with self._lock:
+            # Si hubo una escritura mientras consultábamos, no se cachea lo leído
+            if cambios.version(usuario_id) == version and not snapshot.incompletas:
+                self._cache[usuario_id] = (ahora + self.ttl, snapshot)
+        return snapshot
+
+    def invalidar(self, usuario_id):
+        """Descarta el snapshot cacheado del usuario"""
+        with self._lock:
+            self._cache.pop(usuario_id, None)
+
+    def limpiar(self):
+        """Vacía la caché completa"""
+        with self._lock:
+            self._cache.clear()
+
+    def _consultar(self, usuario_id):
+        ahora = datetime.now()
+        partes = en_paralelo({
+            'estadisticas': lambda: self._leer(EventoModel.SQL_ESTADISTICAS, (usuario_id, usuario_id)),
+            'urgentes': lambda: self._leer(EventoModel.SQL_URGENTES, (usuario_id,)),
+            'proximas_vencer': lambda: self._leer(EventoModel.SQL_PROXIMAS_VENCER,
+                                                  (usuario_id, self.horas_proximas)),
+            'notificaciones': lambda: self._leer(NotificacionModel.SQL_PENDIENTES,
+                                                 (usuario_id, self.limite_notificaciones)),
+            'ocurrencias': lambda: self.recurrencias.ventana_activa(usuario_id, ahora),
+        }, timeout=self.timeout)
+
+        incompletas = [nombre for nombre, resultado in partes.items() if not resultado.ok]
+        if len(incompletas) == len(partes):
+            return None
+
+        estadisticas = partes['estadisticas'].o([])
+        fila = estadisticas[0] if estadisticas else {}
+        ocurrencias = partes['ocurrencias'].o([])
+        conteo = RecurrenciaModel.contar(ocurrencias, ahora)
+        limite_proximas = ahora + timedelta(hours=self.horas_proximas)
+        return DashboardSnapshot(
+            usuario_id=usuario_id,
+            # SUM() devuelve NULL/Decimal: se normaliza a int
+            estadisticas={clave: int(fila.get(clave) or 0) + conteo.get(clave, 0)
+                          for clave in self.ESTADISTICAS_VACIAS},
+            urgentes=RecurrenciaModel.mezclar(self.asignaturas.decorar(partes['urgentes'].o([])),
+                                              ocurrencias, limite=10),
+            proximas_vencer=RecurrenciaModel.mezclar(
+                self.asignaturas.decorar(partes['proximas_vencer'].o([])),
+                [o for o in ocurrencias if ahora <= o['fecha_limite'] < limite_proximas]),
+            notificaciones=partes['notificaciones'].o([]),
+            incompletas=incompletas,
+        )
+
+    def _leer(self, query, params):
+        """Una consulta en la conexión de este hilo (ConexionDB es por hilo); None si falla"""
+        self.db.conectar()
+        try:
+            return self.db.ejecutar_consulta(query, params)
+        finally:
+            self.db.desconectar()
+
+dashboard_service = DashboardService()
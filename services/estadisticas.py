@@ -0,0 +1,137 @@
+# services/estadisticas.py
+# Reconciliación de usuario_estadisticas: recalcula los contadores desde `evento` y corrige desvíos
+# (escrituras hechas con los triggers desactivados, restauraciones parciales, carga inicial).
+import time
+
+from database.conexion_db import ConexionDB, transaccion
+from database.registro import configurar as configurar_registro, obtener_logger
+from utils.cambios import registrar_cambio
+
+log = obtener_logger('estadisticas')
+
+
+class ReconciliadorEstadisticas:
+    """
+    Recorre los usuarios por rangos de id. Por rango, compara lo guardado con lo
+    recalculado sin tomar locks; cada usuario con diferencias se corrige en su propia
+    transacción corta:
+      1. bloquea su fila de usuario_estadisticas (los triggers de escrituras concurrentes
+         esperan ese lock)
+      2. recalcula desde evento y guarda
+    Una escritura que corre a la par no se pierde: si ya confirmó entra en el recálculo,
+    y si no, su trigger suma el delta sobre el valor corregido.
+    """
+
+    CAMPOS = ('total', 'completadas', 'pendientes', 'urgentes', 'pendientes_sin_fecha')
+
+    SQL_RECALCULAR = """
+    SELECT usuario_id,
+           COUNT(*) as total,
+           SUM(estado = 'completada') as completadas,
+           SUM(estado = 'pendiente') as pendientes,
+           SUM(estado = 'pendiente' AND prioridad = 'alta') as urgentes,
+           SUM(estado = 'pendiente' AND fecha_limite IS NULL) as pendientes_sin_fecha
+    FROM evento
+    WHERE usuario_id >= %s AND usuario_id < %s
+    GROUP BY usuario_id
+    """
+
+    SQL_GUARDADAS = """
+    SELECT usuario_id, total, completadas, pendientes, urgentes, pendientes_sin_fecha
+    FROM usuario_estadisticas
+    WHERE usuario_id >= %s AND usuario_id < %s
+    """
+
+    SQL_BLOQUEAR = "SELECT usuario_id FROM usuario_estadisticas WHERE usuario_id = %s FOR UPDATE"
+
+    SQL_GUARDAR = """
+    INSERT INTO usuario_estadisticas (usuario_id, total, completadas, pendientes, urgentes, pendientes_sin_fecha)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE total = VALUES(total), completadas = VALUES(completadas),
+        pendientes = VALUES(pendientes), urgentes = VALUES(urgentes),
+        pendientes_sin_fecha = VALUES(pendientes_sin_fecha)
+    """
+
+    def __init__(self, tamano_lote=1000):
+        """tamano_lote: usuarios (rango de ids) comparados por consulta"""
+        self.db = ConexionDB()
+        self.tamano_lote = tamano_lote
+
+    def ejecutar(self, desde_id=None, hasta_id=None):
+        """Una pasada completa (o sobre [desde_id, hasta_id]); retorna los contadores"""
+        inicio = time.monotonic()
+        contadores = {'usuarios': 0, 'corregidos': 0}
+
+        if desde_id is None or hasta_id is None:
+            self.db.conectar()
+            limites = self.db.ejecutar_consulta("SELECT MIN(id) as minimo, MAX(id) as maximo FROM usuario")
+            self.db.desconectar()
+            if not limites or limites[0]['minimo'] is None:
+                return contadores
+            desde_id = limites[0]['minimo'] if desde_id is None else desde_id
+            hasta_id = limites[0]['maximo'] if hasta_id is None else hasta_id
+
+        for inicio_lote in range(desde_id, hasta_id + 1, self.tamano_lote):
+            fin_lote = min(inicio_lote + self.tamano_lote, hasta_id + 1)
+            desviados = self.comparar(inicio_lote, fin_lote)
+            contadores['usuarios'] += fin_lote - inicio_lote
+            for usuario_id in desviados:
+                if self.corregir(usuario_id):
+                    contadores['corregidos'] += 1
+
+        contadores['segundos'] = round(time.monotonic() - inicio, 3)
+        log.info("Reconciliación de estadísticas terminada", extra=contadores)
+        return contadores
+
+    def comparar(self, desde_id, hasta_id):
+        """Ids de usuario en [desde_id, hasta_id) cuyos contadores guardados no cuadran"""
+        self.db.conectar()
+        calculadas = self.db.ejecutar_consulta(self.SQL_RECALCULAR, (desde_id, hasta_id))
+        guardadas = self.db.ejecutar_consulta(self.SQL_GUARDADAS, (desde_id, hasta_id))
+        self.db.desconectar()
+        if calculadas is None or guardadas is None:
+            raise RuntimeError("No se pudieron leer las estadísticas")
+
+        calculadas = {fila['usuario_id']: self._valores(fila) for fila in calculadas}
+        guardadas = {fila['usuario_id']: self._valores(fila) for fila in guardadas}
+        vacias = (0,) * len(self.CAMPOS)
+        return sorted(usuario_id for usuario_id in calculadas.keys() | guardadas.keys()
+                      if calculadas.get(usuario_id, vacias) != guardadas.get(usuario_id, vacias))
+
+    def corregir(self, usuario_id):
+        """Recalcula y guarda los contadores de un usuario; True si había desvío"""
+        with transaccion():
+            self.db.conectar()
+            bloqueada = self.db.ejecutar_consulta(self.SQL_BLOQUEAR, (usuario_id,))
+            calculadas = self.db.ejecutar_consulta(self.SQL_RECALCULAR, (usuario_id, usuario_id + 1))
+            guardadas = self.db.ejecutar_consulta(self.SQL_GUARDADAS, (usuario_id, usuario_id + 1))
+            if bloqueada is None or calculadas is None or guardadas is None:
+                self.db.desconectar()
+                raise RuntimeError(f"No se pudieron recalcular las estadísticas del usuario {usuario_id}")
+
+            vacias = (0,) * len(self.CAMPOS)
+            nuevas = self._valores(calculadas[0]) if calculadas else vacias
+            anteriores = self._valores(guardadas[0]) if guardadas else vacias
+            if nuevas == anteriores:
+                # Lo corrigió una escritura concurrente (o nunca hubo desvío real)
+                self.db.desconectar()
+                return False
+            self.db.ejecutar_accion(self.SQL_GUARDAR, (usuario_id, *nuevas))
+            self.db.desconectar()
+            registrar_cambio(usuario_id)
+
+        log.warning("Estadísticas desviadas corregidas", extra={
+            'usuario_id': usuario_id,
+            'antes': dict(zip(self.CAMPOS, anteriores)),
+            'despues': dict(zip(self.CAMPOS, nuevas)),
+        })
+        return True
+
+    def _valores(self, fila):
+        # SUM() devuelve Decimal: se normaliza a int
+        return tuple(int(fila[campo] or 0) for campo in self.CAMPOS)
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    print(f"Estadísticas reconciliadas: {ReconciliadorEstadisticas().ejecutar()}")
@@ -0,0 +1,199 @@
+# services/importacion.py
+# Importación masiva de evaluaciones del semestre desde CSV o iCalendar (.ics)
+import csv
+from datetime import datetime, timezone
+
+from database.conexion_db import transaccion
+from models.evento import EventoModel
+
+PRIORIDADES = ('baja', 'media', 'alta')
+TIPOS = ('tarea', 'evaluacion', 'evento')
+FORMATOS_FECHA = ('%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+
+class ImportadorEventos:
+    """
+    Lee el archivo línea a línea, valida cada fila y va insertando los eventos
+    válidos en bloques (EventoModel.crear_eventos_masivo) dentro de una sola
+    transacción. Las filas inválidas no se insertan y se informan con su número.
+    """
+
+    def __init__(self, tamano_bloque=500):
+        self.evento_model = EventoModel()
+        self.tamano_bloque = tamano_bloque
+
+    def importar(self, usuario_id, lineas, formato):
+        """
+        lineas: iterable de líneas de texto (p.ej. un archivo abierto en modo texto)
+        formato: 'csv' o 'ics'
+        Retorna {'creados': n, 'ids': [...], 'errores': [{'fila': n, 'errores': [...]}]}
+        """
+        if formato == 'csv':
+            registros = leer_csv(lineas)
+        elif formato == 'ics':
+            registros = leer_ics(lineas)
+        else:
+            raise ValueError("Formato no soportado (usa csv o ics)")
+
+        ids, errores, bloque = [], [], []
+        ahora = datetime.now()
+        with transaccion():
+            for numero, registro in registros:
+                evento, problemas = validar_evento(registro, ahora)
+                if problemas:
+                    errores.append({'fila': numero, 'errores': problemas})
+                    continue
+                bloque.append(evento)
+                if len(bloque) >= self.tamano_bloque:
+                    ids.extend(self.evento_model.crear_eventos_masivo(usuario_id, bloque))
+                    bloque = []
+            if bloque:
+                ids.extend(self.evento_model.crear_eventos_masivo(usuario_id, bloque))
+
+        return {'creados': len(ids), 'ids': ids, 'errores': errores}
+
+
+def validar_evento(registro, ahora):
+    """Normaliza un registro crudo; retorna (evento, lista de errores)"""
+    errores = []
+
+    titulo = (registro.get('titulo') or '').strip()
+    if not titulo:
+        errores.append('titulo es obligatorio')
+    elif len(titulo) > 255:
+        errores.append('titulo supera 255 caracteres')
+
+    fecha = registro.get('fecha_limite')
+    if isinstance(fecha, str):
+        fecha = parsear_fecha(fecha)
+    if fecha is None:
+        errores.append('fecha_limite inválida (usa AAAA-MM-DD HH:MM)')
+    elif fecha < ahora:
+        errores.append('La fecha límite no puede ser en el pasado')
+
+    prioridad = (registro.get('prioridad') or 'media').strip().lower()
+    if prioridad not in PRIORIDADES:
+        errores.append(f"prioridad debe ser una de: {', '.join(PRIORIDADES)}")
+
+    tipo = (registro.get('tipo') or 'tarea').strip().lower()
+    if tipo not in TIPOS:
+        errores.append(f"tipo debe ser uno de: {', '.join(TIPOS)}")
+
+    asignatura_id = registro.get('asignatura_id')
+    if asignatura_id in (None, ''):
+        asignatura_id = None
+    else:
+        try:
+            asignatura_id = int(asignatura_id)
+        except (TypeError, ValueError):
+            errores.append('asignatura_id debe ser un número')
+
+    evento = {
+        'titulo': titulo,
+        'descripcion': (registro.get('descripcion') or '').strip() or None,
+        'fecha_limite': fecha,
+        'prioridad': prioridad,
+        'tipo': tipo,
+        'asignatura_id': asignatura_id,
+    }
+    return evento, errores
+
+
+def parsear_fecha(texto):
+    """Acepta los formatos del formulario / CSV; retorna None si no calza ninguno"""
+    texto = texto.strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def leer_csv(lineas):
+    """
+    Generador de (número de fila, dict) desde un CSV con encabezados:
+    titulo, descripcion, fecha_limite, prioridad, tipo, asignatura_id
+    """
+    lector = csv.DictReader(lineas)
+    for registro in lector:
+        # line_num cuenta líneas físicas (incluye encabezado y saltos dentro de comillas)
+        yield lector.line_num, {(k or '').strip().lower(): v for k, v in registro.items()}
+
+
+def leer_ics(lineas):
+    """
+    Generador de (número de línea del BEGIN, dict) por cada VEVENT / VTODO.
+    Se une el "line folding" de RFC 5545 al vuelo, sin cargar el archivo completo.
+    """
+    actual = None
+    inicio = 0
+    for numero, linea in _desplegar_ics(lineas):
+        nombre, _, valor = linea.partition(':')
+        # Los parámetros (DTSTART;TZID=...) se ignoran: la hora se toma como local
+        propiedad = nombre.partition(';')[0].upper()
+
+        if propiedad == 'BEGIN' and valor.upper() in ('VEVENT', 'VTODO'):
+            actual, inicio = {}, numero
+        elif propiedad == 'END' and valor.upper() in ('VEVENT', 'VTODO') and actual is not None:
+            # En un VTODO la fecha límite es DUE; en un VEVENT, DTSTART
+            actual['fecha_limite'] = actual.pop('due', None) or actual.pop('dtstart', None)
+            yield inicio, actual
+            actual = None
+        elif actual is not None:
+            if propiedad == 'SUMMARY':
+                actual['titulo'] = _desescapar_ics(valor)
+            elif propiedad == 'DESCRIPTION':
+                actual['descripcion'] = _desescapar_ics(valor)
+            elif propiedad in ('DUE', 'DTSTART'):
+                actual[propiedad.lower()] = _fecha_ics(valor)
+            elif propiedad == 'PRIORITY':
+                actual['prioridad'] = _prioridad_ics(valor)
+
+
+def _desplegar_ics(lineas):
+    """Une las líneas de continuación (las que empiezan con espacio o tab)"""
+    pendiente, numero_pendiente = None, 0
+    for numero, linea in enumerate(lineas, start=1):
+        linea = linea.rstrip('\r\n')
+        if linea[:1] in (' ', '\t') and pendiente is not None:
+            pendiente += linea[1:]
+            continue
+        if pendiente is not None:
+            yield numero_pendiente, pendiente
+        pendiente, numero_pendiente = linea, numero
+    if pendiente is not None:
+        yield numero_pendiente, pendiente
+
+
+def _desescapar_ics(valor):
+    return (valor.replace('\\n', '\n').replace('\\N', '\n')
+                 .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def _fecha_ics(valor):
+    """20250314T235900Z (UTC) / 20250314T235900 (local) / 20250314 (todo el día)"""
+    valor = valor.strip()
+    try:
+        if valor.endswith('Z'):
+            utc = datetime.strptime(valor, '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc)
+            return utc.astimezone().replace(tzinfo=None)
+        if 'T' in valor:
+            return datetime.strptime(valor, '%Y%m%dT%H%M%S')
+        # Evento de día completo: vence al final del día
+        return datetime.strptime(valor, '%Y%m%d').replace(hour=23, minute=59)
+    except ValueError:
+        return None
+
+
+def _prioridad_ics(valor):
+    """PRIORITY de iCalendar: 1-4 alta, 5 media, 6-9 baja (0 = sin definir)"""
+    try:
+        numero = int(valor)
+    except ValueError:
+        return None
+    if 1 <= numero <= 4:
+        return 'alta'
+    if numero >= 6:
+        return 'baja'
+    return 'media'
@@ -0,0 +1,205 @@
+# services/recordatorios.py
+# Despachador de recordatorios: entrega las filas de `notificacion` cuya fecha_programada ya llegó
+import threading
+import time
+from datetime import datetime, timedelta
+
+from database.conexion_db import ConexionDB, transaccion
+from database.metricas import metricas
+from database.registro import configurar as configurar_registro, obtener_logger
+from models.recurrencia import RecurrenciaModel
+from utils.cambios import registrar_cambio
+
+log = obtener_logger('recordatorios')
+
+
+class DespachadorRecordatorios:
+    """
+    Toma lotes de notificaciones vencidas con SELECT ... FOR UPDATE SKIP LOCKED,
+    así varios procesos pueden trabajar la misma cola sin pisarse: cada uno
+    bloquea (y se salta) las filas que otro ya reclamó hasta su commit.
+
+    Por lote:
+      - usuarios con notificaciones desactivadas → se marcan enviadas sin entregar
+      - usuarios en horario silencioso → se reprograman al fin del horario
+      - el resto → fecha_enviada = NOW() en un solo UPDATE y luego entregar(lista)
+      - recordatorios de series entregados u omitidos → se programa el de la
+        ocurrencia siguiente (cada serie tiene a lo más uno pendiente)
+    """
+
+    SQL_RECLAMAR = """
+    SELECT n.id, n.tipo, n.mensaje, n.fecha_programada, n.evento_id, n.recurrencia_id,
+           n.fecha_ocurrencia, n.usuario_id,
+           c.notificaciones_activas, c.horario_silencioso_inicio, c.horario_silencioso_fin,
+           NOW() as ahora
+    FROM notificacion n
+    LEFT JOIN configuracion c ON c.id_usuario = n.usuario_id
+    WHERE n.fecha_enviada IS NULL
+    AND n.fecha_programada <= NOW()
+    ORDER BY n.fecha_programada ASC
+    LIMIT %s
+    FOR UPDATE OF n SKIP LOCKED
+    """
+
+    def __init__(self, tamano_lote=200, intervalo=5, entregar=None):
+        """
+        tamano_lote: notificaciones reclamadas por transacción
+        intervalo: segundos de espera cuando la cola quedó vacía
+        entregar: función que recibe la lista de notificaciones a entregar
+        """
+        self.db = ConexionDB()
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.entregar = entregar
+        self.recurrencias = RecurrenciaModel()
+        self._inicio = time.monotonic()
+        self._contadores = {
+            'lotes': 0,
+            'entregadas': 0,
+            'omitidas': 0,
+            'pospuestas': 0,
+            'errores': 0,
+            'lag_ultimo_s': 0.0,
+            'lag_max_s': 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def procesar_lote(self):
+        """Reclama y procesa un lote; retorna cuántas notificaciones se reclamaron"""
+        with transaccion():
+            self.db.conectar()
+            filas = self.db.ejecutar_consulta(self.SQL_RECLAMAR, (self.tamano_lote,))
+            if filas is None:
+                self.db.desconectar()
+                raise RuntimeError("No se pudo leer la cola de notificaciones")
+
+            entregar, omitir, posponer = [], [], {}
+            for fila in filas:
+                if fila['notificaciones_activas'] == 0:
+                    omitir.append(fila['id'])
+                    continue
+                fin = fin_horario_silencioso(fila['ahora'],
+                                             fila['horario_silencioso_inicio'],
+                                             fila['horario_silencioso_fin'])
+                if fin is not None:
+                    posponer[fila['id']] = fin
+                else:
+                    entregar.append(fila)
+
+            # Se marcan antes de entregar, en la misma transacción: si un UPDATE falla no se
+            # entrega nada, y si falla la entrega el rollback las devuelve a la cola
+            enviadas = [f['id'] for f in entregar] + omitir
+            if enviadas:
+                marcas = ', '.join(['%s'] * len(enviadas))
+                if not self.db.ejecutar_accion(
+                        f"UPDATE notificacion SET fecha_enviada = NOW() WHERE id IN ({marcas})",
+                        tuple(enviadas)):
+                    self.db.desconectar()
+                    raise RuntimeError("No se pudieron marcar las notificaciones como enviadas")
+
+            if posponer:
+                casos = ' '.join(['WHEN %s THEN %s'] * len(posponer))
+                marcas = ', '.join(['%s'] * len(posponer))
+                params = [v for par in posponer.items() for v in par] + list(posponer)
+                if not self.db.ejecutar_accion(
+                        f"UPDATE notificacion SET fecha_programada = CASE id {casos} END WHERE id IN ({marcas})",
+                        tuple(params)):
+                    self.db.desconectar()
+                    raise RuntimeError("No se pudieron reprogramar las notificaciones en horario silencioso")
+            self.db.desconectar()
+
+            enviadas = set(enviadas)
+            for fila in filas:
+                if fila['recurrencia_id'] and fila['id'] in enviadas:
+                    self.recurrencias.programar_recordatorio(fila['recurrencia_id'],
+                                                             recordada=fila['fecha_ocurrencia'])
+
+            # La entrega va al final: cualquier error anterior deshace el lote sin haber avisado
+            if entregar and self.entregar:
+                self.entregar(entregar)
+
+            for usuario_id in {f['usuario_id'] for f in entregar}:
+                registrar_cambio(usuario_id)
+
+        self._registrar(filas, len(entregar), len(omitir), len(posponer))
+        return len(filas)
+
+    def ejecutar(self, detener=None):
+        """Bucle del worker: procesa lotes hasta que se active el evento detener"""
+        detener = detener or threading.Event()
+        while not detener.is_set():
+            try:
+                reclamadas = self.procesar_lote()
+            except Exception as e:
+                log.exception("Error despachando recordatorios")
+                with self._lock:
+                    self._contadores['errores'] += 1
+                reclamadas = 0
+            # Con lote completo probablemente hay más: se sigue sin esperar
+            if reclamadas < self.tamano_lote:
+                detener.wait(self.intervalo)
+
+    def estadisticas(self):
+        """Contadores de rendimiento y atraso de la cola"""
+        with self._lock:
+            datos = dict(self._contadores)
+        segundos = max(time.monotonic() - self._inicio, 1e-9)
+        datos['entregadas_por_s'] = datos['entregadas'] / segundos
+        return datos
+
+    def _registrar(self, filas, entregadas, omitidas, pospuestas):
+        lag = 0.0
+        if filas:
+            ahora = filas[0]['ahora']
+            lag = max((ahora - f['fecha_programada']).total_seconds() for f in filas)
+        with self._lock:
+            c = self._contadores
+            c['lotes'] += 1
+            c['entregadas'] += entregadas
+            c['omitidas'] += omitidas
+            c['pospuestas'] += pospuestas
+            c['lag_ultimo_s'] = lag
+            c['lag_max_s'] = max(c['lag_max_s'], lag)
+
+
+def iniciar_en_segundo_plano(**opciones):
+    """
+    Corre un despachador en un hilo daemon de este proceso; retorna (despachador, detener).
+    Sus contadores se exportan en /metrics como tasku_recordatorios_*.
+    """
+    despachador = DespachadorRecordatorios(**opciones)
+    metricas.agregar_colector('recordatorios', despachador.estadisticas)
+    detener = threading.Event()
+    threading.Thread(target=despachador.ejecutar, args=(detener,),
+                     name='tasku-recordatorios', daemon=True).start()
+    return despachador, detener
+
+
+def fin_horario_silencioso(ahora, inicio, fin):
+    """
+    Si `ahora` cae dentro del horario silencioso [inicio, fin) retorna el datetime
+    en que termina; si no, None. inicio/fin llegan de MySQL (TIME) como timedelta
+    y el horario puede cruzar la medianoche (p.ej. 22:00 → 07:00).
+    """
+    if inicio is None or fin is None or inicio == fin:
+        return None
+    medianoche = datetime(ahora.year, ahora.month, ahora.day)
+    hora = ahora - medianoche
+
+    if inicio < fin:
+        return medianoche + fin if inicio <= hora < fin else None
+    if hora >= inicio:
+        return medianoche + timedelta(days=1) + fin
+    if hora < fin:
+        return medianoche + fin
+    return None
+
+
+if __name__ == "__main__":
+    configurar_registro()
+    despachador = DespachadorRecordatorios()
+    print("📨 Despachador de recordatorios iniciado (Ctrl+C para detener)")
+    try:
+        despachador.ejecutar()
+    except KeyboardInterrupt:
+        print(f"Estadísticas: {despachador.estadisticas()}")
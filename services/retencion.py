@@ -0,0 +1,152 @@
+# services/retencion.py
+# Retención: borra notificaciones leídas antiguas y archiva eventos completados antiguos
+# (evento → evento_archivo) en lotes cortos por id, con pausas y reanudable.
+import threading
+import time
+from datetime import timedelta
+
+from database.conexion_db import ConexionDB, transaccion
+from database.registro import configurar as configurar_registro, obtener_logger
+from models.evento import EventoModel
+from models.notificacion import NotificacionModel
+
+log = obtener_logger('retencion')
+
+
+class TrabajoRetencion:
+    """
+    Cada trabajo recorre su tabla por clave primaria en lotes de `tamano_lote` filas;
+    cada lote es una transacción corta (locks breves, undo log acotado) que además guarda
+    el avance en retencion_progreso. Si el proceso se corta, la próxima ejecución sigue
+    desde el último lote confirmado y con el mismo corte de fecha.
+
+    Entre lotes se duerme `pausa` veces lo que tardó el lote (0.5 → a lo más ~2/3 del
+    tiempo escribiendo), para no competir con el tráfico ni atrasar las réplicas.
+    """
+
+    SQL_PROGRESO = "SELECT corte, ultimo_id, filas FROM retencion_progreso WHERE trabajo = %s"
+
+    SQL_GUARDAR_PROGRESO = """
+    INSERT INTO retencion_progreso (trabajo, corte, ultimo_id, filas)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE corte = VALUES(corte), ultimo_id = VALUES(ultimo_id), filas = VALUES(filas)
+    """
+
+    SQL_TERMINAR = "DELETE FROM retencion_progreso WHERE trabajo = %s"
+
+    REPORTAR_CADA = 30      # segundos entre logs de avance
+
+    def __init__(self, tamano_lote=500, pausa=0.5, detener=None):
+        """
+        tamano_lote: filas por transacción
+        pausa: fracción del tiempo de cada lote que se espera antes del siguiente
+        detener: threading.Event para cortar entre lotes (el avance queda guardado)
+        """
+        self.db = ConexionDB()
+        self.tamano_lote = tamano_lote
+        self.pausa = pausa
+        self.detener = detener or threading.Event()
+        self.eventos = EventoModel()
+        self.notificaciones = NotificacionModel()
+
+    def ejecutar(self, dias_notificaciones=30, dias_eventos=180):
+        """Los dos trabajos (None en los días omite uno); retorna el resumen de cada uno"""
+        resumenes = []
+        if dias_notificaciones is not None and not self.detener.is_set():
+            resumenes.append(self.purgar_notificaciones(dias_notificaciones))
+        if dias_eventos is not None and not self.detener.is_set():
+            resumenes.append(self.archivar_eventos(dias_eventos))
+        return resumenes
+
+    def purgar_notificaciones(self, dias=30):
+        """Borra las notificaciones leídas programadas hace más de `dias` días"""
+        return self._recorrer('purgar_notificaciones', dias, self.notificaciones.eliminar_leidas_lote)
+
+    def archivar_eventos(self, dias=180):
+        """Mueve a evento_archivo los eventos completados con fecha de hace más de `dias` días"""
+        return self._recorrer('archivar_eventos', dias, self.eventos.archivar_lote)
+
+    def _recorrer(self, trabajo, dias, paso):
+        corte, ultimo_id, filas_previas = self._cargar_progreso(trabajo, dias)
+        resumen = {'trabajo': trabajo, 'corte': corte.isoformat(), 'reanudado': ultimo_id > 0,
+                   'filas': 0, 'lotes': 0, 'completo': False}
+        if resumen['reanudado']:
+            log.info("Reanudando trabajo de retención", extra={
+                'trabajo': trabajo, 'ultimo_id': ultimo_id, 'filas_previas': filas_previas})
+
+        inicio = ultimo_reporte = time.monotonic()
+        while not self.detener.is_set():
+            inicio_lote = time.monotonic()
+            with transaccion():
+                ids = paso(corte, ultimo_id, self.tamano_lote)
+                if ids:
+                    ultimo_id = ids[-1]
+                    self._guardar_progreso(trabajo, corte, ultimo_id, filas_previas + resumen['filas'] + len(ids))
+            resumen['filas'] += len(ids)
+            resumen['lotes'] += 1
+
+            if len(ids) < self.tamano_lote:
+                resumen['completo'] = True
+                break
+
+            ahora = time.monotonic()
+            if ahora - ultimo_reporte >= self.REPORTAR_CADA:
+                ultimo_reporte = ahora
+                log.info("Avance de retención", extra=self._medir(resumen, ahora - inicio, ultimo_id))
+            self.detener.wait((ahora - inicio_lote) * self.pausa)
+
+        if resumen['completo']:
+            self._terminar(trabajo)
+        resumen = self._medir(resumen, time.monotonic() - inicio, ultimo_id)
+        log.info("Trabajo de retención terminado" if resumen['completo'] else "Trabajo de retención detenido",
+                 extra=resumen)
+        return resumen
+
+    def _cargar_progreso(self, trabajo, dias):
+        """(corte, ultimo_id, filas) del trabajo a medias, o uno nuevo con corte = ahora - dias"""
+        self.db.conectar()
+        guardado = self.db.ejecutar_consulta(self.SQL_PROGRESO, (trabajo,))
+        ahora = self.db.ejecutar_consulta("SELECT NOW() as ahora")
+        self.db.desconectar()
+        if guardado is None or not ahora:
+            raise RuntimeError(f"No se pudo leer el avance de {trabajo}")
+        if guardado:
+            return guardado[0]['corte'], guardado[0]['ultimo_id'], guardado[0]['filas']
+        return ahora[0]['ahora'] - timedelta(days=dias), 0, 0
+
+    def _guardar_progreso(self, trabajo, corte, ultimo_id, filas):
+        self.db.conectar()
+        guardado = self.db.ejecutar_accion(self.SQL_GUARDAR_PROGRESO, (trabajo, corte, ultimo_id, filas))
+        self.db.desconectar()
+        if not guardado:
+            raise RuntimeError(f"No se pudo guardar el avance de {trabajo}")
+
+    def _terminar(self, trabajo):
+        self.db.conectar()
+        self.db.ejecutar_accion(self.SQL_TERMINAR, (trabajo,))
+        self.db.desconectar()
+
+    @staticmethod
+    def _medir(resumen, segundos, ultimo_id):
+        return {**resumen, 'ultimo_id': ultimo_id, 'segundos': round(segundos, 3),
+                'filas_por_s': round(resumen['filas'] / max(segundos, 1e-9), 1)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retención de notificaciones y archivo de eventos")
+    parser.add_argument('--dias-notificaciones', type=int, default=30)
+    parser.add_argument('--dias-eventos', type=int, default=180)
+    parser.add_argument('--lote', type=int, default=500)
+    parser.add_argument('--pausa', type=float, default=0.5)
+    args = parser.parse_args()
+
+    configurar_registro()
+    trabajo = TrabajoRetencion(tamano_lote=args.lote, pausa=args.pausa)
+    try:
+        for resumen in trabajo.ejecutar(args.dias_notificaciones, args.dias_eventos):
+            print(f"{resumen['trabajo']}: {resumen['filas']} filas en {resumen['segundos']} s "
+                  f"({resumen['filas_por_s']} filas/s){'' if resumen['completo'] else ' [incompleto]'}")
+    except KeyboardInterrupt:
+        print("Interrumpido: la próxima ejecución sigue desde el último lote confirmado")
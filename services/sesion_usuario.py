@@ -0,0 +1,53 @@
+# services/sesion_usuario.py
+# Perfil del usuario cacheado en su sesión (del lado del servidor, ver database/sesiones.py)
+import time
+
+from flask import session
+
+from models.usuario import UsuarioModel
+
+# Segundos que el perfil de la sesión se usa sin volver a leerlo de la BD
+PERFIL_TTL = 300
+
+usuario_model = UsuarioModel()
+
+
+def iniciar_sesion(user):
+    """Abre la sesión con id nuevo y deja el perfil cacheado desde la fila ya autenticada"""
+    session.clear()
+    if hasattr(session, 'regenerar'):
+        session.regenerar()
+    session['user_id'] = user['id']
+    # La cookie dura permanent_session_lifetime y se renueva con el uso
+    session.permanent = True
+    _guardar_perfil(user)
+
+
+def perfil_actual():
+    """
+    Perfil (nombre, email, rol) del usuario de la sesión. Se relee con
+    UsuarioModel.obtener_por_id a lo más cada PERFIL_TTL segundos por sesión;
+    si el usuario ya no existe se cierra la sesión y retorna None.
+    """
+    if 'user_id' not in session:
+        return None
+    if time.time() - session.get('perfil_cargado', 0) >= PERFIL_TTL:
+        user = usuario_model.obtener_por_id(session['user_id'])
+        if user is None:
+            session.clear()
+            return None
+        _guardar_perfil(user)
+    return {
+        'id': session['user_id'],
+        'nombre': session.get('user_name'),
+        'email': session.get('user_email'),
+        'rol': session.get('user_rol'),
+    }
+
+
+def _guardar_perfil(user):
+    # Mismas claves que leen las plantillas (base.html)
+    session['user_name'] = user['nombre']
+    session['user_email'] = user['email']
+    session['user_rol'] = user.get('rol', 'estudiante')
+    session['perfil_cargado'] = time.time()
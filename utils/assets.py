@@ -0,0 +1,200 @@
+# utils/assets.py
+# Pipeline de estáticos: el CSS/JS de Views/ con nombres por contenido, precomprimido y cacheable para siempre.
+#
+#     python -m utils.assets        # en el deploy: genera Views/dist/ y su manifest.json
+#
+# Las plantillas siguen usando url_for('static', filename='css/style.css'). Con el manifest
+# cargado la URL pasa a 'css/style.3f9a1c2b7d.css' y se sirve con Cache-Control immutable:
+# una visita repetida solo descarga el HTML. Sin manifest (desarrollo) se sirven las fuentes.
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+
+from flask import Response, abort, request, send_file, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete solo se genera la variante gzip
+    brotli = None
+
+VIEWS = Path(__file__).resolve().parent.parent / 'Views'
+DESTINO = VIEWS / 'dist'
+MANIFEST = 'manifest.json'
+
+# Prefijo de la URL (bajo /static/) → carpeta de Views/ con esos archivos
+ORIGENES = (('', 'statics'), ('js', 'js'))
+
+# Paquetes: un archivo servido que concatena varios (en este orden)
+PAQUETES = {
+    'css/tasku.css': ('css/style.css', 'css/menu.css'),
+}
+
+COMPRIMIBLES = {'.css', '.js', '.svg', '.json', '.txt'}
+MIN_COMPRIMIR = 256             # bytes: por debajo los encabezados pesan más que el ahorro
+CACHE_INMUTABLE = 31536000      # 1 año: el nombre cambia si cambia el contenido
+# Con Accept-Encoding se prefiere la primera disponible
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def fuentes():
+    """{nombre bajo /static/: ruta del archivo en Views/}"""
+    encontradas = {}
+    for prefijo, carpeta in ORIGENES:
+        raiz = VIEWS / carpeta
+        for ruta in sorted(raiz.rglob('*')):
+            if ruta.is_file():
+                relativa = ruta.relative_to(raiz).as_posix()
+                encontradas[f'{prefijo}/{relativa}' if prefijo else relativa] = ruta
+    return encontradas
+
+
+def contenido(nombre, disponibles=None):
+    """Bytes de un archivo o paquete, o None si no existe"""
+    disponibles = disponibles if disponibles is not None else fuentes()
+    if nombre in PAQUETES:
+        # ';' entre scripts: un archivo sin ; final no se une con la primera línea del siguiente
+        separador = b'\n;\n' if nombre.endswith('.js') else b'\n'
+        return separador.join(disponibles[parte].read_bytes() for parte in PAQUETES[nombre])
+    ruta = disponibles.get(nombre)
+    return ruta.read_bytes() if ruta is not None else None
+
+
+def _con_hash(nombre, datos):
+    base, punto, extension = nombre.rpartition('.')
+    huella = hashlib.sha256(datos).hexdigest()[:10]
+    return f'{base}.{huella}.{extension}' if punto else f'{nombre}.{huella}'
+
+
+def _escribir(ruta, datos):
+    # Escritura atómica: un worker que sirve durante el build nunca ve un archivo a medias
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + '.tmp')
+    temporal.write_bytes(datos)
+    os.replace(temporal, ruta)
+
+
+def construir(destino=DESTINO):
+    """
+    Genera cada archivo y paquete con su hash en el nombre, sus variantes .gz/.br
+    y el manifest. Los archivos de builds anteriores se conservan: el HTML que un
+    navegador o proxy tenga cacheado puede seguir pidiéndolos.
+    """
+    destino = Path(destino)
+    disponibles = fuentes()
+    manifest = {'archivos': {}, 'comprimidos': {}}
+    resumen = {'archivos': 0, 'bytes': 0, 'gzip': 0, 'br': 0}
+
+    for nombre in sorted(disponibles.keys() | PAQUETES.keys()):
+        datos = contenido(nombre, disponibles)
+        final = _con_hash(nombre, datos)
+        manifest['archivos'][nombre] = final
+        resumen['archivos'] += 1
+        resumen['bytes'] += len(datos)
+        ruta = destino / final
+        if not ruta.exists():
+            _escribir(ruta, datos)
+
+        if Path(nombre).suffix not in COMPRIMIBLES or len(datos) < MIN_COMPRIMIR:
+            continue
+        variantes = {'gzip': lambda: gzip.compress(datos, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variantes['br'] = lambda: brotli.compress(datos, quality=11)
+        manifest['comprimidos'][final] = []
+        for codificacion, sufijo in CODIFICACIONES:
+            if codificacion not in variantes:
+                continue
+            variante = ruta.with_name(ruta.name + sufijo)
+            if not variante.exists():
+                _escribir(variante, variantes[codificacion]())
+            manifest['comprimidos'][final].append(codificacion)
+            resumen[codificacion] += variante.stat().st_size
+
+    _escribir(destino / MANIFEST, json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return resumen
+
+
+def cargar_manifest(destino=DESTINO):
+    """Manifest del último build, o None si no se ha construido"""
+    try:
+        return json.loads((Path(destino) / MANIFEST).read_text())
+    except FileNotFoundError:
+        return None
+
+
+class ServidorAssets:
+    """Endpoint 'static' de la app: el build si hay manifest, las fuentes si no"""
+
+    def __init__(self, destino=DESTINO):
+        self.destino = Path(destino)
+        self.manifest = cargar_manifest(self.destino)
+        if self.manifest is not None:
+            self.finales = set(self.manifest['archivos'].values())
+
+    def url_defaults(self, endpoint, values):
+        """url_for('static', filename='css/style.css') → nombre con hash del build"""
+        if endpoint == 'static' and self.manifest is not None:
+            final = self.manifest['archivos'].get(values.get('filename'))
+            if final is not None:
+                values['filename'] = final
+
+    def servir(self, filename):
+        if self.manifest is None:
+            return self._servir_fuente(filename)
+        if filename not in self.finales:
+            # Nombre sin hash (URL armada a mano): el archivo vigente, revalidando siempre
+            final = self.manifest['archivos'].get(filename)
+            if final is None:
+                abort(404)
+            respuesta = send_from_directory(self.destino, final)
+            respuesta.cache_control.no_cache = True
+            return respuesta
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        codificacion, sufijo = self._codificacion(filename)
+        respuesta = send_from_directory(self.destino, filename + sufijo,
+                                        mimetype=mimetype, max_age=CACHE_INMUTABLE)
+        respuesta.cache_control.immutable = True
+        if filename in self.manifest['comprimidos']:
+            respuesta.vary.add('Accept-Encoding')
+        if codificacion:
+            respuesta.headers['Content-Encoding'] = codificacion
+        return respuesta
+
+    def _codificacion(self, final):
+        disponibles = self.manifest['comprimidos'].get(final, ())
+        for codificacion, sufijo in CODIFICACIONES:
+            if codificacion in disponibles and request.accept_encodings[codificacion]:
+                return codificacion, sufijo
+        return None, ''
+
+    def _servir_fuente(self, filename):
+        # Desarrollo: siempre lo último de Views/, validado por ETag
+        disponibles = fuentes()
+        if filename in PAQUETES:
+            respuesta = Response(contenido(filename, disponibles),
+                                 mimetype=mimetypes.guess_type(filename)[0])
+            respuesta.add_etag()
+            respuesta.make_conditional(request)
+        elif filename in disponibles:
+            respuesta = send_file(disponibles[filename])
+        else:
+            abort(404)
+        respuesta.cache_control.no_cache = True
+        return respuesta
+
+
+def init_app(app, destino=DESTINO, url_path='/static'):
+    """Registra el endpoint 'static' (la app se crea con static_folder=None)"""
+    servidor = ServidorAssets(destino)
+    app.add_url_rule(f'{url_path}/<path:filename>', endpoint='static', view_func=servidor.servir)
+    app.url_defaults(servidor.url_defaults)
+    app.extensions['tasku_assets'] = servidor
+    return servidor
+
+
+if __name__ == "__main__":
+    resumen = construir()
+    print(f"Assets en {DESTINO}: {resumen}")
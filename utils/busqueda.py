@@ -0,0 +1,40 @@
+# utils/busqueda.py
+# Texto escrito por el usuario -> consulta FULLTEXT en modo booleano (y el mismo criterio en memoria)
+import re
+import unicodedata
+
+# innodb_ft_min_token_size (3 por defecto): las palabras más cortas no están en el índice,
+# y un prefijo de 1-2 letras coincide con casi todo el índice (que es de todos los usuarios)
+MIN_TERMINO = 3
+MAX_TERMINOS = 8
+
+_PALABRA = re.compile(r'\w+')
+
+
+def terminos(texto):
+    """Palabras buscables del texto, en minúsculas y sin repetir (los operadores de MATCH se descartan)"""
+    resultado = []
+    for palabra in _PALABRA.findall((texto or '').lower()):
+        if len(palabra) >= MIN_TERMINO and palabra not in resultado:
+            resultado.append(palabra)
+    return resultado[:MAX_TERMINOS]
+
+
+def consulta_booleana(palabras, prefijo=True):
+    """'+informe +lab*': todas las palabras obligatorias; con prefijo, la última se completa (type-ahead)"""
+    partes = [f'+{palabra}' for palabra in palabras]
+    if prefijo and partes:
+        partes[-1] += '*'
+    return ' '.join(partes)
+
+
+def _normalizar(texto):
+    """Minúsculas y sin tildes (como compara utf8mb4_unicode_ci)"""
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def coincide(texto, palabras):
+    """True si cada palabra es el comienzo de alguna palabra de texto (para filtrar listas cacheadas)"""
+    propias = _PALABRA.findall(_normalizar(texto))
+    return all(any(p.startswith(_normalizar(palabra)) for p in propias) for palabra in palabras)
@@ -0,0 +1,76 @@
+# utils/cache.py
+# Caché en memoria LRU con expiración, compartida por los hilos del proceso
+import threading
+import time
+from collections import OrderedDict
+
+_SIN_VALOR = object()
+
+
+class CacheLRU:
+    """Diccionario acotado: descarta lo menos usado al llenarse y lo vencido al leerlo"""
+
+    def __init__(self, max_items=1024, ttl=300):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._datos = OrderedDict()   # clave -> (expira, valor)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, defecto=None):
+        """Valor cacheado o defecto (cuenta acierto / fallo)"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._datos[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave, valor, ttl=None):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + (ttl or self.ttl), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def obtener_o_cargar(self, clave, cargar):
+        """
+        Read-through: si la clave no está, llama a cargar() y guarda el resultado.
+        Los None (p.ej. error de BD) no se cachean.
+        """
+        valor = self.obtener(clave, _SIN_VALOR)
+        if valor is not _SIN_VALOR:
+            return valor
+        valor = cargar()
+        if valor is not None:
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def invalidar_si(self, condicion):
+        """Descarta todas las claves para las que condicion(clave) es verdadera"""
+        with self._lock:
+            for clave in [c for c in self._datos if condicion(c)]:
+                del self._datos[clave]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'items': len(self._datos),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / total if total else 0.0,
+            }
@@ -0,0 +1,39 @@
+# utils/cambios.py
+# Aviso de cambios por usuario para invalidar cachés en memoria
+import threading
+
+from database.conexion_db import al_confirmar
+
+_suscriptores = []
+_versiones = {}
+_lock = threading.Lock()
+
+
+def suscribir(callback):
+    """Registra callback(usuario_id) que se llama cada vez que cambian los datos de un usuario"""
+    with _lock:
+        _suscriptores.append(callback)
+
+
+def version(usuario_id):
+    """Contador que aumenta con cada cambio confirmado del usuario"""
+    return _versiones.get(usuario_id, 0)
+
+
+def registrar_cambio(usuario_id):
+    """
+    Avisa que cambiaron los eventos/notificaciones del usuario.
+    Dentro de una unidad de trabajo el aviso espera al commit, así ningún
+    lector vuelve a cachear datos que todavía no están confirmados.
+    """
+    if usuario_id is None:
+        return
+    al_confirmar(lambda: _notificar(usuario_id))
+
+
+def _notificar(usuario_id):
+    with _lock:
+        _versiones[usuario_id] = _versiones.get(usuario_id, 0) + 1
+        suscriptores = list(_suscriptores)
+    for callback in suscriptores:
+        callback(usuario_id)
@@ -0,0 +1,16 @@
+# utils/decorators.py
+from functools import wraps
+
+from flask import session, redirect, url_for, request, jsonify
+
+
+def login_requerido(f):
+    """Exige sesión iniciada: redirige al login (o responde 401 a peticiones JSON)"""
+    @wraps(f)
+    def decorada(*args, **kwargs):
+        if 'user_id' not in session:
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify({'error': 'No autenticado'}), 401
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorada
@@ -0,0 +1,43 @@
+# utils/paginacion.py
+# Cursores opacos para paginación keyset (por clave, sin OFFSET)
+import base64
+import json
+from datetime import date, datetime
+
+
+def codificar_cursor(*valores):
+    """Empaqueta la clave de la última fila de una página en un token URL-safe"""
+    crudo = [v.isoformat() if isinstance(v, date) else v for v in valores]
+    texto = json.dumps(crudo, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token, tipos):
+    """
+    Recupera la clave desde el token. tipos indica cómo leer cada valor
+    (datetime, date o int); lanza ValueError si el token no es válido.
+    """
+    try:
+        relleno = '=' * (-len(token) % 4)
+        crudo = json.loads(base64.urlsafe_b64decode(token + relleno).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Cursor de paginación inválido")
+
+    if not isinstance(crudo, list) or len(crudo) != len(tipos):
+        raise ValueError("Cursor de paginación inválido")
+
+    valores = []
+    for valor, tipo in zip(crudo, tipos):
+        # Un cursor manipulado puede traer listas u objetos: solo se aceptan texto y números
+        if valor is not None and (isinstance(valor, bool) or not isinstance(valor, (str, int, float))):
+            raise ValueError("Cursor de paginación inválido")
+        try:
+            if valor is None:
+                valores.append(None)
+            elif tipo in (datetime, date):
+                valores.append(tipo.fromisoformat(valor))
+            else:
+                valores.append(tipo(valor))
+        except (TypeError, ValueError):
+            raise ValueError("Cursor de paginación inválido")
+    return valores
@@ -0,0 +1,155 @@
+# utils/recurrencia.py
+# Reglas de repetición estilo RRULE (subconjunto de RFC 5545) y su expansión perezosa.
+#
+#     FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250715T235959
+#     FREQ=DAILY;INTERVAL=2;COUNT=10
+#     FREQ=MONTHLY            (el mismo día del mes que la primera ocurrencia)
+#
+# ocurrencias() es un generador: solo calcula las fechas dentro de la ventana pedida y,
+# sin COUNT, salta directo al período donde empieza la ventana.
+from datetime import datetime, timedelta
+
+FRECUENCIAS = ('DAILY', 'WEEKLY', 'MONTHLY')
+DIAS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_CONTEO = 1000
+
+
+def parsear_regla(texto):
+    """
+    'FREQ=WEEKLY;BYDAY=MO,WE' → {'freq', 'interval', 'byday', 'count', 'until'}.
+    Lanza ValueError si la regla no es válida o usa partes no soportadas.
+    """
+    partes = {}
+    for parte in (texto or '').upper().replace('RRULE:', '').split(';'):
+        if not parte:
+            continue
+        clave, igual, valor = parte.partition('=')
+        if not igual or not valor or clave in partes:
+            raise ValueError(f"Parte inválida en la regla: {parte}")
+        partes[clave] = valor
+
+    desconocidas = set(partes) - {'FREQ', 'INTERVAL', 'BYDAY', 'COUNT', 'UNTIL'}
+    if desconocidas:
+        raise ValueError(f"Partes no soportadas: {', '.join(sorted(desconocidas))}")
+    if partes.get('FREQ') not in FRECUENCIAS:
+        raise ValueError(f"FREQ debe ser una de: {', '.join(FRECUENCIAS)}")
+    if 'COUNT' in partes and 'UNTIL' in partes:
+        raise ValueError("COUNT y UNTIL no pueden ir juntos")
+
+    regla = {'freq': partes['FREQ'], 'interval': 1, 'byday': None, 'count': None, 'until': None}
+    try:
+        if 'INTERVAL' in partes:
+            regla['interval'] = int(partes['INTERVAL'])
+        if 'COUNT' in partes:
+            regla['count'] = int(partes['COUNT'])
+        if 'UNTIL' in partes:
+            valor = partes['UNTIL'].rstrip('Z')
+            regla['until'] = datetime.strptime(valor, '%Y%m%dT%H%M%S' if 'T' in valor else '%Y%m%d')
+            if 'T' not in valor:
+                regla['until'] += timedelta(days=1, seconds=-1)   # UNTIL de fecha: incluye ese día
+    except ValueError:
+        raise ValueError("INTERVAL/COUNT deben ser números y UNTIL una fecha AAAAMMDD[THHMMSS]") from None
+    if regla['interval'] < 1:
+        raise ValueError("INTERVAL debe ser al menos 1")
+    if regla['count'] is not None and not 1 <= regla['count'] <= MAX_CONTEO:
+        raise ValueError(f"COUNT debe estar entre 1 y {MAX_CONTEO}")
+
+    if 'BYDAY' in partes:
+        if regla['freq'] != 'WEEKLY':
+            raise ValueError("BYDAY solo se admite con FREQ=WEEKLY")
+        dias = partes['BYDAY'].split(',')
+        if any(dia not in DIAS for dia in dias):
+            raise ValueError(f"BYDAY admite: {', '.join(DIAS)}")
+        regla['byday'] = tuple(sorted({DIAS.index(dia) for dia in dias}))
+    return regla
+
+
+def formatear_regla(regla):
+    """Texto canónico de una regla parseada (el que se guarda)"""
+    partes = [f"FREQ={regla['freq']}"]
+    if regla['interval'] != 1:
+        partes.append(f"INTERVAL={regla['interval']}")
+    if regla['byday']:
+        partes.append(f"BYDAY={','.join(DIAS[dia] for dia in regla['byday'])}")
+    if regla['count'] is not None:
+        partes.append(f"COUNT={regla['count']}")
+    if regla['until'] is not None:
+        partes.append(f"UNTIL={regla['until']:%Y%m%dT%H%M%S}")
+    return ';'.join(partes)
+
+
+def ocurrencias(regla, inicio, desde=None, hasta=None):
+    """
+    Fechas de la serie que empieza en `inicio`, en orden, dentro de [desde, hasta).
+    Sin `hasta` ni COUNT/UNTIL la serie es infinita: quien itera debe cortar.
+    """
+    desde = max(desde or inicio, inicio)
+    if regla['count'] is not None:
+        # Con COUNT hay que contar desde el principio (acotado por MAX_CONTEO)
+        fechas = _fechas(regla, inicio, inicio)
+    else:
+        fechas = _fechas(regla, inicio, desde)
+
+    emitidas = 0
+    for fecha in fechas:
+        if regla['until'] is not None and fecha > regla['until']:
+            return
+        if hasta is not None and fecha >= hasta:
+            return
+        emitidas += 1
+        if fecha >= desde:
+            yield fecha
+        if regla['count'] is not None and emitidas >= regla['count']:
+            return
+
+
+def fin_serie(regla, inicio):
+    """Última ocurrencia posible (None si la serie no termina); sirve para filtrar por rango en SQL"""
+    if regla['until'] is not None:
+        return regla['until']
+    if regla['count'] is not None:
+        ultima = None
+        for ultima in ocurrencias(regla, inicio):
+            pass
+        return ultima
+    return None
+
+
+def es_ocurrencia(regla, inicio, fecha):
+    """True si `fecha` es una de las fechas de la serie"""
+    return next(ocurrencias(regla, inicio, fecha, fecha + timedelta(seconds=1)), None) == fecha
+
+
+def _fechas(regla, inicio, desde):
+    """Generador infinito de candidatas >= inicio, empezando en el período que contiene `desde`"""
+    intervalo = regla['interval']
+
+    if regla['freq'] == 'DAILY':
+        paso = timedelta(days=intervalo)
+        n = max((desde - inicio) // paso, 0)
+        while True:
+            yield inicio + n * paso
+            n += 1
+
+    elif regla['freq'] == 'WEEKLY':
+        dias = regla['byday'] or (inicio.weekday(),)
+        lunes = inicio - timedelta(days=inicio.weekday())
+        semana = max((desde - lunes).days // 7 // intervalo * intervalo, 0)
+        while True:
+            base = lunes + timedelta(weeks=semana)
+            for dia in dias:
+                fecha = base + timedelta(days=dia)
+                if fecha >= inicio:
+                    yield fecha
+            semana += intervalo
+
+    else:  # MONTHLY: el día del mes de inicio; los meses que no lo tienen se saltan (RFC 5545)
+        meses = (desde.year - inicio.year) * 12 + desde.month - inicio.month
+        n = max(meses // intervalo * intervalo, 0)
+        while True:
+            total = inicio.month - 1 + n
+            try:
+                yield inicio.replace(year=inicio.year + total // 12, month=total % 12 + 1)
+            except ValueError:
+                pass
+            n += intervalo
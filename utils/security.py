@@ -1,35 +1,161 @@
 # utils/security.py
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+
+class SeguridadSaturadaError(RuntimeError):
+    """Hay demasiados hash/verificaciones bcrypt en curso; reintentar más tarde"""
+
+
 class SecurityManager:
-    """Gestiona la seguridad de contraseñas usando bcrypt"""
-    
-    @staticmethod
-    def hash_password(password: str) -> str:
+    """
+    Gestiona la seguridad de contraseñas usando bcrypt.
+    El trabajo de bcrypt (200-300 ms de CPU) se hace en un pool de hilos acotado:
+    bcrypt libera el GIL, así que una ráfaga de logins no acapara todos los workers
+    y cuando la cola se llena se rechaza al instante en vez de encolar sin límite.
+    """
+
+    COSTO_BCRYPT = 12                                  # factor de trabajo actual (ver calibrar_costo)
+    MAX_HILOS = max(1, (os.cpu_count() or 2) // 2)     # hash simultáneos
+    MAX_PENDIENTES = 32                                # en curso + en cola antes de rechazar
+    TIMEOUT = 10                                       # segundos máximos esperando un resultado
+
+    _executor = None
+    _cupos = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _ejecutar(cls, funcion, *args):
+        """Corre funcion en el pool de bcrypt y espera su resultado"""
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_HILOS,
+                                                   thread_name_prefix='bcrypt')
+                cls._cupos = threading.BoundedSemaphore(cls.MAX_PENDIENTES)
+            executor, cupos = cls._executor, cls._cupos
+
+        if not cupos.acquire(blocking=False):
+            raise SeguridadSaturadaError("Demasiadas solicitudes de autenticación en curso")
+        try:
+            futuro = executor.submit(funcion, *args)
+        except RuntimeError:
+            cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: cupos.release())
+
+        try:
+            return futuro.result(timeout=cls.TIMEOUT)
+        except TimeoutError:
+            raise SeguridadSaturadaError("La verificación de contraseña tardó demasiado")
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
         """
         Encripta una contraseña usando bcrypt
-        
+
         Args:
             password: Contraseña en texto plano
-            
+
         Returns:
             str: Hash de la contraseña
+
+        Raises:
+            SeguridadSaturadaError: si el pool de bcrypt está lleno
         """
         # Genera salt y hash en un solo paso
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        salt = bcrypt.gensalt(rounds=cls.COSTO_BCRYPT)
+        hashed = cls._ejecutar(bcrypt.hashpw, password.encode('utf-8'), salt)
         return hashed.decode('utf-8')
-    
-    @staticmethod
-    def verify_password(password: str, hashed: str) -> bool:
+
+    @classmethod
+    def verify_password(cls, password: str, hashed: str) -> bool:
         """
         Verifica si una contraseña coincide con su hash
-        
+
         Args:
             password: Contraseña en texto plano
             hashed: Hash almacenado
-            
+
         Returns:
             bool: True si coinciden, False si no
+
+        Raises:
+            SeguridadSaturadaError: si el pool de bcrypt está lleno
         """
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
\ No newline at end of file
+        return cls._ejecutar(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    @classmethod
+    def necesita_rehash(cls, hashed: str) -> bool:
+        """
+        Indica si un hash fue generado con un costo menor al actual. Nunca se baja el
+        costo de un hash: workers calibrados distinto no se pisan los hashes entre sí
+
+        Args:
+            hashed: Hash almacenado ($2b$<costo>$...)
+
+        Returns:
+            bool: True si conviene regenerarlo con COSTO_BCRYPT
+        """
+        try:
+            return int(hashed.split('$')[2]) < cls.COSTO_BCRYPT
+        except (IndexError, ValueError):
+            return False
+
+    @classmethod
+    def calibrar_costo(cls, objetivo_ms: float = 250, costo_min: int = 12, costo_max: int = 14) -> int:
+        """
+        Elige el mayor costo cuyo hash tarda como máximo objetivo_ms en esta máquina
+        (cada +1 de costo duplica el tiempo). Se llama una vez al iniciar la app.
+
+        Args:
+            objetivo_ms: Latencia objetivo por hash
+            costo_min: Costo mínimo aceptable (nunca se baja de aquí; 12 es el mínimo del proyecto)
+            costo_max: Costo máximo
+
+        Returns:
+            int: Costo elegido (queda en COSTO_BCRYPT)
+        """
+        muestras = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            bcrypt.hashpw(b'calibracion-tasku', bcrypt.gensalt(rounds=costo_min))
+            muestras.append((time.perf_counter() - inicio) * 1000)
+        # La mediana evita que un pico aislado cambie el costo entre workers
+        ms = sorted(muestras)[1]
+
+        costo = costo_min
+        while costo < costo_max and ms * 2 <= objetivo_ms:
+            costo += 1
+            ms *= 2
+
+        cls.COSTO_BCRYPT = costo
+        return costo
+
+
+def cargar_clave_secreta(ruta):
+    """
+    Clave para firmar cookies, la misma en todos los workers y entre reinicios:
+    TASKU_SECRET_KEY del entorno o, si no está, un archivo que se genera una sola vez.
+    """
+    clave = os.environ.get('TASKU_SECRET_KEY')
+    if clave:
+        return clave
+    if not os.path.exists(ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Se escribe aparte y se enlaza: si varios workers arrancan a la vez, gana uno solo
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(os.open(temporal, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as archivo:
+            archivo.write(secrets.token_bytes(32))
+        try:
+            os.link(temporal, ruta)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(temporal)
+    with open(ruta, 'rb') as archivo:
+        return archivo.read()
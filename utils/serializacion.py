@@ -0,0 +1,17 @@
+# utils/serializacion.py
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+
+def fila_a_json(fila):
+    """Convierte una fila de MySQL (dict) a valores serializables en JSON (fechas ISO 8601)"""
+    resultado = {}
+    for clave, valor in fila.items():
+        if isinstance(valor, (datetime, date)):
+            valor = valor.isoformat()
+        elif isinstance(valor, timedelta):
+            valor = int(valor.total_seconds())
+        elif isinstance(valor, Decimal):
+            valor = int(valor) if valor == valor.to_integral_value() else float(valor)
+        resultado[clave] = valor
+    return resultado